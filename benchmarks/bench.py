@@ -0,0 +1,377 @@
+# bench.py
+#
+# End-to-end benchmark of the query path against a local Qdrant:
+#
+#   python benchmarks/bench.py --points 20000 --dim 384 --output result.json
+#   python benchmarks/bench.py --save-baseline benchmarks/baseline.json
+#   python benchmarks/bench.py --baseline benchmarks/baseline.json
+#
+# With --baseline the run exits with status 1 if any stage's median (p50)
+# got slower than the baseline by more than --tolerance and by at least
+# --min-delta-ms. p95 is only compared when both runs timed at least
+# --p95-min-runs samples of a stage; with fewer it is mostly noise. Every
+# stage runs --warmup untimed iterations first.
+
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from qdrant_client import QdrantClient, models
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from display_results import to_columns  # noqa: E402
+from engine import EngineConfig, QueryEngine  # noqa: E402
+from filtering import compile_filter, group_from_dict  # noqa: E402
+from schema import SchemaDiscovery  # noqa: E402
+from tracing import Tracer, percentile  # noqa: E402
+
+COLLECTION = "bench"
+DEFAULT_PAYLOAD = (
+    "category:keyword,price:float,stock:integer,in_stock:bool,"
+    "created:datetime,title:text"
+)
+WORDS = (
+    "red blue green small large fast slow new old cheap premium light dark "
+    "soft hard warm cold round square smart classic modern"
+).split()
+BASE_TIME = datetime(2024, 1, 1)
+
+
+def fake_embedding(text: str, dim: int) -> List[float]:
+    """Deterministic unit vector derived from the text, in place of an API call."""
+    seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def parse_payload_spec(spec: str) -> Dict[str, str]:
+    """Parse ``name:type,...`` into an ordered field -> type mapping."""
+    fields = {}
+    for item in spec.split(","):
+        name, _, field_type = item.strip().partition(":")
+        fields[name] = field_type or "keyword"
+    return fields
+
+
+def payload_value(rng: random.Random, name: str, field_type: str, cardinality: int):
+    if field_type == "keyword":
+        return f"{name}-{rng.randrange(cardinality)}"
+    if field_type == "integer":
+        return rng.randrange(1000)
+    if field_type == "float":
+        return round(rng.uniform(0, 1000), 2)
+    if field_type == "bool":
+        return rng.random() < 0.5
+    if field_type == "datetime":
+        return (BASE_TIME + timedelta(minutes=rng.randrange(525600))).isoformat()
+    if field_type == "text":
+        return " ".join(rng.choice(WORDS) for _ in range(8))
+    if field_type == "geo":
+        return {"lat": rng.uniform(-80, 80), "lon": rng.uniform(-170, 170)}
+    raise ValueError(f"Unsupported payload type: {field_type}")
+
+
+def condition_spec(
+    rng: random.Random, name: str, field_type: str, cardinality: int
+) -> Dict[str, Any]:
+    """A filter condition on one field, in the filter interface's spec form."""
+    if field_type == "keyword":
+        value: Any = f"{name}-{rng.randrange(cardinality)}"
+        return {"key": name, "operator": "match", "value": value}
+    if field_type in ("integer", "float"):
+        low = rng.randrange(800)
+        return {"key": name, "operator": "range", "value": [low, low + 200]}
+    if field_type == "bool":
+        return {"key": name, "operator": "match", "value": True}
+    if field_type == "datetime":
+        start = BASE_TIME + timedelta(days=rng.randrange(300))
+        end = start + timedelta(days=60)
+        return {
+            "key": name,
+            "operator": "datetime_range",
+            "value": [start.isoformat(), end.isoformat()],
+        }
+    if field_type == "text":
+        return {"key": name, "operator": "match_text", "value": rng.choice(WORDS)}
+    return {"key": name, "operator": "geo_radius", "value": [0.0, 0.0, 5_000_000.0]}
+
+
+def create_collection(client: QdrantClient, args, fields: Dict[str, str]) -> None:
+    rng = random.Random(args.seed)
+    vectors = np.random.default_rng(args.seed).standard_normal(
+        (args.points, args.dim), dtype=np.float32
+    )
+    client.create_collection(
+        COLLECTION,
+        vectors_config=models.VectorParams(
+            size=args.dim, distance=models.Distance.COSINE
+        ),
+    )
+    for start in range(0, args.points, args.upload_batch):
+        end = min(start + args.upload_batch, args.points)
+        client.upsert(
+            COLLECTION,
+            points=[
+                models.PointStruct(
+                    id=i,
+                    vector=vectors[i].tolist(),
+                    payload={
+                        name: payload_value(rng, name, field_type, args.cardinality)
+                        for name, field_type in fields.items()
+                    },
+                )
+                for i in range(start, end)
+            ],
+        )
+
+
+def stage_stats(durations: List[float]) -> Dict[str, float]:
+    total = sum(durations)
+    return {
+        "runs": len(durations),
+        "p50_ms": round(percentile(durations, 50) * 1000, 4),
+        "p95_ms": round(percentile(durations, 95) * 1000, 4),
+        "p99_ms": round(percentile(durations, 99) * 1000, 4),
+        "mean_ms": round(total / len(durations) * 1000, 4),
+        "throughput_per_s": round(len(durations) / total, 2) if total else None,
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    if args.local_path:
+        # The on-disk collection is removed when the run ends
+        with tempfile.TemporaryDirectory(dir=args.local_path) as path:
+            return run_with_client(args, QdrantClient(path=path), "local")
+    return run_with_client(args, QdrantClient(":memory:"), "memory")
+
+
+def run_with_client(args, client: QdrantClient, mode: str) -> Dict[str, Any]:
+    try:
+        return _run(args, client, mode)
+    finally:
+        client.close()
+
+
+def _run(args, client: QdrantClient, mode: str) -> Dict[str, Any]:
+    fields = parse_payload_spec(args.payload)
+    started = time.perf_counter()
+    create_collection(client, args, fields)
+    load_seconds = time.perf_counter() - started
+
+    tracer = Tracer(enabled=True, history=max(args.queries, args.schema_runs))
+    # Stages are timed here, so the engine keeps its own tracer disabled
+    engine = QueryEngine(EngineConfig(qdrant_url=":memory:"), client=client)
+    rng = random.Random(args.seed + 1)
+
+    for _ in range(args.warmup):
+        SchemaDiscovery(client, sample_size=args.sample_size).get_schema(COLLECTION)
+    for _ in range(args.schema_runs):
+        with tracer.stage("schema_discovery"):
+            discovery = SchemaDiscovery(client, sample_size=args.sample_size)
+            discovery.get_schema(COLLECTION)
+
+    filtered_fields = list(fields.items())[: args.filter_conditions]
+    specs = [
+        {
+            "must": [
+                condition_spec(rng, name, field_type, args.cardinality)
+                for name, field_type in filtered_fields
+            ]
+        }
+        for _ in range(args.queries)
+    ]
+    for spec in specs[: args.warmup]:
+        compile_filter.__wrapped__(group_from_dict(spec))
+    filters = []
+    for spec in specs:
+        with tracer.stage("filter_compile"):
+            # Bypass the memo so every run measures a real compilation
+            filters.append(compile_filter.__wrapped__(group_from_dict(spec)))
+
+    vectors = [fake_embedding(f"query {i}", args.dim) for i in range(args.queries)]
+    for i in range(args.warmup):
+        vector = fake_embedding(f"warmup {i}", args.dim)
+        points, _ = engine.search(
+            COLLECTION, vector, limit=args.limit, use_cache=False
+        )
+        engine.search(
+            COLLECTION, vector, filters[0], limit=args.limit, use_cache=False
+        )
+        pd.DataFrame(to_columns(points))
+    results = []
+    for vector in vectors:
+        with tracer.stage("search"):
+            points, _ = engine.search(COLLECTION, vector, limit=args.limit)
+        results.append(points)
+    for vector, query_filter in zip(vectors, filters):
+        with tracer.stage("search_filtered"):
+            engine.search(COLLECTION, vector, query_filter, limit=args.limit)
+    for vector in vectors:
+        with tracer.stage("search_cached"):
+            engine.search(COLLECTION, vector, limit=args.limit)
+
+    for points in results:
+        with tracer.stage("format"):
+            pd.DataFrame(to_columns(points))
+
+    return {
+        "config": {
+            "points": args.points,
+            "dim": args.dim,
+            "payload": args.payload,
+            "cardinality": args.cardinality,
+            "queries": args.queries,
+            "limit": args.limit,
+            "seed": args.seed,
+            "warmup": args.warmup,
+            "mode": mode,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "qdrant_client": importlib.metadata.version("qdrant-client"),
+            "machine": platform.machine(),
+        },
+        "load_seconds": round(load_seconds, 3),
+        "stages": {
+            name: stage_stats(list(durations))
+            for name, durations in tracer.samples.items()
+        },
+    }
+
+
+def compare(
+    result: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    min_delta_ms: float = 0.5,
+    p95_min_runs: int = 100,
+) -> List[Dict[str, Any]]:
+    """Diff stage medians (and p95 for well-sampled stages) against a baseline.
+
+    A slowdown is a regression only if it exceeds both ``tolerance`` and
+    ``min_delta_ms``, so sub-millisecond stages do not flag jitter.
+    """
+    rows = []
+    for name, stats in result["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before is None:
+            continue
+        metrics = ["p50_ms"]
+        if min(stats["runs"], before["runs"]) >= p95_min_runs:
+            metrics.append("p95_ms")
+        for metric in metrics:
+            delta = stats[metric] - before[metric]
+            change = delta / before[metric] if before[metric] else 0.0
+            rows.append(
+                {
+                    "stage": name,
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "current": stats[metric],
+                    "change": round(change, 4),
+                    "regression": change > tolerance and delta >= min_delta_ms,
+                }
+            )
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the query path")
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument(
+        "--payload",
+        default=DEFAULT_PAYLOAD,
+        help="Payload shape as name:type pairs (keyword, integer, float, "
+        "bool, datetime, text, geo)",
+    )
+    parser.add_argument(
+        "--cardinality", type=int, default=50, help="Distinct values per keyword"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--filter-conditions", type=int, default=2)
+    parser.add_argument("--schema-runs", type=int, default=20)
+    parser.add_argument(
+        "--warmup", type=int, default=5, help="Untimed iterations before each stage"
+    )
+    parser.add_argument("--sample-size", type=int, default=256)
+    parser.add_argument("--upload-batch", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--local-path", help="Use on-disk local mode under this directory"
+    )
+    parser.add_argument("--output", help="Write the JSON result here")
+    parser.add_argument("--baseline", help="Compare with this stored result")
+    parser.add_argument("--save-baseline", help="Store the result as a baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.20,
+        help="Allowed relative slowdown before a stage counts as a regression",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.5,
+        help="Slowdowns smaller than this are never regressions",
+    )
+    parser.add_argument(
+        "--p95-min-runs",
+        type=int,
+        default=100,
+        help="Compare p95 only for stages timed at least this many times",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    result = run(args)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print("Warning: baseline was run with a different config", file=sys.stderr)
+        result["comparison"] = compare(
+            result, baseline, args.tolerance, args.min_delta_ms, args.p95_min_runs
+        )
+        for row in result["comparison"]:
+            print(
+                f"{row['stage']:<18} {row['metric']:<7} "
+                f"{row['baseline']:>10.3f} -> {row['current']:>10.3f} ms "
+                f"({row['change']:+.1%}){'  REGRESSION' if row['regression'] else ''}",
+                file=sys.stderr,
+            )
+        if any(row["regression"] for row in result["comparison"]):
+            status = 1
+
+    output = json.dumps(result, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# startup.py
+#
+# Cold-start benchmark: import time and resident memory of the app modules
+# and of each embeddings client, every run in a fresh interpreter:
+#
+#   python benchmarks/startup.py --runs 5 --output startup.json
+#   python benchmarks/startup.py --save-baseline benchmarks/startup_baseline.json
+#   python benchmarks/startup.py --baseline benchmarks/startup_baseline.json
+#
+# Compare with another checkout by pointing --src at its src directory,
+# e.g. one created with `git worktree add /tmp/before <commit>`.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+SCENARIOS = {
+    # Interpreter alone, the floor every other scenario starts from
+    "python": "pass",
+    "import_engine": "import engine",
+    "import_app": "import app",
+    "provider_http": (
+        "from embeddings import EmbeddingSettings, _get_provider\n"
+        "_get_provider(EmbeddingSettings(api_key='sk-bench', backend='http'))"
+    ),
+    "provider_langchain": (
+        "from embeddings import EmbeddingSettings, _get_provider\n"
+        "_get_provider(EmbeddingSettings(api_key='sk-bench', backend='langchain'))"
+    ),
+}
+
+CHILD = """
+import json, sys, time, warnings
+warnings.simplefilter("ignore")
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+rss = None
+try:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) / 1024
+except OSError:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+print(json.dumps({{"seconds": seconds, "rss_mb": rss, "modules": len(sys.modules)}}))
+"""
+
+
+def measure(src: str, code: str) -> Dict[str, Any]:
+    """Run ``code`` in a fresh interpreter and return its timing and memory."""
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(src=src, code=code)],
+        capture_output=True,
+        text=True,
+        cwd=src,
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit {result.returncode}"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def scenario_stats(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    errors = [sample["error"] for sample in samples if "error" in sample]
+    if errors:
+        return {"error": errors[0]}
+    seconds = [sample["seconds"] for sample in samples]
+    return {
+        "runs": len(samples),
+        "import_ms_median": round(statistics.median(seconds) * 1000, 1),
+        "import_ms_min": round(min(seconds) * 1000, 1),
+        "rss_mb_median": round(statistics.median(s["rss_mb"] for s in samples), 1),
+        "modules": samples[-1]["modules"],
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    src = os.path.abspath(args.src)
+    names = args.scenarios or list(SCENARIOS)
+    scenarios = {}
+    for name in names:
+        samples = [measure(src, SCENARIOS[name]) for _ in range(args.runs)]
+        scenarios[name] = scenario_stats(samples)
+        print(f"{name:<20} {scenarios[name]}", file=sys.stderr)
+    return {
+        "config": {"runs": args.runs, "src": src},
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(
+    result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[Dict[str, Any]]:
+    """Diff median import time and RSS against a baseline run."""
+    rows = []
+    for name, stats in result["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None or "error" in before or "error" in stats:
+            continue
+        for metric in ("import_ms_median", "rss_mb_median"):
+            change = (
+                (stats[metric] - before[metric]) / before[metric]
+                if before[metric]
+                else 0.0
+            )
+            rows.append(
+                {
+                    "scenario": name,
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "current": stats[metric],
+                    "change": round(change, 4),
+                    "regression": change > tolerance,
+                }
+            )
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--src", default=SRC, help="Source directory to measure")
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Run only this scenario (repeatable)",
+    )
+    parser.add_argument("--output", help="Write the JSON result here")
+    parser.add_argument("--baseline", help="Compare with this stored result")
+    parser.add_argument("--save-baseline", help="Store the result as a baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.20,
+        help="Allowed increase before a metric counts as a regression",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    result = run(args)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        result["comparison"] = compare(result, baseline, args.tolerance)
+        for row in result["comparison"]:
+            print(
+                f"{row['scenario']:<20} {row['metric']:<17} "
+                f"{row['baseline']:>9.1f} -> {row['current']:>9.1f} "
+                f"({row['change']:+.1%}){'  REGRESSION' if row['regression'] else ''}",
+                file=sys.stderr,
+            )
+        if any(row["regression"] for row in result["comparison"]):
+            status = 1
+
+    output = json.dumps(result, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
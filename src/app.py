@@ -1,97 +1,200 @@
 # app.py
 
 import streamlit as st
-from qdrant_client import QdrantClient
 
-from session import initialize_session_state
+from session import get_engine, get_tracer, initialize_session_state
 from sidebar import create_sidebar
-from embeddings import get_embeddings
+from facets import create_facet_interface
 from filters import create_filter_interface
-from display_results import display_results_table
-import pandas as pd
+from batch import create_batch_interface
+from explorer import create_explorer_interface
+from export import create_export_interface
+from federated import create_federated_interface
+from hybrid import create_hybrid_interface, display_hybrid_comparison
+from index_advisor import create_index_advisor
+from similar import create_similar_interface
+from tuning import create_search_params_interface, create_tuning_interface
+from display_results import create_performance_panel, display_results_table
+from engine import hybrid_query
 
 def main():
     initialize_session_state()
     create_sidebar()
+    tracer = get_tracer()
+    tracer.start_run()
     st.title("Advanced Qdrant Query with Filters")
 
-    client = QdrantClient(
-        url=st.session_state.qdrant_url, api_key=st.session_state.qdrant_api_key
-    )
+    engine = get_engine()
+    client = engine.client
 
-    query = st.text_input("Enter your query:")
-    limit = st.number_input("Limit", min_value=1, max_value=30, value=5)
+    limit = st.number_input("Limit", min_value=1, max_value=10000, value=5)
     # make score threshold optional
     score_threshold = st.number_input("Score Threshold", min_value=0.0, max_value=1.0, value=0.0)
 
-    # Get collections
+    # Get collections (cached catalog, refreshed every few seconds at most)
     try:
-        collections = client.get_collections()
+        with tracer.stage("get_collections") as span:
+            collection_names = engine.collection_names()
+            span.set(hits=len(collection_names))
     except Exception as e:
         st.error(f"Error getting collections: {str(e)}")
         return
-    
-    collection_names = [collection.name for collection in collections.collections]
+
     collection_name = st.selectbox("Select Collection", collection_names)
+    if collection_name is None:
+        st.info("No collections found")
+        return
 
-    # Get metadata keys from collection
-    record, pointId = client.scroll(collection_name=collection_name, limit=1)
-    metadata_keys = list(record[0].payload.keys())
+    # Get payload schema from the index and a cached sample of points
+    try:
+        with tracer.stage("schema_discovery") as span:
+            schema = engine.schema(collection_name)
+            span.set(hits=len(schema.fields))
+    except Exception as e:
+        st.error(f"Error reading collection schema: {str(e)}")
+        return
 
     # Create filter interface
-    filter_clause = create_filter_interface(metadata_keys)
+    filter_clause = create_filter_interface(schema.keys, schema.field_types())
+    create_index_advisor(engine, collection_name, filter_clause, schema.field_types())
+    create_facet_interface(engine, collection_name, filter_clause, schema.field_types())
+    search_params = create_search_params_interface()
+
+    search_tab, federated_tab, batch_tab, export_tab, tuning_tab, explorer_tab = (
+        st.tabs(["Search", "Federated", "Batch", "Export", "Tuning", "Explorer"])
+    )
+
+    with federated_tab:
+        create_federated_interface(
+            engine,
+            collection_names,
+            filter_clause,
+            limit,
+            score_threshold,
+            search_params,
+        )
+
+    with batch_tab:
+        create_batch_interface(
+            engine,
+            collection_name,
+            filter_clause,
+            limit,
+            score_threshold,
+            search_params,
+        )
 
+    with tuning_tab:
+        create_tuning_interface(engine, collection_name, filter_clause)
+
+    with export_tab:
+        create_export_interface(client, collection_name, filter_clause)
+
+    with search_tab:
+        hybrid = create_hybrid_interface(engine, collection_name)
+        query = st.text_input("Enter your query:")
+        using = None
+        if schema.vector_names and not hybrid:
+            using = st.selectbox("Vector", schema.vector_names, key="search_using")
+        search(
+            engine,
+            collection_name,
+            query,
+            filter_clause,
+            limit,
+            score_threshold,
+            schema.keys,
+            search_params,
+            hybrid,
+            using,
+        )
+
+    # After the search tab, so the overlay shows the request just made
+    with explorer_tab:
+        create_explorer_interface(
+            engine, collection_name, filter_clause, schema.field_types()
+        )
+
+    if tracer.enabled:
+        create_performance_panel(tracer)
+
+
+def search(
+    engine,
+    collection_name,
+    query,
+    filter_clause,
+    limit,
+    score_threshold,
+    payload_keys,
+    search_params=None,
+    hybrid=None,
+    using=None,
+):
+    """Run a single query and display its results.
+
+    ``using`` names the dense vector of collections with named vectors.
+    """
     # Query button and results
     if st.button("Query Qdrant"):
         try:
-            if st.session_state.embedding_type == "openai":
-                # OpenAI embedding
-                query_embedding = get_embeddings(query)
-                results = client.search(
-                    collection_name=collection_name,
-                    query_vector=query_embedding,
-                    limit=limit,
-                    query_filter=filter_clause,
-                    score_threshold=score_threshold,
-                )
-            else:
-                # FastEmbed
-                results = client.search(
-                    collection_name=collection_name,
-                    query_text=query,
-                    limit=limit,
-                    query_filter=filter_clause,
-                    append_payload=True,
-                )
-              
-            # if 'results' in locals() or 'results' in globals():
-            #     display_results_table(results)
-            # else:
-            #     st.error("No results data found")
-            
-            if not results:
-                st.write("No results found")
-            formatted_results = []
-            for i, hit in enumerate(results):
-                with st.expander(f"Result {i+1}", expanded=True):
-                    payload_dict = {
-                        key: hit.payload.get(key, "N/A") for key in hit.payload.keys()
-                    }
-                    payload_dict["score"] = hit.score
-                    formatted_results.append(payload_dict)
-                    st.json(payload_dict)
-                    
-            with st.expander(f"Result {i+1}", expanded=True):
-
-                df = pd.DataFrame(formatted_results)
-                st.dataframe(df)
-                
+            query_embedding = engine.embed(query)
+            engine.check_dimension(
+                collection_name,
+                query_embedding,
+                hybrid["using"] if hybrid else using,
+            )
+            if hybrid:
+                sparse_embedding = engine.embed_sparse(query)
         except Exception as e:
             st.error(f"Error during search: {str(e)}")
-            if st.session_state.embedding_type == "fastembed":
-                st.info(
-                    "Note: Make sure FastEmbed is properly configured on your Qdrant server"
-                )
+            return
+        # Keep the request so paging and row selection survive reruns
+        request = {
+            "id": st.session_state.get("search_request", {}).get("id", 0) + 1,
+            "collection": collection_name,
+            "query": query_embedding,
+            "using": using,
+            "filter": filter_clause,
+            "limit": limit,
+            "score_threshold": score_threshold,
+            "params": search_params,
+        }
+        if hybrid:
+            # One round trip: both prefetches are fused on the server
+            fusion_query, prefetch = hybrid_query(
+                query_embedding,
+                sparse_embedding,
+                hybrid["sparse_using"],
+                hybrid["using"],
+                hybrid["fusion"],
+                limit,
+                filter_clause,
+                search_params,
+                score_threshold,
+            )
+            request.update(
+                query=fusion_query,
+                prefetch=prefetch,
+                score_threshold=None,
+                dense=query_embedding,
+                dense_using=hybrid["using"],
+                dense_score_threshold=score_threshold,
+            )
+        st.session_state.search_request = request
+
+    # Drill-down searches from stored vectors, no embedding needed
+    similar_request = create_similar_interface(
+        engine, collection_name, filter_clause, limit, score_threshold, search_params
+    )
+    if similar_request is not None:
+        st.session_state.search_request = similar_request
+
+    request = st.session_state.get("search_request")
+    if request and request["collection"] == collection_name:
+        if request.get("prefetch"):
+            display_hybrid_comparison(engine, request)
+        display_results_table(engine, request, payload_keys)
 
 
 if __name__ == "__main__":
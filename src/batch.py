@@ -0,0 +1,107 @@
+# batch.py
+
+import csv
+import os
+import tempfile
+import time
+from typing import Any, List, Optional
+
+import streamlit as st
+from qdrant_client import models
+
+from engine import RESULT_COLUMNS, QueryEngine, iter_queries
+from utils import remove_file
+
+# Rows kept in memory for the on-screen preview; the full table lives on disk
+PREVIEW_ROWS = 200
+
+
+def create_batch_interface(
+    engine: QueryEngine,
+    collection_name: str,
+    filter_clause: Any,
+    limit: int,
+    score_threshold: float,
+    search_params: Optional[models.SearchParams] = None,
+):
+    """Create the batch query tab: upload queries, stream results to a file."""
+    st.write(
+        "Upload a CSV with a `query` column or a JSONL file with `query` keys. "
+        "An optional `filter` column/key (Qdrant filter JSON) overrides the "
+        "filter above for that row."
+    )
+    uploaded = st.file_uploader("Queries file", type=["csv", "jsonl"])
+    vector_names = engine.schema(collection_name).vector_names
+    using = (
+        st.selectbox("Vector", vector_names, key="batch_using")
+        if vector_names
+        else None
+    )
+    col1, col2 = st.columns(2)
+    with col1:
+        chunk_size = st.number_input(
+            "Chunk size", min_value=1, max_value=2048, value=64,
+            help="Queries embedded and searched per request",
+        )
+    with col2:
+        requests_per_minute = st.number_input(
+            "Embedding requests per minute", min_value=0, value=0,
+            help="0 disables rate limiting",
+        )
+
+    if uploaded is not None and st.button("Run Batch"):
+        file_format = "csv" if uploaded.name.endswith(".csv") else "jsonl"
+        # Only the latest results are kept on disk
+        remove_file(st.session_state.pop("batch_results_path", None))
+        output = tempfile.NamedTemporaryFile(
+            "w", newline="", encoding="utf-8", suffix=".csv", delete=False
+        )
+        status = st.empty()
+        preview = st.empty()
+        preview_rows: List[List[Any]] = []
+        queries_done = 0
+        started = time.monotonic()
+        try:
+            with output:
+                writer = csv.writer(output)
+                writer.writerow(RESULT_COLUMNS)
+                for queries_done, result_rows in engine.search_batch(
+                    collection_name,
+                    iter_queries(uploaded, file_format),
+                    limit,
+                    score_threshold,
+                    default_filter=filter_clause,
+                    chunk_size=int(chunk_size),
+                    requests_per_minute=int(requests_per_minute) or None,
+                    params=search_params,
+                    using=using,
+                ):
+                    writer.writerows(result_rows)
+                    output.flush()
+                    preview_rows = (preview_rows + result_rows)[-PREVIEW_ROWS:]
+                    elapsed = time.monotonic() - started
+                    status.write(
+                        f"Processed {queries_done} queries in {elapsed:.1f}s"
+                    )
+                    preview.dataframe(
+                        {
+                            column: [row[i] for row in preview_rows]
+                            for i, column in enumerate(RESULT_COLUMNS)
+                        }
+                    )
+        except Exception as e:
+            st.error(f"Error during batch search: {str(e)}")
+            remove_file(output.name)
+            return
+        st.session_state.batch_results_path = output.name
+        st.success(f"Batch complete: {queries_done} queries")
+
+    path = st.session_state.get("batch_results_path")
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            st.download_button(
+                "Download Results (CSV)",
+                data=f,
+                file_name="batch_results.csv",
+                mime="text/csv",
+            )
@@ -0,0 +1,140 @@
+# cli.py
+
+import argparse
+import csv
+import json
+import sys
+from typing import Any, List, Optional
+
+from engine import RESULT_COLUMNS, QueryEngine, iter_queries, point_to_dict
+
+
+def _json_arg(value: Optional[str]) -> Any:
+    """Parse a JSON argument, reading it from a file when it starts with ``@``."""
+    if not value:
+        return None
+    if value.startswith("@"):
+        with open(value[1:], encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
+
+
+def _search_params(args: argparse.Namespace) -> Any:
+    params = _json_arg(args.params) or {}
+    if args.hnsw_ef:
+        params["hnsw_ef"] = args.hnsw_ef
+    if args.exact:
+        params["exact"] = True
+    return params or None
+
+
+def cmd_collections(engine: QueryEngine, args: argparse.Namespace) -> None:
+    for name in engine.collection_names():
+        print(name)
+
+
+def cmd_search(engine: QueryEngine, args: argparse.Namespace) -> None:
+    points = engine.query(
+        args.collection,
+        args.query,
+        query_filter=_json_arg(args.filter),
+        limit=args.limit,
+        offset=args.offset,
+        score_threshold=args.score_threshold,
+        params=_search_params(args),
+        using=args.using,
+    )
+    for point in points:
+        print(json.dumps(point_to_dict(point), default=str))
+
+
+def cmd_batch(engine: QueryEngine, args: argparse.Namespace) -> None:
+    file_format = "csv" if args.input.endswith(".csv") else "jsonl"
+    output = (
+        open(args.output, "w", newline="", encoding="utf-8")
+        if args.output
+        else sys.stdout
+    )
+    queries_done = 0
+    try:
+        writer = csv.writer(output)
+        writer.writerow(RESULT_COLUMNS)
+        with open(args.input, "rb") as f:
+            for queries_done, result_rows in engine.search_batch(
+                args.collection,
+                iter_queries(f, file_format),
+                args.limit,
+                args.score_threshold,
+                default_filter=_json_arg(args.filter),
+                chunk_size=args.chunk_size,
+                requests_per_minute=args.requests_per_minute,
+                params=_search_params(args),
+                using=args.using,
+            ):
+                writer.writerows(result_rows)
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Processed {queries_done} queries", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Query Qdrant from the command line. Connection and "
+        "embedding settings are read from the same environment variables "
+        "as the app."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    collections = commands.add_parser("collections", help="List collections")
+    collections.set_defaults(run=cmd_collections)
+
+    def add_query_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("collection")
+        command.add_argument("--limit", type=int, default=10)
+        command.add_argument("--score-threshold", type=float, default=None)
+        command.add_argument(
+            "--filter",
+            help="Qdrant filter JSON or condition spec, or @file to read it",
+        )
+        command.add_argument("--params", help="Search params JSON, or @file")
+        command.add_argument("--hnsw-ef", type=int, default=0)
+        command.add_argument("--exact", action="store_true")
+        command.add_argument(
+            "--using", help="Dense vector name in collections with named vectors"
+        )
+
+    search = commands.add_parser("search", help="Run one query, print JSON lines")
+    add_query_options(search)
+    search.add_argument("query")
+    search.add_argument("--offset", type=int, default=0)
+    search.set_defaults(run=cmd_search)
+
+    batch = commands.add_parser(
+        "batch", help="Run queries from a CSV or JSONL file, write CSV results"
+    )
+    add_query_options(batch)
+    batch.add_argument("input", help="CSV with a query column or JSONL file")
+    batch.add_argument("--output", help="Results CSV (defaults to stdout)")
+    batch.add_argument("--chunk-size", type=int, default=64)
+    batch.add_argument("--requests-per-minute", type=int, default=None)
+    batch.set_defaults(run=cmd_batch)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    engine = QueryEngine.from_env()
+    try:
+        args.run(engine, args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        engine.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
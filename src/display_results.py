@@ -0,0 +1,145 @@
+# display_results.py
+
+import json
+import math
+from typing import Any, Dict, List
+
+import streamlit as st
+from qdrant_client import models
+
+from engine import QueryEngine
+from similar import add_example, find_similar
+from tracing import Tracer
+
+PAGE_SIZES = [25, 50, 100, 250, 500, 1000]
+# Characters shown per cell; the full value is loaded when a row is expanded
+MAX_CELL_CHARS = 200
+
+
+def payload_selector(mode: str, fields: List[str]):
+    """Build the ``with_payload`` argument for an include/exclude projection."""
+    if mode == "Include":
+        return models.PayloadSelectorInclude(include=fields) if fields else False
+    return models.PayloadSelectorExclude(exclude=fields) if fields else True
+
+
+def _cell(value: Any) -> Any:
+    """Make a payload value displayable in one table cell."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    if len(value) > MAX_CELL_CHARS:
+        return value[:MAX_CELL_CHARS] + "…"
+    return value
+
+
+def to_columns(points: List[Any], offset: int = 0) -> Dict[str, List[Any]]:
+    """Convert scored points to a column-oriented table in a single pass."""
+    keys: Dict[str, None] = {}
+    for point in points:
+        keys.update(dict.fromkeys(point.payload or {}))
+    columns: Dict[str, List[Any]] = {"rank": [], "id": [], "score": []}
+    columns.update({key: [] for key in keys if key not in columns})
+    for i, point in enumerate(points):
+        payload = point.payload or {}
+        columns["rank"].append(offset + i + 1)
+        columns["id"].append(str(point.id))
+        columns["score"].append(point.score)
+        for key in keys:
+            if key in ("rank", "id", "score"):
+                continue
+            columns[key].append(_cell(payload.get(key)))
+    return columns
+
+
+def display_results_table(
+    engine: QueryEngine, request: Dict[str, Any], payload_keys: List[str]
+):
+    """Display paginated search results with payload projection."""
+    tracer = engine.tracer
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        mode = st.radio("Payload", ["Exclude", "Include"], key="payload_mode")
+    with col2:
+        fields = st.multiselect(
+            f"Fields to {mode.lower()}",
+            payload_keys,
+            key="payload_fields",
+            help="Only the selected payload fields are requested from Qdrant",
+        )
+    with col3:
+        page_size = st.selectbox("Page size", PAGE_SIZES, index=2, key="page_size")
+
+    pages = max(1, math.ceil(request["limit"] / page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1) - 1
+
+    offset = page * page_size
+    try:
+        points, cache_hit = engine.search(
+            request["collection"],
+            request["query"],
+            request["filter"],
+            limit=min(page_size, request["limit"] - offset),
+            offset=offset,
+            score_threshold=request["score_threshold"],
+            params=request.get("params"),
+            with_payload=payload_selector(mode, fields),
+            using=request.get("using"),
+            prefetch=request.get("prefetch"),
+        )
+    except Exception as e:
+        st.error(f"Error fetching results: {str(e)}")
+        return
+
+    if not points:
+        st.write("No results found")
+        return
+
+    st.caption(
+        f"Showing results {page * page_size + 1}–{page * page_size + len(points)}"
+        f"{' (cached)' if cache_hit else ''} · select a row to load its full payload"
+    )
+    with tracer.stage("render"):
+        event = st.dataframe(
+            to_columns(points, page * page_size),
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="results_table",
+        )
+
+    selected = event.selection.rows
+    if selected:
+        point = points[selected[0]]
+        with st.expander(f"Result {page * page_size + selected[0] + 1}", expanded=True):
+            with tracer.stage("retrieve") as span:
+                records = engine.client.retrieve(
+                    collection_name=request["collection"],
+                    ids=[point.id],
+                    with_payload=True,
+                )
+                span.set_points(records)
+            payload_dict = dict(records[0].payload or {}) if records else {}
+            payload_dict["score"] = point.score
+            st.json(payload_dict)
+
+            # Drill down from this hit using its stored vector
+            col1, col2, col3 = st.columns(3)
+            args = (request["collection"], point.id)
+            col1.button("Find Similar", on_click=find_similar, args=args)
+            col2.button("Add as Positive", on_click=add_example, args=args)
+            col3.button(
+                "Add as Negative", on_click=add_example, args=(*args, False)
+            )
+
+
+def create_performance_panel(tracer: Tracer):
+    """Display per-stage timings of the last run and session percentiles."""
+    with st.expander("Performance", expanded=False):
+        if not tracer.samples:
+            st.write("No stages recorded yet")
+            return
+        st.dataframe(tracer.summary(), hide_index=True)
+        if tracer.log_path:
+            st.caption(f"Writing stage timings to {tracer.log_path}")
@@ -0,0 +1,230 @@
+# embedding_cache.py
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within one process
+    fcntl = None
+
+
+class EmbeddingKey(NamedTuple):
+    """Cache key for one query embedding."""
+
+    provider: str
+    model: str
+    dimensions: Optional[int]
+    text: str
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text so trivially different inputs share a cache entry.
+
+    Case is preserved because embedding models are case sensitive.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(
+    provider: str, model: str, dimensions: Optional[int], text: str
+) -> EmbeddingKey:
+    """Build a cache key from the provider settings and the raw query text."""
+    return EmbeddingKey(provider, model, dimensions, normalize_query(text))
+
+
+def _digest(key: EmbeddingKey) -> str:
+    raw = "\x1f".join([key.provider, key.model, str(key.dimensions), key.text])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """On-disk embedding store that several processes can share.
+
+    Vectors of each dimension are appended to their own ``<dim>.f32`` file
+    and read back through memory maps. ``index.log`` is an append-only log
+    of ``<digest> <dimension> <row>`` lines. Writers hold an exclusive lock
+    on the ``lock`` file, so processes sharing the directory (such as server
+    workers) never hand out the same row. Entries added by other processes
+    are picked up by reading the tail of the log on a miss.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._arrays: Dict[int, np.memmap] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._log_path = os.path.join(directory, "index.log")
+        self._lock_path = os.path.join(directory, "lock")
+        self._log_offset = 0
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._refresh()
+
+    def _path(self, dim: int) -> str:
+        return os.path.join(self.directory, f"{dim}.f32")
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(self._lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Read index lines appended since the last call (lock held)."""
+        if not os.path.exists(self._log_path):
+            return
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # A line without its newline is still being written
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            parts = line.split()
+            try:
+                digest = parts[0].decode("ascii")
+                self._index[digest] = (int(parts[1]), int(parts[2]))
+            except (IndexError, ValueError, UnicodeDecodeError):
+                continue
+        self._log_offset += end
+
+    def _array(self, dim: int, row: int) -> np.memmap:
+        """Return a read-only map of ``<dim>.f32`` that covers ``row``."""
+        array = self._arrays.get(dim)
+        if array is None or array.shape[0] <= row:
+            row_bytes = dim * np.dtype(np.float32).itemsize
+            rows = os.path.getsize(self._path(dim)) // row_bytes
+            array = np.memmap(
+                self._path(dim), dtype=np.float32, mode="r", shape=(rows, dim)
+            )
+            self._arrays[dim] = array
+        return array
+
+    def get(self, key: EmbeddingKey) -> Optional[List[float]]:
+        digest = _digest(key)
+        with self._lock:
+            location = self._index.get(digest)
+            if location is None:
+                self._refresh()
+                location = self._index.get(digest)
+            if location is None:
+                return None
+            dim, row = location
+            return self._array(dim, row)[row].tolist()
+
+    def put(self, key: EmbeddingKey, vector: List[float]) -> None:
+        self.put_many([(key, vector)])
+
+    def put_many(self, items: Sequence[Tuple[EmbeddingKey, List[float]]]) -> None:
+        """Append new vectors with one write per dimension and one log write."""
+        with self._lock, self._file_lock():
+            self._refresh()
+            pending: Dict[int, Dict[str, List[float]]] = {}
+            for key, vector in items:
+                digest = _digest(key)
+                if digest not in self._index:
+                    pending.setdefault(len(vector), {})[digest] = vector
+            if not pending:
+                return
+            lines = []
+            for dim, vectors in pending.items():
+                row_bytes = dim * np.dtype(np.float32).itemsize
+                with open(self._path(dim), "ab") as f:
+                    size = f.seek(0, os.SEEK_END)
+                    if size % row_bytes:
+                        # Pad a row left incomplete by an interrupted write
+                        f.write(b"\0" * (row_bytes - size % row_bytes))
+                    start = -(-size // row_bytes)
+                    block = np.asarray(list(vectors.values()), dtype=np.float32)
+                    f.write(block.tobytes())
+                for row, digest in enumerate(vectors, start=start):
+                    self._index[digest] = (dim, row)
+                    lines.append(f"{digest} {dim} {row}\n")
+            with open(self._log_path, "ab") as f:
+                if f.seek(0, os.SEEK_END) and self._ends_without_newline():
+                    f.write(b"\n")
+                f.write("".join(lines).encode("ascii"))
+
+    def _ends_without_newline(self) -> bool:
+        with open(self._log_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+
+class EmbeddingCache:
+    """Two-tier query embedding cache: bounded in-process LRU plus optional disk."""
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk = DiskEmbeddingStore(directory) if directory else None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[EmbeddingKey, List[float]]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: EmbeddingKey) -> Optional[List[float]]:
+        """Return the cached vector for ``key`` or ``None`` on a miss."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+        if self.disk is not None:
+            vector = self.disk.get(key)
+            if vector is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: EmbeddingKey, vector: List[float]) -> None:
+        """Store ``vector`` in memory and, when configured, on disk."""
+        self._remember(key, vector)
+        if self.disk is not None:
+            self.disk.put(key, vector)
+
+    def put_many(self, items: Sequence[Tuple[EmbeddingKey, List[float]]]) -> None:
+        """Store many vectors, writing them to disk in one batch."""
+        for key, vector in items:
+            self._remember(key, vector)
+        if self.disk is not None and items:
+            self.disk.put_many(items)
+
+    def _remember(self, key: EmbeddingKey, vector: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current in-memory size."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+
+embedding_cache = EmbeddingCache(
+    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+    directory=os.getenv("EMBEDDING_CACHE_DIR") or None,
+)
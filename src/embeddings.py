@@ -1,22 +1,173 @@
 # embeddings.py
 
-import streamlit as st
-from langchain_community.embeddings import OpenAIEmbeddings, AzureOpenAIEmbeddings
-
-def get_embeddings(query: str):
-    """Get embeddings based on selected provider."""
-    if st.session_state.embedding_type == 'openai':
-        embedding = OpenAIEmbeddings(api_key=st.session_state.openai_api_key)
-        return embedding.embed_query(query)
-    elif st.session_state.embedding_type == 'azure':
-        embedding = AzureOpenAIEmbeddings(
-            api_key=st.session_state.azure_api_key,
-            azure_endpoint=st.session_state.azure_endpoint,
-            api_version=st.session_state.azure_api_version
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from embedding_cache import embedding_cache, make_key
+
+# Providers that embed queries on the client side
+QUERY_PROVIDERS = ("openai", "azure", "local")
+# How OpenAI and Azure are called: the built-in HTTP client or LangChain
+BACKENDS = ("http", "langchain")
+# Embedding clients kept open, one per distinct configuration
+MAX_PROVIDERS = 8
+
+
+@dataclass(frozen=True)
+class EmbeddingSettings:
+    """Provider, model and credentials used to embed queries.
+
+    For the ``local`` provider, ``model`` is the ONNX model directory.
+    ``backend`` picks the OpenAI/Azure client; it does not change vectors.
+    """
+
+    provider: str = "openai"
+    model: str = "text-embedding-ada-002"
+    dimensions: Optional[int] = None
+    api_key: str = ""
+    azure_endpoint: str = ""
+    azure_api_version: str = ""
+    azure_deployment: str = ""
+    backend: str = "http"
+
+
+def _get_langchain_provider(settings: EmbeddingSettings):
+    # Imported on first use: LangChain and the OpenAI SDK are slow to load
+    from langchain_community.embeddings import AzureOpenAIEmbeddings, OpenAIEmbeddings
+
+    model_kwargs = {"dimensions": settings.dimensions} if settings.dimensions else {}
+    if settings.provider == 'openai':
+        return OpenAIEmbeddings(
+            api_key=settings.api_key,
+            model=settings.model,
+            model_kwargs=model_kwargs,
+        )
+    elif settings.provider == 'azure':
+        return AzureOpenAIEmbeddings(
+            api_key=settings.api_key,
+            model=settings.model,
+            model_kwargs=model_kwargs,
+            azure_endpoint=settings.azure_endpoint,
+            api_version=settings.azure_api_version,
+            azure_deployment=settings.azure_deployment or None,
             )
-    else:
-        # Use Qdrant's built-in FastEmbed
-        return {
-            "name": "fastembed",
-            "query": query
-        }
+    raise ValueError(f"Unsupported embedding provider: {settings.provider}")
+
+
+_providers: "OrderedDict[EmbeddingSettings, Any]" = OrderedDict()
+_providers_lock = threading.Lock()
+
+
+def _get_provider(settings: EmbeddingSettings):
+    """Return the embeddings client for a configuration, building it once.
+
+    At most ``MAX_PROVIDERS`` clients are kept; the least recently used one
+    is closed when another configuration needs a slot.
+    """
+    with _providers_lock:
+        provider = _providers.get(settings)
+        if provider is not None:
+            _providers.move_to_end(settings)
+            return provider
+        provider = _build_provider(settings)
+        _providers[settings] = provider
+        while len(_providers) > MAX_PROVIDERS:
+            _, evicted = _providers.popitem(last=False)
+            _close_provider(evicted)
+        return provider
+
+
+def _close_provider(provider: Any) -> None:
+    close = getattr(provider, "close", None)
+    if close is not None:
+        close()
+
+
+def _build_provider(settings: EmbeddingSettings):
+    """Build an embeddings client for one configuration.
+
+    Provider libraries are imported here, so only the selected one is loaded.
+    """
+    if settings.provider == 'local':
+        from local_embeddings import OnnxEmbeddings
+
+        return OnnxEmbeddings(settings.model)
+    if settings.provider not in ('openai', 'azure'):
+        raise ValueError(f"Unsupported embedding provider: {settings.provider}")
+    if settings.backend == 'langchain':
+        return _get_langchain_provider(settings)
+    if settings.backend != 'http':
+        raise ValueError(f"Unsupported embedding backend: {settings.backend}")
+    from openai_embeddings import HttpEmbeddings
+
+    return HttpEmbeddings(
+        api_key=settings.api_key,
+        model=settings.model,
+        dimensions=settings.dimensions,
+        azure_endpoint=(
+            settings.azure_endpoint if settings.provider == 'azure' else ""
+        ),
+        azure_api_version=settings.azure_api_version,
+        azure_deployment=settings.azure_deployment,
+    )
+
+
+def _check_provider(settings: EmbeddingSettings) -> None:
+    if settings.provider not in QUERY_PROVIDERS:
+        raise ValueError(
+            f"Queries with the {settings.provider} provider are not supported yet"
+        )
+
+
+def _cache_model(settings: EmbeddingSettings) -> str:
+    # An Azure deployment, not the model name, decides which model embeds
+    if settings.provider == 'azure' and settings.azure_deployment:
+        return f"{settings.model}@{settings.azure_deployment}"
+    return settings.model
+
+
+def get_embeddings(query: str, settings: EmbeddingSettings) -> List[float]:
+    """Embed one query, serving repeats from the cache."""
+    _check_provider(settings)
+    key = make_key(
+        settings.provider, _cache_model(settings), settings.dimensions, query
+    )
+    vector = embedding_cache.get(key)
+    if vector is None:
+        vector = _get_provider(settings).embed_query(key.text)
+        embedding_cache.put(key, vector)
+    return vector
+
+
+def get_embeddings_batch(
+    texts: List[str], settings: EmbeddingSettings
+) -> List[List[float]]:
+    """Embed many texts, serving repeats from the cache and batching the rest."""
+    _check_provider(settings)
+    keys = [
+        make_key(settings.provider, _cache_model(settings), settings.dimensions, text)
+        for text in texts
+    ]
+    vectors = [embedding_cache.get(key) for key in keys]
+    missing = {}
+    for key, vector in zip(keys, vectors):
+        if vector is None:
+            missing.setdefault(key, None)
+    if missing:
+        embedded = _get_provider(settings).embed_documents(
+            [key.text for key in missing]
+        )
+        for key, vector in zip(missing, embedded):
+            missing[key] = vector
+        embedding_cache.put_many(list(missing.items()))
+    return [
+        vector if vector is not None else missing[key]
+        for key, vector in zip(keys, vectors)
+    ]
+
+
+def get_cache_stats() -> dict:
+    """Return hit/miss counters of the query embedding cache."""
+    return embedding_cache.stats()
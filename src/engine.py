@@ -0,0 +1,541 @@
+# engine.py
+
+import codecs
+import csv
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from qdrant_client import QdrantClient, models
+
+from embeddings import EmbeddingSettings, get_embeddings, get_embeddings_batch
+from filtering import canonical_filter, to_filter
+from result_cache import canonical_params, result_cache, vector_digest
+from schema import CollectionSchema, get_schema_discovery
+from sparse_embeddings import get_sparse_encoder
+from tracing import Tracer
+from utils import ConnectionKey, connection_manager
+
+RESULT_COLUMNS = ["row", "query", "rank", "id", "score", "payload"]
+FUSIONS = ["rrf", "dbsf"]
+
+
+def env_flag(name: str) -> bool:
+    """Read a boolean environment variable."""
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """Connection and embedding settings of a query engine."""
+
+    qdrant_url: str = ""
+    qdrant_api_key: str = ""
+    prefer_grpc: bool = False
+    embedding_type: str = "openai"
+    embedding_model: str = "text-embedding-ada-002"
+    embedding_dimensions: Optional[int] = None
+    embedding_backend: str = "http"
+    openai_api_key: str = ""
+    azure_api_key: str = ""
+    azure_endpoint: str = ""
+    azure_api_version: str = ""
+    azure_deployment: str = ""
+    local_model_dir: str = ""
+    sparse_model: str = ""
+    trace_log_path: str = ""
+
+    @classmethod
+    def from_env(cls) -> "EngineConfig":
+        """Read the configuration from environment variables."""
+        dimensions = os.getenv("EMBEDDING_DIMENSIONS", "")
+        return cls(
+            qdrant_url=os.getenv("QDRANT_URL", ""),
+            qdrant_api_key=os.getenv("QDRANT_KEY", ""),
+            prefer_grpc=env_flag("QDRANT_PREFER_GRPC"),
+            embedding_type=os.getenv("EMBEDDING_PROVIDER", "openai"),
+            embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002"),
+            embedding_dimensions=int(dimensions) if dimensions else None,
+            embedding_backend=os.getenv("EMBEDDING_BACKEND", "http"),
+            openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+            azure_api_key=os.getenv("AZURE_API_KEY", ""),
+            azure_endpoint=os.getenv("AZURE_ENDPOINT", ""),
+            azure_api_version=os.getenv("AZURE_API_VERSION", ""),
+            azure_deployment=os.getenv("AZURE_DEPLOYMENT", ""),
+            local_model_dir=os.getenv("LOCAL_EMBEDDING_MODEL_DIR", ""),
+            sparse_model=os.getenv("SPARSE_EMBEDDING_MODEL", ""),
+            trace_log_path=os.getenv("QDRANT_UI_TRACE_LOG", ""),
+        )
+
+    @property
+    def connection_key(self) -> ConnectionKey:
+        return ConnectionKey(self.qdrant_url, self.qdrant_api_key, self.prefer_grpc)
+
+    @property
+    def embedding(self) -> EmbeddingSettings:
+        if self.embedding_type == "local":
+            return EmbeddingSettings(provider="local", model=self.local_model_dir)
+        if self.embedding_type == "azure":
+            return EmbeddingSettings(
+                provider="azure",
+                model=self.embedding_model,
+                dimensions=self.embedding_dimensions,
+                api_key=self.azure_api_key,
+                azure_endpoint=self.azure_endpoint,
+                azure_api_version=self.azure_api_version,
+                azure_deployment=self.azure_deployment,
+                backend=self.embedding_backend,
+            )
+        return EmbeddingSettings(
+            provider=self.embedding_type,
+            model=self.embedding_model,
+            dimensions=self.embedding_dimensions,
+            api_key=self.openai_api_key,
+            backend=self.embedding_backend,
+        )
+
+
+def to_search_params(value: Any) -> Optional[models.SearchParams]:
+    """Convert a search params dict (or an existing model) to ``SearchParams``."""
+    if value is None or isinstance(value, models.SearchParams):
+        return value
+    return models.SearchParams.model_validate(value) if value else None
+
+
+def recommend_query(
+    positive: Sequence[Any],
+    negative: Sequence[Any] = (),
+    strategy: Optional[str] = None,
+) -> models.RecommendQuery:
+    """Build a recommend query from example point IDs (or vectors)."""
+    if not positive and not negative:
+        raise ValueError("At least one positive or negative example is required")
+    return models.RecommendQuery(
+        recommend=models.RecommendInput(
+            positive=list(positive),
+            negative=list(negative),
+            strategy=models.RecommendStrategy(strategy) if strategy else None,
+        )
+    )
+
+
+def discover_query(
+    context: Sequence[Tuple[Any, Any]], target: Any = None
+) -> Union[models.DiscoverQuery, models.ContextQuery]:
+    """Build a discovery (with target) or context (without) query."""
+    if not context:
+        raise ValueError("At least one context pair is required")
+    pairs = [
+        models.ContextPair(positive=positive, negative=negative)
+        for positive, negative in context
+    ]
+    if target is None:
+        return models.ContextQuery(context=pairs)
+    return models.DiscoverQuery(
+        discover=models.DiscoverInput(target=target, context=pairs)
+    )
+
+
+def hybrid_query(
+    dense: List[float],
+    sparse: models.SparseVector,
+    sparse_using: str,
+    dense_using: Optional[str] = None,
+    fusion: str = "rrf",
+    limit: int = 10,
+    query_filter: Optional[models.Filter] = None,
+    params: Optional[models.SearchParams] = None,
+    score_threshold: Optional[float] = None,
+) -> Tuple[models.FusionQuery, List[models.Prefetch]]:
+    """Build a fusion query over a dense and a sparse prefetch.
+
+    Both prefetches take ``limit`` candidates under the same filter; the
+    search params and score threshold only apply to the dense one.
+    """
+    prefetch = [
+        models.Prefetch(
+            query=dense,
+            using=dense_using,
+            filter=query_filter,
+            params=params,
+            score_threshold=score_threshold or None,
+            limit=limit,
+        ),
+        models.Prefetch(
+            query=sparse, using=sparse_using, filter=query_filter, limit=limit
+        ),
+    ]
+    return models.FusionQuery(fusion=models.Fusion(fusion)), prefetch
+
+
+def point_to_dict(point: Any) -> Dict[str, Any]:
+    """Return the JSON form of a scored point."""
+    return {"id": point.id, "score": point.score, "payload": point.payload}
+
+
+def iter_queries(file, file_format: str) -> Iterator[Dict[str, Any]]:
+    """Lazily read ``{"query", "filter"}`` rows from a binary CSV or JSONL file.
+
+    CSV files need a ``query`` column and may have a ``filter`` column with a
+    JSON-encoded filter. JSONL rows use the same keys.
+    """
+    file.seek(0)
+    # A StreamReader, unlike TextIOWrapper, does not close the upload when freed
+    text = codecs.getreader("utf-8")(file)
+    if file_format == "csv":
+        rows = csv.DictReader(text)
+    else:
+        rows = (json.loads(line) for line in text if line.strip())
+    for row in rows:
+        query = (row.get("query") or "").strip()
+        if not query:
+            continue
+        row_filter = row.get("filter") or None
+        if isinstance(row_filter, str):
+            row_filter = json.loads(row_filter)
+        yield {"query": query, "filter": row_filter}
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of at most ``size`` items without materializing the input."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class QueryEngine:
+    """Embeds queries, compiles filters and searches Qdrant without any UI.
+
+    The Streamlit app, the HTTP server and the CLI all go through this class.
+    An engine can be shared across threads: the pooled client, the embedding
+    providers and the caches it uses are thread-safe.
+    """
+
+    def __init__(
+        self,
+        config: EngineConfig,
+        client: Optional[QdrantClient] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        self.config = config
+        self.tracer = tracer or Tracer(
+            enabled=bool(config.trace_log_path), log_path=config.trace_log_path
+        )
+        self._owner = None
+        if client is None:
+            # Register on the shared pool so the client is closed with the engine
+            self._owner = f"engine-{uuid.uuid4().hex}"
+            client = connection_manager.acquire(config.connection_key, self._owner)
+        self.client = client
+
+    @classmethod
+    def from_env(cls) -> "QueryEngine":
+        return cls(EngineConfig.from_env())
+
+    @property
+    def namespace(self) -> Tuple[str, str]:
+        """Scope of this engine's entries in the shared result cache."""
+        return (self.config.qdrant_url, self.config.qdrant_api_key)
+
+    def close(self) -> None:
+        """Release the pooled client if this engine acquired it."""
+        if self._owner is not None:
+            connection_manager.release(self.config.connection_key, self._owner)
+            self._owner = None
+
+    def collection_names(self) -> List[str]:
+        return get_schema_discovery(self.client).collection_names()
+
+    def schema(self, collection_name: str) -> CollectionSchema:
+        return get_schema_discovery(self.client).get_schema(collection_name)
+
+    def check_dimension(
+        self, collection_name: str, vector: List[float], using: Optional[str] = None
+    ) -> None:
+        """Raise if ``vector`` does not fit the collection's (named) vector."""
+        expected = self.schema(collection_name).vector_sizes.get(using or "")
+        if expected is not None and len(vector) != expected:
+            raise ValueError(
+                f"The query vector has {len(vector)} dimensions but collection "
+                f"'{collection_name}' expects {expected}; check the embedding model"
+            )
+
+    def embed(self, text: str) -> List[float]:
+        with self.tracer.stage("embedding"):
+            return get_embeddings(text, self.config.embedding)
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        with self.tracer.stage("batch_embedding") as span:
+            vectors = get_embeddings_batch(texts, self.config.embedding)
+            span.set(hits=len(vectors))
+        return vectors
+
+    @property
+    def sparse_encoder(self):
+        return get_sparse_encoder(self.config.sparse_model)
+
+    def embed_sparse(self, text: str) -> models.SparseVector:
+        with self.tracer.stage("sparse_embedding") as span:
+            vector = self.sparse_encoder.embed_query(text)
+            span.set(hits=len(vector.indices))
+        return vector
+
+    def search(
+        self,
+        collection_name: str,
+        query: Union[List[float], models.Query],
+        query_filter: Any = None,
+        limit: int = 10,
+        offset: int = 0,
+        score_threshold: Optional[float] = None,
+        params: Any = None,
+        with_payload: Any = True,
+        using: Optional[str] = None,
+        prefetch: Optional[List[models.Prefetch]] = None,
+        use_cache: bool = True,
+    ) -> Tuple[List[Any], bool]:
+        """Search through the shared result cache; returns ``(points, hit)``.
+
+        ``query`` is a dense vector or a Qdrant query model such as the ones
+        built by ``recommend``, ``discover`` and ``hybrid_query``. ``using``
+        names the vector to search in collections with named vectors, and
+        ``prefetch`` holds the sub-queries a fusion query combines. With
+        ``use_cache=False`` the server is always queried (for timing).
+        """
+        if isinstance(query, list):
+            self.check_dimension(collection_name, query, using)
+            query_key = vector_digest(query)
+        else:
+            query_key = canonical_params(query)
+        if prefetch:
+            digest = hashlib.sha1()
+            for item in prefetch:
+                digest.update(canonical_params(item).encode("utf-8"))
+            query_key = f"{query_key}|{digest.hexdigest()}"
+        query_filter = to_filter(query_filter)
+        params = to_search_params(params)
+        with self.tracer.stage("search") as span:
+            version = result_cache.collection_version(
+                self.client, self.namespace, collection_name
+            )
+            key = (
+                self.namespace,
+                collection_name,
+                f"{using or ''}:{query_key}",
+                canonical_filter(query_filter),
+                offset,
+                limit,
+                score_threshold or None,
+                canonical_params(params),
+                canonical_params(with_payload),
+            )
+            points = result_cache.get(key, version) if use_cache else None
+            hit = points is not None
+            if not hit:
+                points = self.client.query_points(
+                    collection_name=collection_name,
+                    query=query,
+                    using=using,
+                    prefetch=prefetch,
+                    query_filter=query_filter,
+                    limit=limit,
+                    offset=offset,
+                    score_threshold=score_threshold or None,
+                    search_params=params,
+                    with_payload=with_payload,
+                ).points
+                result_cache.put(key, version, points)
+            span.set_points(points)
+        return points, hit
+
+    def query(
+        self, collection_name: str, text: str, **kwargs: Any
+    ) -> List[Any]:
+        """Embed ``text`` and search; keyword arguments go to ``search``."""
+        points, _ = self.search(collection_name, self.embed(text), **kwargs)
+        return points
+
+    def recommend(
+        self,
+        collection_name: str,
+        positive: Sequence[Any],
+        negative: Sequence[Any] = (),
+        strategy: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Tuple[List[Any], bool]:
+        """Find points similar to ``positive`` and unlike ``negative`` point IDs.
+
+        The stored vectors are used, so nothing is embedded. Keyword
+        arguments (filter, paging, ``using``...) go to ``search``.
+        """
+        return self.search(
+            collection_name,
+            recommend_query(positive, negative, strategy),
+            **kwargs,
+        )
+
+    def discover(
+        self,
+        collection_name: str,
+        context: Sequence[Tuple[Any, Any]],
+        target: Any = None,
+        **kwargs: Any,
+    ) -> Tuple[List[Any], bool]:
+        """Search within the space bounded by ``(positive, negative)`` ID pairs.
+
+        With a ``target`` point ID (or vector), results are points close to
+        it that satisfy the context; without one, a context search is run.
+        """
+        return self.search(collection_name, discover_query(context, target), **kwargs)
+
+    def hybrid(
+        self,
+        collection_name: str,
+        text: str,
+        sparse_using: str,
+        using: Optional[str] = None,
+        fusion: str = "rrf",
+        query_filter: Any = None,
+        limit: int = 10,
+        params: Any = None,
+        score_threshold: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Tuple[List[Any], bool]:
+        """Dense plus sparse search of ``text``, fused on the server.
+
+        ``using`` names the dense vector and ``sparse_using`` the sparse one.
+        Other keyword arguments (paging, payload...) go to ``search``.
+        """
+        dense = self.embed(text)
+        self.check_dimension(collection_name, dense, using)
+        query_filter = to_filter(query_filter)
+        query, prefetch = hybrid_query(
+            dense,
+            self.embed_sparse(text),
+            sparse_using,
+            using,
+            fusion,
+            limit + kwargs.get("offset", 0),
+            query_filter,
+            to_search_params(params),
+            score_threshold,
+        )
+        return self.search(
+            collection_name,
+            query,
+            query_filter,
+            limit=limit,
+            prefetch=prefetch,
+            **kwargs,
+        )
+
+    def search_many(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        filters: List[Any],
+        limit: int,
+        score_threshold: Optional[float] = None,
+        params: Any = None,
+        using: Optional[str] = None,
+    ) -> List[List[Any]]:
+        """Search many vectors, each with its own filter, in one request.
+
+        ``using`` names the vector to search in collections with named vectors.
+        """
+        for vector in vectors[:1]:
+            # Vectors of one request come from the same model
+            self.check_dimension(collection_name, vector, using)
+        params = to_search_params(params)
+        requests = [
+            models.QueryRequest(
+                query=vector,
+                using=using,
+                filter=to_filter(query_filter),
+                limit=limit,
+                score_threshold=score_threshold or None,
+                params=params,
+                with_payload=True,
+            )
+            for vector, query_filter in zip(vectors, filters)
+        ]
+        with self.tracer.stage("batch_search") as span:
+            responses = self.client.query_batch_points(
+                collection_name=collection_name, requests=requests
+            )
+            span.set(hits=sum(len(response.points) for response in responses))
+        return [response.points for response in responses]
+
+    def search_batch(
+        self,
+        collection_name: str,
+        rows: Iterable[Dict[str, Any]],
+        limit: int,
+        score_threshold: Optional[float] = None,
+        default_filter: Any = None,
+        chunk_size: int = 64,
+        requests_per_minute: Optional[int] = None,
+        params: Any = None,
+        using: Optional[str] = None,
+    ) -> Iterator[Tuple[int, List[List[Any]]]]:
+        """Embed and search ``{"query", "filter"}`` rows chunk by chunk.
+
+        Each chunk costs one embedding request and one ``query_batch_points``
+        call. ``requests_per_minute`` spaces out embedding requests to stay
+        within provider rate limits. ``using`` names the vector to search.
+        Yields ``(queries_done, result_rows)`` after every chunk, with rows
+        laid out as ``RESULT_COLUMNS``.
+        """
+        default_filter = to_filter(default_filter)
+        min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        last_request = 0.0
+        row_number = 0
+        for chunk in chunked(rows, chunk_size):
+            wait = min_interval - (time.monotonic() - last_request)
+            if wait > 0:
+                time.sleep(wait)
+            last_request = time.monotonic()
+            vectors = self.embed_batch([row["query"] for row in chunk])
+            results = self.search_many(
+                collection_name,
+                vectors,
+                [row.get("filter") or default_filter for row in chunk],
+                limit,
+                score_threshold,
+                params,
+                using,
+            )
+
+            result_rows = []
+            for row, points in zip(chunk, results):
+                for rank, point in enumerate(points, start=1):
+                    result_rows.append(
+                        [
+                            row_number,
+                            row["query"],
+                            rank,
+                            str(point.id),
+                            point.score,
+                            json.dumps(point.payload, default=str),
+                        ]
+                    )
+                row_number += 1
+            yield row_number, result_rows
@@ -0,0 +1,390 @@
+# explorer.py
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import streamlit as st
+from qdrant_client import QdrantClient, models
+
+from engine import QueryEngine
+from filtering import canonical_filter
+from result_cache import result_cache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PAGE_SIZE = 1000
+# "auto" uses randomized SVD from this many dimensions on; below it the
+# d x d covariance and its eigendecomposition are cheap and exact
+RANDOMIZED_MIN_DIMENSIONS = 512
+MAX_COLOR_VALUES = 10
+MAX_OVERLAID_HITS = 100
+
+
+@dataclass
+class Projection:
+    """2-D coordinates of a vector sample and the map that produced them."""
+
+    ids: List[Any]
+    coords: np.ndarray
+    mean: np.ndarray
+    components: np.ndarray
+    explained: Tuple[float, float]
+    method: str
+    # Result cache key, extended to cache payload columns of the sample
+    key: Tuple = ()
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """Project vectors that were not in the sample."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return (vectors - self.mean) @ self.components.T
+
+
+def _vector(record: Any, using: Optional[str]) -> Optional[List[float]]:
+    vector = record.vector
+    if isinstance(vector, dict):
+        vector = vector.get(using or "")
+    return vector if isinstance(vector, list) else None
+
+
+def sample_vectors(
+    client: QdrantClient,
+    collection_name: str,
+    size: int,
+    dim: int,
+    using: Optional[str] = None,
+    query_filter: Optional[models.Filter] = None,
+    page_size: int = PAGE_SIZE,
+) -> Tuple[List[Any], np.ndarray]:
+    """Stream up to ``size`` vectors into one preallocated float32 matrix.
+
+    Each scroll page is written into its slice of the matrix in a single
+    assignment, and only the requested vector is fetched, without payloads.
+    """
+    matrix = np.empty((size, dim), dtype=np.float32)
+    ids: List[Any] = []
+    offset = None
+    with_vectors = [using] if using else True
+    while len(ids) < size:
+        records, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=query_filter,
+            limit=min(page_size, size - len(ids)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=with_vectors,
+        )
+        vectors = [_vector(record, using) for record in records]
+        page = [i for i, vector in enumerate(vectors) if vector is not None]
+        if page:
+            start = len(ids)
+            matrix[start : start + len(page)] = [vectors[i] for i in page]
+            ids.extend(records[i].id for i in page)
+        if offset is None or not records:
+            break
+    return ids, matrix[: len(ids)]
+
+
+def pca_components(x: np.ndarray, k: int = 2) -> np.ndarray:
+    """Top ``k`` principal axes of centered ``x`` from its d x d covariance."""
+    _, vectors = np.linalg.eigh(x.T @ x)
+    return vectors[:, ::-1][:, :k].T
+
+
+def randomized_components(
+    x: np.ndarray, k: int = 2, oversample: int = 10, iterations: int = 4, seed: int = 0
+) -> np.ndarray:
+    """Top ``k`` right singular vectors of ``x`` by randomized range finding.
+
+    Costs a few passes of ``n x d x (k + oversample)`` products instead of
+    the ``n x d x d`` covariance.
+    """
+    rng = np.random.default_rng(seed)
+    omega = rng.standard_normal((x.shape[1], k + oversample), dtype=np.float32)
+    q, _ = np.linalg.qr(x @ omega)
+    for _ in range(iterations):
+        q, _ = np.linalg.qr(x.T @ q)
+        q, _ = np.linalg.qr(x @ q)
+    _, _, vt = np.linalg.svd(q.T @ x, full_matrices=False)
+    return vt[:k]
+
+
+def project(ids: List[Any], x: np.ndarray, method: str = "auto") -> Projection:
+    """Project a sample to 2-D; ``x`` is centered in place."""
+    if method == "auto":
+        wide = x.shape[1] >= RANDOMIZED_MIN_DIMENSIONS
+        method = "randomized" if wide else "pca"
+    mean = x.mean(axis=0)
+    x -= mean
+    if method == "randomized":
+        components = randomized_components(x)
+    else:
+        components = pca_components(x)
+    # Fix the sign so the same data always gives the same picture
+    signs = np.sign(components[np.arange(2), np.abs(components).argmax(axis=1)])
+    components = (components * signs[:, None]).astype(np.float32)
+    coords = x @ components.T
+    total = float(np.einsum("ij,ij->", x, x)) or 1.0
+    explained = tuple(float(v) for v in (coords * coords).sum(axis=0) / total)
+    return Projection(ids, coords, mean, components, explained, method)
+
+
+def cached_projection(
+    engine: QueryEngine,
+    collection_name: str,
+    size: int,
+    using: Optional[str] = None,
+    query_filter: Optional[models.Filter] = None,
+    method: str = "auto",
+) -> Tuple[Projection, bool]:
+    """Sample and project through the result cache; returns ``(projection, hit)``.
+
+    The projection is recomputed when the collection version changes.
+    """
+    version = result_cache.collection_version(
+        engine.client, engine.namespace, collection_name
+    )
+    key = (
+        engine.namespace,
+        collection_name,
+        "projection",
+        using or "",
+        size,
+        method,
+        canonical_filter(query_filter),
+    )
+    projection = result_cache.get(key, version)
+    if projection is not None:
+        return projection, True
+    dim = engine.schema(collection_name).vector_sizes.get(using or "")
+    if dim is None:
+        raise ValueError(f"Collection '{collection_name}' has no dense vector to plot")
+    with engine.tracer.stage("explorer_sample") as span:
+        ids, matrix = sample_vectors(
+            engine.client, collection_name, size, dim, using, query_filter
+        )
+        span.set(hits=len(ids), bytes=matrix.nbytes)
+    if len(ids) < 3:
+        raise ValueError("At least 3 points with vectors are needed to plot")
+    with engine.tracer.stage("explorer_projection"):
+        projection = project(ids, matrix, method)
+    projection.key = key
+    result_cache.put(key, version, projection)
+    return projection, False
+
+
+def payload_column(
+    engine: QueryEngine,
+    collection_name: str,
+    projection: Projection,
+    key: str,
+) -> List[Any]:
+    """Values of payload ``key`` for the sampled points, cached with the sample."""
+    version = result_cache.collection_version(
+        engine.client, engine.namespace, collection_name
+    )
+    cache_key = projection.key + ("payload", key)
+    column = result_cache.get(cache_key, version)
+    if column is not None:
+        return column
+    ids = projection.ids
+    values: Dict[Any, Any] = {}
+    for start in range(0, len(ids), PAGE_SIZE):
+        records = engine.client.retrieve(
+            collection_name=collection_name,
+            ids=ids[start : start + PAGE_SIZE],
+            with_payload=models.PayloadSelectorInclude(include=[key]),
+            with_vectors=False,
+        )
+        for record in records:
+            values[record.id] = (record.payload or {}).get(key)
+    column = [values.get(point_id) for point_id in ids]
+    result_cache.put(cache_key, version, column)
+    return column
+
+
+def _color_values(values: List[Any], numeric: bool) -> List[Any]:
+    import pandas as pd
+
+    if numeric:
+        return [v if isinstance(v, (int, float)) else None for v in values]
+    labels = ["(none)" if v is None else str(v) for v in values]
+    top = set(pd.Series(labels).value_counts().index[:MAX_COLOR_VALUES])
+    return [label if label in top else "(other)" for label in labels]
+
+
+def _overlay(
+    engine: QueryEngine,
+    projection: Projection,
+    request: Dict[str, Any],
+    using: Optional[str],
+) -> "pd.DataFrame":
+    """Coordinates of the current query vector and its top hits."""
+    import pandas as pd
+
+    rows = []
+    query = request["query"] if isinstance(request["query"], list) else None
+    query = request.get("dense", query)
+    if query is not None:
+        x, y = projection.transform(np.array([query]))[0]
+        rows.append({"x": x, "y": y, "kind": "query", "id": "query", "rank": 0})
+
+    points, _ = engine.search(
+        request["collection"],
+        request["query"],
+        request["filter"],
+        limit=min(request["limit"], MAX_OVERLAID_HITS),
+        score_threshold=request["score_threshold"],
+        params=request.get("params"),
+        with_payload=False,
+        using=request.get("using"),
+        prefetch=request.get("prefetch"),
+    )
+    hit_ids = [point.id for point in points]
+    row_of = {point_id: i for i, point_id in enumerate(projection.ids)}
+    missing = [point_id for point_id in hit_ids if point_id not in row_of]
+    vectors = {}
+    if missing:
+        records = engine.client.retrieve(
+            collection_name=request["collection"],
+            ids=missing,
+            with_payload=False,
+            with_vectors=[using] if using else True,
+        )
+        for record in records:
+            vector = _vector(record, using)
+            if vector is not None:
+                vectors[record.id] = vector
+        if vectors:
+            projected = projection.transform(np.array(list(vectors.values())))
+            vectors = dict(zip(vectors, projected))
+    for rank, point_id in enumerate(hit_ids, start=1):
+        if point_id in row_of:
+            x, y = projection.coords[row_of[point_id]]
+        elif point_id in vectors:
+            x, y = vectors[point_id]
+        else:
+            continue
+        rows.append({"x": x, "y": y, "kind": "hit", "id": str(point_id), "rank": rank})
+    return pd.DataFrame(rows, columns=["x", "y", "kind", "id", "rank"])
+
+
+def create_explorer_interface(
+    engine: QueryEngine,
+    collection_name: str,
+    filter_clause: Optional[models.Filter],
+    field_types: Dict[str, str],
+):
+    """Plot a 2-D projection of sampled vectors with the last search overlaid."""
+    schema = engine.schema(collection_name)
+    vector_names = list(schema.vector_sizes)
+    if not vector_names:
+        st.write("This collection has no dense vectors to plot")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        size = st.number_input(
+            "Sample size",
+            min_value=100,
+            max_value=100000,
+            value=5000,
+            step=1000,
+            key="explorer_size",
+        )
+    with col2:
+        method = st.selectbox(
+            "Projection", ["auto", "pca", "randomized"], key="explorer_method"
+        )
+    with col3:
+        using = (
+            st.selectbox("Vector", vector_names, key="explorer_using")
+            if vector_names != [""]
+            else ""
+        )
+    with col4:
+        color_key = st.selectbox(
+            "Color by",
+            [None] + sorted(field_types),
+            format_func=lambda key: "(none)" if key is None else key,
+            key="explorer_color",
+        )
+    apply_filter = st.checkbox(
+        "Sample only points matching the filter", key="explorer_filter"
+    )
+
+    if not st.toggle("Show plot", key="explorer_show"):
+        return
+    # Plotting libraries load on first use, not at app start
+    import altair as alt
+    import pandas as pd
+
+    try:
+        projection, hit = cached_projection(
+            engine,
+            collection_name,
+            int(size),
+            using or None,
+            filter_clause if apply_filter else None,
+            method,
+        )
+    except Exception as e:
+        st.error(f"Error projecting vectors: {str(e)}")
+        return
+    st.caption(
+        f"{len(projection.ids)} points · {projection.method} · explained "
+        f"variance {projection.explained[0]:.1%} + {projection.explained[1]:.1%}"
+        f"{' · cached' if hit else ''}"
+    )
+
+    frame = pd.DataFrame(
+        {
+            "x": projection.coords[:, 0],
+            "y": projection.coords[:, 1],
+            "id": [str(point_id) for point_id in projection.ids],
+        }
+    )
+    layers = []
+    if color_key:
+        numeric = field_types.get(color_key) in ("integer", "float")
+        try:
+            values = payload_column(engine, collection_name, projection, color_key)
+        except Exception as e:
+            st.error(f"Error reading payload values: {str(e)}")
+            return
+        frame[color_key] = _color_values(values, numeric)
+        color = alt.Color(
+            f"{color_key}:{'Q' if numeric else 'N'}", legend=alt.Legend(title=color_key)
+        )
+    else:
+        color = alt.value("#4c78a8")
+    tooltip = ["id"] + ([color_key] if color_key else [])
+    layers.append(
+        alt.Chart(frame)
+        .mark_circle(size=12, opacity=0.5)
+        .encode(x="x:Q", y="y:Q", color=color, tooltip=tooltip)
+    )
+
+    request = st.session_state.get("search_request")
+    if request and request["collection"] == collection_name:
+        try:
+            overlay = _overlay(engine, projection, request, using or None)
+        except Exception as e:
+            st.error(f"Error overlaying the search results: {str(e)}")
+            overlay = None
+        if overlay is not None and len(overlay):
+            hits = overlay[overlay["kind"] == "hit"]
+            layers.append(
+                alt.Chart(hits)
+                .mark_point(size=80, filled=False, color="black")
+                .encode(x="x:Q", y="y:Q", tooltip=["id", "rank"])
+            )
+            layers.append(
+                alt.Chart(overlay[overlay["kind"] == "query"])
+                .mark_point(shape="diamond", size=200, filled=True, color="red")
+                .encode(x="x:Q", y="y:Q", tooltip=["id"])
+            )
+            st.caption("Red diamond: query vector · black circles: its top hits")
+
+    st.altair_chart(alt.layer(*layers).interactive())
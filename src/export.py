@@ -0,0 +1,238 @@
+# export.py
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+import streamlit as st
+from qdrant_client import QdrantClient, models
+
+from filtering import to_filter
+from utils import remove_file
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Files larger than this are only written to disk, not offered for download
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024
+
+
+@dataclass
+class ExportProgress:
+    """Running totals reported after each exported page."""
+
+    points: int
+    pages: int
+    elapsed: float
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.elapsed if self.elapsed else 0.0
+
+
+def dense_vector_names(client: QdrantClient, collection_name: str) -> List[str]:
+    """Return the dense vector names of a collection ("" for an unnamed vector)."""
+    vectors = client.get_collection(collection_name).config.params.vectors
+    if isinstance(vectors, dict):
+        return [
+            name
+            for name, params in vectors.items()
+            if params.multivector_config is None
+        ]
+    return [""]
+
+
+def vector_column(name: str) -> str:
+    """Return the column name for a dense vector."""
+    return f"vector.{name}" if name else "vector"
+
+
+def build_schema(fmt: str, vector_names: Optional[List[str]]) -> "pa.Schema":
+    """Return the Arrow schema for exported points.
+
+    Dense vectors are stored as ``list<float32>`` in Parquet. CSV cannot hold
+    list columns, so there (and for sparse/multi vectors) they are JSON text.
+    """
+    import pyarrow as pa
+
+    fields = [pa.field("id", pa.string()), pa.field("payload", pa.string())]
+    if vector_names is not None:
+        vector_type = pa.list_(pa.float32()) if fmt == "parquet" else pa.string()
+        for name in vector_names:
+            fields.append(pa.field(vector_column(name), vector_type))
+        fields.append(pa.field("vector.other", pa.string()))
+    return pa.schema(fields)
+
+
+def _jsonable(vector: Any) -> Any:
+    return vector.model_dump() if hasattr(vector, "model_dump") else vector
+
+
+def records_to_batch(
+    records: List[Any],
+    schema: "pa.Schema",
+    vector_names: Optional[List[str]],
+    fmt: str = "parquet",
+) -> "pa.RecordBatch":
+    """Convert one page of scrolled records to an Arrow record batch."""
+    import pyarrow as pa
+
+    columns: Dict[str, List[Any]] = {
+        "id": [str(record.id) for record in records],
+        "payload": [json.dumps(record.payload, default=str) for record in records],
+    }
+    if vector_names is not None:
+        dense: Dict[str, List[Any]] = {name: [] for name in vector_names}
+        other: List[Optional[str]] = []
+        for record in records:
+            vectors = record.vector
+            if not isinstance(vectors, dict):
+                vectors = {"": vectors}
+            for name, values in dense.items():
+                vector = vectors.get(name)
+                if fmt != "parquet" and vector is not None:
+                    vector = json.dumps(vector)
+                values.append(vector)
+            extra = {
+                name: _jsonable(vector)
+                for name, vector in vectors.items()
+                if name not in dense
+            }
+            other.append(json.dumps(extra) if extra else None)
+        for name, values in dense.items():
+            columns[vector_column(name)] = values
+        columns["vector.other"] = other
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def export_points(
+    client: QdrantClient,
+    collection_name: str,
+    path: str,
+    fmt: str = "parquet",
+    scroll_filter: Optional[models.Filter] = None,
+    with_vectors: bool = False,
+    page_size: int = 1000,
+) -> Iterator[ExportProgress]:
+    """Stream every point matching ``scroll_filter`` into a Parquet or CSV file.
+
+    The next page is fetched in a background thread while the current one is
+    converted and written, so at most two pages are held in memory.
+    """
+    vector_names = None
+    if with_vectors:
+        vector_names = dense_vector_names(client, collection_name)
+    schema = build_schema(fmt, vector_names)
+
+    def scroll(offset):
+        return client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=page_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors,
+        )
+
+    # pyarrow is only loaded once an export runs
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        import pyarrow.csv as pa_csv
+
+        writer = pa_csv.CSVWriter(path, schema)
+
+    started = time.monotonic()
+    points = pages = 0
+    with writer, ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(scroll, None)
+        while future is not None:
+            records, next_offset = future.result()
+            future = None
+            if next_offset is not None:
+                future = executor.submit(scroll, next_offset)
+            if records:
+                writer.write_batch(records_to_batch(records, schema, vector_names, fmt))
+            points += len(records)
+            pages += 1
+            yield ExportProgress(points, pages, time.monotonic() - started)
+
+
+def create_export_interface(
+    client: QdrantClient, collection_name: str, filter_clause: Any
+):
+    """Create the export tab: stream all filtered points to a file on disk.
+
+    Each export goes to a new temporary file; the session's previous export
+    and any partially written file are deleted.
+    """
+    st.write(
+        "Export every point matching the current filter. Pages are streamed "
+        "to disk, so memory use stays flat regardless of collection size."
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        fmt = st.selectbox("Format", ["parquet", "csv"])
+    with col2:
+        page_size = st.number_input(
+            "Page size",
+            min_value=10,
+            max_value=10000,
+            value=1000,
+            key="export_page_size",
+        )
+    with col3:
+        with_vectors = st.checkbox("Include vectors")
+
+    if st.button("Export"):
+        remove_file(st.session_state.pop("export_path", None))
+        fd, path = tempfile.mkstemp(prefix="qdrant-export-", suffix=f".{fmt}")
+        os.close(fd)
+        try:
+            scroll_filter = to_filter(filter_clause)
+            total = client.count(
+                collection_name=collection_name,
+                count_filter=scroll_filter,
+                exact=False,
+            ).count
+            progress = st.progress(0.0)
+            status = st.empty()
+            for step in export_points(
+                client,
+                collection_name,
+                path,
+                fmt=fmt,
+                scroll_filter=scroll_filter,
+                with_vectors=with_vectors,
+                page_size=int(page_size),
+            ):
+                progress.progress(min(step.points / total, 1.0) if total else 1.0)
+                status.write(
+                    f"Exported {step.points:,} points in {step.elapsed:.1f}s "
+                    f"({step.points_per_second:,.0f} points/s)"
+                )
+        except Exception as e:
+            st.error(f"Error during export: {str(e)}")
+            remove_file(path)
+            return
+        progress.progress(1.0)
+        st.session_state.export_path = path
+        st.session_state.export_file_name = f"{collection_name}.{fmt}"
+        st.success(f"Export written to {path}")
+
+    path = st.session_state.get("export_path")
+    if path and os.path.exists(path) and os.path.getsize(path) <= MAX_DOWNLOAD_BYTES:
+        with open(path, "rb") as f:
+            st.download_button(
+                "Download Export",
+                data=f,
+                file_name=st.session_state.get(
+                    "export_file_name", os.path.basename(path)
+                ),
+            )
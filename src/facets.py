@@ -0,0 +1,443 @@
+# facets.py
+
+import bisect
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+from qdrant_client import QdrantClient, models
+
+from engine import QueryEngine
+from filtering import canonical_filter
+from filters import add_filter_condition
+from result_cache import result_cache
+
+# Types Qdrant's facet API counts (it needs a keyword/integer/bool/uuid index)
+VALUE_TYPES = {"keyword", "uuid", "bool"}
+HISTOGRAM_TYPES = {"integer", "float"}
+# Bounds of the client-side fallback scan
+MAX_SCAN_POINTS = 50000
+SCAN_PAGE_SIZE = 1000
+MAX_TRACKED_VALUES = 10000
+RESERVOIR_SIZE = 10000
+
+
+@dataclass
+class Facet:
+    """Value counts or histogram buckets of one payload key.
+
+    ``buckets`` holds ``(value, count)`` pairs for value facets and
+    ``((low, high), count)`` pairs for histograms.
+    """
+
+    key: str
+    kind: str
+    buckets: List[Tuple[Any, int]] = field(default_factory=list)
+    source: str = "server"
+    approximate: bool = False
+
+
+def facet_kind(field_type: Optional[str]) -> Optional[str]:
+    """Return ``"values"``, ``"histogram"`` or ``None`` for a payload type."""
+    if field_type in HISTOGRAM_TYPES:
+        return "histogram"
+    if field_type in VALUE_TYPES:
+        return "values"
+    return None
+
+
+def _and(query_filter: Optional[models.Filter], condition: models.Condition):
+    must = [condition] if query_filter is None else [query_filter, condition]
+    return models.Filter(must=must)
+
+
+def histogram_edges(low: float, high: float, bins: int, integer: bool) -> List[float]:
+    """Split ``[low, high]`` into at most ``bins`` equal buckets."""
+    if integer:
+        width = max(1, -(-(int(high) - int(low) + 1) // bins))
+        edges = list(range(int(low), int(high) + 1, width)) + [int(high) + 1]
+        return [float(edge) for edge in edges]
+    if high == low:
+        return [low, high]
+    width = (high - low) / bins
+    return [low + i * width for i in range(bins)] + [high]
+
+
+def _bucket_range(edges: List[float], i: int, integer: bool) -> models.Range:
+    # Integer buckets are closed [low, high - 1]; the last float bucket is closed
+    if integer:
+        return models.Range(gte=edges[i], lte=edges[i + 1] - 1)
+    if i == len(edges) - 2:
+        return models.Range(gte=edges[i], lte=edges[i + 1])
+    return models.Range(gte=edges[i], lt=edges[i + 1])
+
+
+def _bucket_label(edges: List[float], i: int, integer: bool) -> Tuple[float, float]:
+    if integer:
+        return (int(edges[i]), int(edges[i + 1]) - 1)
+    return (edges[i], edges[i + 1])
+
+
+def server_value_facet(
+    client: QdrantClient,
+    collection_name: str,
+    key: str,
+    query_filter: Optional[models.Filter],
+    limit: int,
+    exact: bool = False,
+) -> Facet:
+    """Top values of ``key`` via Qdrant's facet API."""
+    response = client.facet(
+        collection_name=collection_name,
+        key=key,
+        facet_filter=query_filter,
+        limit=limit,
+        exact=exact,
+    )
+    return Facet(
+        key,
+        "values",
+        [(hit.value, hit.count) for hit in response.hits],
+        approximate=not exact,
+    )
+
+
+def server_histogram(
+    client: QdrantClient,
+    collection_name: str,
+    key: str,
+    query_filter: Optional[models.Filter],
+    bins: int,
+    integer: bool,
+    exact: bool = False,
+) -> Facet:
+    """Bucket counts of a numeric key: bounds via ``order_by``, one count per bucket.
+
+    ``order_by`` needs a range payload index on servers, so this raises for
+    unindexed keys and callers fall back to a scan.
+    """
+    bounds = []
+    for direction in (models.Direction.ASC, models.Direction.DESC):
+        records, _ = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=query_filter,
+            limit=1,
+            order_by=models.OrderBy(key=key, direction=direction),
+            with_payload=models.PayloadSelectorInclude(include=[key]),
+        )
+        if not records:
+            return Facet(key, "histogram")
+        bounds.append(records[0].order_value)
+    edges = histogram_edges(bounds[0], bounds[1], bins, integer)
+    buckets = []
+    for i in range(len(edges) - 1):
+        count = client.count(
+            collection_name=collection_name,
+            count_filter=_and(
+                query_filter,
+                models.FieldCondition(key=key, range=_bucket_range(edges, i, integer)),
+            ),
+            exact=exact,
+        ).count
+        buckets.append((_bucket_label(edges, i, integer), count))
+    return Facet(key, "histogram", buckets, approximate=not exact)
+
+
+class BoundedCounter:
+    """Counts hashable values while tracking at most ``capacity`` of them.
+
+    When the limit is hit, the less frequent half is dropped, so counts of
+    rare values can be underestimated; ``pruned`` tells whether that happened.
+    """
+
+    def __init__(self, capacity: int = MAX_TRACKED_VALUES):
+        self.capacity = capacity
+        self.counts: Counter = Counter()
+        self.pruned = False
+
+    def add(self, value: Any) -> None:
+        self.counts[value] += 1
+        if len(self.counts) > self.capacity:
+            self.counts = Counter(dict(self.counts.most_common(self.capacity // 2)))
+            self.pruned = True
+
+
+class Reservoir:
+    """Uniform sample of at most ``size`` numbers from a stream."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self.sample: List[float] = []
+        self._random = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        self.seen += 1
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            slot = self._random.randrange(self.seen)
+            if slot < self.size:
+                self.sample[slot] = value
+
+
+def _values(value: Any) -> List[Any]:
+    return value if isinstance(value, list) else [value]
+
+
+def scan_facets(
+    client: QdrantClient,
+    collection_name: str,
+    kinds: Dict[str, str],
+    query_filter: Optional[models.Filter],
+    limit: int,
+    bins: int,
+    integer_keys: Tuple[str, ...] = (),
+    max_points: int = MAX_SCAN_POINTS,
+    page_size: int = SCAN_PAGE_SIZE,
+) -> Dict[str, Facet]:
+    """Aggregate facets client-side over scroll pages with bounded memory.
+
+    Only the faceted keys are fetched. Value counts use a ``BoundedCounter``
+    and histograms a fixed-size reservoir sample scaled to the points seen.
+    At most ``max_points`` points are read.
+    """
+    counters = {key: BoundedCounter() for key in kinds if kinds[key] == "values"}
+    reservoirs = {key: Reservoir() for key in kinds if kinds[key] == "histogram"}
+    scanned = 0
+    offset = None
+    truncated = False
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=query_filter,
+            limit=min(page_size, max_points - scanned),
+            offset=offset,
+            with_payload=models.PayloadSelectorInclude(include=list(kinds)),
+            with_vectors=False,
+        )
+        for record in records:
+            payload = record.payload or {}
+            for key, counter in counters.items():
+                for value in _values(payload.get(key)):
+                    if isinstance(value, (str, int, float, bool)):
+                        counter.add(value)
+            for key, reservoir in reservoirs.items():
+                for value in _values(payload.get(key)):
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        reservoir.add(value)
+        scanned += len(records)
+        if offset is None or not records:
+            break
+        if scanned >= max_points:
+            truncated = True
+            break
+
+    facets = {}
+    for key, counter in counters.items():
+        facets[key] = Facet(
+            key,
+            "values",
+            counter.counts.most_common(limit),
+            source="scan",
+            approximate=truncated or counter.pruned,
+        )
+    for key, reservoir in reservoirs.items():
+        facet = Facet(key, "histogram", source="scan", approximate=truncated)
+        if reservoir.sample:
+            integer = key in integer_keys
+            edges = histogram_edges(
+                min(reservoir.sample), max(reservoir.sample), bins, integer
+            )
+            counts = [0] * (len(edges) - 1)
+            for value in reservoir.sample:
+                i = min(bisect.bisect_right(edges, value) - 1, len(counts) - 1)
+                counts[i] += 1
+            scale = reservoir.seen / len(reservoir.sample)
+            facet.approximate = facet.approximate or scale > 1
+            facet.buckets = [
+                (_bucket_label(edges, i, integer), round(count * scale))
+                for i, count in enumerate(counts)
+            ]
+        facets[key] = facet
+    return facets
+
+
+def compute_facets(
+    client: QdrantClient,
+    collection_name: str,
+    field_types: Dict[str, str],
+    query_filter: Optional[models.Filter],
+    limit: int = 10,
+    bins: int = 10,
+) -> Dict[str, Facet]:
+    """Facet each key server-side, scanning for the keys the server can't serve."""
+    facets: Dict[str, Facet] = {}
+    fallback: Dict[str, str] = {}
+    for key, field_type in field_types.items():
+        kind = facet_kind(field_type)
+        try:
+            if kind == "histogram":
+                facets[key] = server_histogram(
+                    client,
+                    collection_name,
+                    key,
+                    query_filter,
+                    bins,
+                    field_type == "integer",
+                )
+            else:
+                facets[key] = server_value_facet(
+                    client, collection_name, key, query_filter, limit
+                )
+        except Exception:
+            # Missing payload index or an older server without the API
+            fallback[key] = kind
+    if fallback:
+        facets.update(
+            scan_facets(
+                client,
+                collection_name,
+                fallback,
+                query_filter,
+                limit,
+                bins,
+                integer_keys=tuple(
+                    key for key in fallback if field_types[key] == "integer"
+                ),
+            )
+        )
+    return facets
+
+
+def cached_facets(
+    engine: QueryEngine,
+    collection_name: str,
+    field_types: Dict[str, str],
+    query_filter: Optional[models.Filter],
+    limit: int = 10,
+    bins: int = 10,
+) -> Dict[str, Facet]:
+    """Facets through the shared result cache, keyed per (collection, filter, key).
+
+    Entries are dropped with the collection's search results when its point
+    count or optimizer status changes.
+    """
+    version = result_cache.collection_version(
+        engine.client, engine.namespace, collection_name
+    )
+    filter_key = canonical_filter(query_filter)
+
+    def cache_key(key: str) -> Tuple:
+        return (
+            engine.namespace,
+            collection_name,
+            "facet",
+            key,
+            field_types[key],
+            filter_key,
+            limit,
+            bins,
+        )
+
+    facets: Dict[str, Facet] = {}
+    missing: Dict[str, str] = {}
+    for key in field_types:
+        cached = result_cache.get(cache_key(key), version)
+        if cached is None:
+            missing[key] = field_types[key]
+        else:
+            facets[key] = cached
+    if missing:
+        computed = compute_facets(
+            engine.client, collection_name, missing, query_filter, limit, bins
+        )
+        for key, facet in computed.items():
+            result_cache.put(cache_key(key), version, facet)
+        facets.update(computed)
+    return facets
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, tuple):
+        low, high = value
+        if isinstance(low, float):
+            return f"{low:g} – {high:g}"
+        return f"{low} – {high}"
+    return str(value)
+
+
+def create_facet_interface(
+    engine: QueryEngine,
+    collection_name: str,
+    query_filter: Optional[models.Filter],
+    field_types: Dict[str, str],
+):
+    """Show value counts and histograms of payload fields under the filter.
+
+    Clicking a value adds a ``match`` condition (a ``range`` for histogram
+    buckets) to the must filters.
+    """
+    with st.expander("Facets", expanded=False):
+        candidates = sorted(key for key, t in field_types.items() if facet_kind(t))
+        if not candidates:
+            st.write("No keyword, boolean or numeric fields to facet on")
+            return
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            keys = st.multiselect("Fields", candidates, key="facet_fields")
+        with col2:
+            limit = st.number_input(
+                "Top values", min_value=1, max_value=100, value=10, key="facet_limit"
+            )
+        with col3:
+            bins = st.number_input(
+                "Buckets", min_value=2, max_value=50, value=10, key="facet_bins"
+            )
+        if not keys:
+            return
+
+        try:
+            with engine.tracer.stage("facets") as span:
+                facets = cached_facets(
+                    engine,
+                    collection_name,
+                    {key: field_types[key] for key in keys},
+                    query_filter,
+                    int(limit),
+                    int(bins),
+                )
+                span.set(hits=len(facets))
+        except Exception as e:
+            st.error(f"Error computing facets: {str(e)}")
+            return
+
+        for key in keys:
+            facet = facets[key]
+            source = "server" if facet.source == "server" else "client-side scan"
+            st.markdown(
+                f"**{key}** · {source}{' · approximate' if facet.approximate else ''}"
+            )
+            if not facet.buckets:
+                st.write("No values under the current filter")
+                continue
+            labels = [_format_value(value) for value, _ in facet.buckets]
+            st.bar_chart(
+                {"value": labels, "count": [count for _, count in facet.buckets]},
+                x="value",
+                y="count",
+                sort=False,
+                height=200,
+            )
+            operator = "range" if facet.kind == "histogram" else "match"
+            cols = st.columns(min(len(facet.buckets), 5))
+            for i, ((value, count), label) in enumerate(zip(facet.buckets, labels)):
+                cols[i % len(cols)].button(
+                    f"{label} ({count})",
+                    key=f"facet_{key}_{i}",
+                    on_click=add_filter_condition,
+                    args=(key, operator, value),
+                    help="Add as a must condition",
+                )
@@ -0,0 +1,206 @@
+# federated.py
+
+import asyncio
+import heapq
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+from qdrant_client import AsyncQdrantClient, models
+
+from display_results import to_columns
+from engine import QueryEngine
+from filtering import to_filter
+from session import get_async_qdrant_client
+from utils import event_loop_thread
+
+
+@dataclass
+class CollectionResult:
+    """Hits and latency of one collection in a federated search."""
+
+    collection: str
+    points: List[Any] = field(default_factory=list)
+    latency: float = 0.0
+    error: Optional[str] = None
+
+
+async def _search_collection(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    vector: List[float],
+    query_filter: Optional[models.Filter],
+    limit: int,
+    score_threshold: Optional[float],
+    search_params: Optional[models.SearchParams],
+    using: Optional[str] = None,
+) -> CollectionResult:
+    # Dimension mismatches come back from the server as this result's error
+    started = time.perf_counter()
+    result = CollectionResult(collection_name)
+    try:
+        response = await client.query_points(
+            collection_name=collection_name,
+            query=vector,
+            using=using,
+            query_filter=query_filter,
+            limit=limit,
+            score_threshold=score_threshold or None,
+            search_params=search_params,
+            with_payload=True,
+        )
+        result.points = response.points
+    except Exception as e:
+        result.error = str(e)
+    result.latency = time.perf_counter() - started
+    return result
+
+
+async def fan_out(
+    client: AsyncQdrantClient,
+    vector: List[float],
+    filters: Dict[str, Optional[models.Filter]],
+    limit: int,
+    score_threshold: Optional[float] = None,
+    search_params: Optional[models.SearchParams] = None,
+    using: Optional[Dict[str, str]] = None,
+) -> List[CollectionResult]:
+    """Search every collection in ``filters`` concurrently with its own filter.
+
+    ``using`` maps collections with named vectors to the vector to search.
+    """
+    using = using or {}
+    return await asyncio.gather(
+        *(
+            _search_collection(
+                client,
+                name,
+                vector,
+                query_filter,
+                limit,
+                score_threshold,
+                search_params,
+                using.get(name),
+            )
+            for name, query_filter in filters.items()
+        )
+    )
+
+
+def normalized_scores(points: List[Any]) -> List[float]:
+    """Min-max normalize one collection's scores to [0, 1].
+
+    Scores from different collections (or distance metrics) are not directly
+    comparable, so each collection is rescaled before merging.
+    """
+    if not points:
+        return []
+    scores = [point.score for point in points]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def merge_top_k(
+    results: List[CollectionResult], k: int
+) -> List[Tuple[float, str, Any]]:
+    """Merge per-collection hits into one top-k list by normalized score."""
+    candidates = (
+        (normalized, result.collection, point)
+        for result in results
+        for normalized, point in zip(normalized_scores(result.points), result.points)
+    )
+    return heapq.nlargest(k, candidates, key=lambda item: (item[0], item[2].score))
+
+
+def create_federated_interface(
+    engine: QueryEngine,
+    collection_names: List[str],
+    filter_clause: Any,
+    limit: int,
+    score_threshold: float,
+    search_params: Optional[models.SearchParams] = None,
+):
+    """Create the federated search tab: one query over many collections."""
+    selected = st.multiselect(
+        "Collections", collection_names, key="federated_collections"
+    )
+    query = st.text_input("Enter your query:", key="federated_query")
+
+    overrides: Dict[str, str] = {}
+    using: Dict[str, str] = {}
+    with st.expander("Per-collection settings", expanded=False):
+        st.caption(
+            "Qdrant filter JSON per collection. Leave empty to use the filter above."
+        )
+        for name in selected:
+            overrides[name] = st.text_area(name, key=f"federated_filter_{name}")
+            vector_names = engine.schema(name).vector_names
+            if vector_names:
+                using[name] = st.selectbox(
+                    f"Vector in {name}", vector_names, key=f"federated_using_{name}"
+                )
+
+    if not st.button("Search Collections", disabled=not selected):
+        return
+
+    tracer = engine.tracer
+    try:
+        vector = engine.embed(query)
+        default_filter = to_filter(filter_clause)
+        filters = {
+            name: (
+                to_filter(json.loads(overrides[name]))
+                if overrides.get(name)
+                else default_filter
+            )
+            for name in selected
+        }
+        client = get_async_qdrant_client()
+        started = time.perf_counter()
+        with tracer.stage("federated_search") as span:
+            results = event_loop_thread.run(
+                fan_out(
+                    client,
+                    vector,
+                    filters,
+                    limit,
+                    score_threshold,
+                    search_params,
+                    using,
+                )
+            )
+            span.set(hits=sum(len(result.points) for result in results))
+        wall = time.perf_counter() - started
+    except Exception as e:
+        st.error(f"Error during federated search: {str(e)}")
+        return
+
+    st.dataframe(
+        {
+            "collection": [result.collection for result in results],
+            "latency ms": [round(result.latency * 1000, 1) for result in results],
+            "hits": [len(result.points) for result in results],
+            "error": [result.error or "" for result in results],
+        },
+        hide_index=True,
+    )
+    st.caption(
+        f"Wall time {wall * 1000:.1f} ms vs. "
+        f"{sum(result.latency for result in results) * 1000:.1f} ms "
+        "summed over collections"
+    )
+
+    merged = merge_top_k(results, limit)
+    if not merged:
+        st.write("No results found")
+        return
+    columns = {
+        "collection": [collection for _, collection, _ in merged],
+        "normalized score": [round(normalized, 4) for normalized, _, _ in merged],
+    }
+    columns.update(to_columns([point for _, _, point in merged]))
+    st.dataframe(columns, hide_index=True)
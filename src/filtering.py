@@ -0,0 +1,257 @@
+# filtering.py
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Union
+
+from qdrant_client import models
+
+CLAUSES = ("must", "must_not", "should")
+
+
+@dataclass(frozen=True)
+class Condition:
+    """A single filter condition on one payload key.
+
+    ``value`` depends on ``operator`` and is always hashable:
+
+    - ``match``, ``match_text``: a scalar
+    - ``match_any``, ``match_except``, ``has_id``: a tuple of values
+    - ``range``, ``values_count``, ``datetime_range``: a ``(gte, lte)`` tuple
+    - ``geo_radius``: a ``(lat, lon, radius)`` tuple
+    - ``is_empty``: ignored
+    """
+
+    key: str
+    operator: str
+    value: Any = None
+
+
+@dataclass(frozen=True)
+class FilterGroup:
+    """A boolean group of conditions and nested groups."""
+
+    must: Tuple[Union[Condition, "FilterGroup"], ...] = ()
+    must_not: Tuple[Union[Condition, "FilterGroup"], ...] = ()
+    should: Tuple[Union[Condition, "FilterGroup"], ...] = ()
+
+
+def coerce_value(value: Any, field_type: Optional[str]) -> Any:
+    """Convert text typed into the UI to the payload's native type."""
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    try:
+        if field_type == "integer":
+            return int(value)
+        if field_type == "float":
+            return float(value)
+    except ValueError:
+        return value
+    if field_type == "bool" and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value
+
+
+def parse_list(text: str, field_type: Optional[str] = None) -> Tuple[Any, ...]:
+    """Split comma separated UI input into a tuple of typed values."""
+    return tuple(
+        coerce_value(item, field_type) for item in text.split(",") if item.strip()
+    )
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Parse an ISO 8601 bound; raises ``ValueError`` if it is malformed."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _bounds(value: Any) -> Tuple[Any, Any]:
+    if not value:
+        return None, None
+    gte, lte = value
+    return gte, lte
+
+
+def compile_condition(condition: Condition) -> Optional[models.Condition]:
+    """Compile one condition, returning ``None`` when it has no effect."""
+    key, operator, value = condition.key, condition.operator, condition.value
+    if operator == "match":
+        if value in (None, ""):
+            return None
+        return models.FieldCondition(key=key, match=models.MatchValue(value=value))
+    if operator == "match_text":
+        if not value:
+            return None
+        return models.FieldCondition(key=key, match=models.MatchText(text=value))
+    if operator == "match_any":
+        if not value:
+            return None
+        return models.FieldCondition(key=key, match=models.MatchAny(any=list(value)))
+    if operator == "match_except":
+        if not value:
+            return None
+        return models.FieldCondition(
+            key=key, match=models.MatchExcept(**{"except": list(value)})
+        )
+    if operator == "range":
+        gte, lte = _bounds(value)
+        if gte is None and lte is None:
+            return None
+        return models.FieldCondition(key=key, range=models.Range(gte=gte, lte=lte))
+    if operator == "datetime_range":
+        gte, lte = (parse_datetime(bound) for bound in _bounds(value))
+        if gte is None and lte is None:
+            return None
+        return models.FieldCondition(
+            key=key, range=models.DatetimeRange(gte=gte, lte=lte)
+        )
+    if operator == "values_count":
+        gte, lte = _bounds(value)
+        if gte is None and lte is None:
+            return None
+        return models.FieldCondition(
+            key=key,
+            values_count=models.ValuesCount(
+                gte=None if gte is None else int(gte),
+                lte=None if lte is None else int(lte),
+            ),
+        )
+    if operator == "geo_radius":
+        if not value or not value[2]:
+            return None
+        lat, lon, radius = value
+        return models.FieldCondition(
+            key=key,
+            geo_radius=models.GeoRadius(
+                center=models.GeoPoint(lat=lat, lon=lon), radius=radius
+            ),
+        )
+    if operator == "is_empty":
+        return models.IsEmptyCondition(is_empty=models.PayloadField(key=key))
+    if operator == "has_id":
+        if not value:
+            return None
+        return models.HasIdCondition(has_id=list(value))
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def _compile_group(group: FilterGroup) -> Optional[models.Filter]:
+    clauses: Dict[str, list] = {}
+    for clause in CLAUSES:
+        compiled = []
+        for item in getattr(group, clause):
+            if isinstance(item, FilterGroup):
+                condition = _compile_group(item)
+            else:
+                condition = compile_condition(item)
+            if condition is not None:
+                compiled.append(condition)
+        if compiled:
+            clauses[clause] = compiled
+    if not clauses:
+        return None
+    return models.Filter(**clauses)
+
+
+@lru_cache(maxsize=256)
+def compile_filter(group: FilterGroup) -> Optional[models.Filter]:
+    """Compile a filter group to a Qdrant ``Filter``, pruning empty clauses.
+
+    Results are memoized on the (immutable) group, so reruns with an unchanged
+    filter reuse the same compiled object. Callers must not mutate it.
+    """
+    return _compile_group(group)
+
+
+# Field order of dict values, per operator, when given as JSON objects
+DICT_VALUE_FIELDS = {
+    "range": ("gte", "lte"),
+    "datetime_range": ("gte", "lte"),
+    "values_count": ("gte", "lte"),
+    "geo_radius": ("lat", "lon", "radius"),
+}
+
+
+def _spec_value(key: str, operator: str, value: Any) -> Any:
+    """Turn a JSON condition value into the hashable form ``Condition`` holds."""
+    if isinstance(value, dict):
+        fields = DICT_VALUE_FIELDS.get(operator)
+        if fields is None or not set(value) <= set(fields):
+            expected = (
+                "{" + ", ".join(f'"{name}"' for name in fields) + "}"
+                if fields
+                else "a scalar or a list"
+            )
+            raise ValueError(
+                f"Invalid value for '{operator}' condition on '{key}': "
+                f"expected {expected}"
+            )
+        return tuple(value.get(name) for name in fields)
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def group_from_dict(spec: Dict[str, Any]) -> FilterGroup:
+    """Build a filter group from a JSON-style spec.
+
+    Items are either ``{"key", "operator", "value"}`` conditions or nested
+    specs with ``must``/``must_not``/``should`` lists. Bounds may be lists
+    (``[gte, lte]``) or objects (``{"gte": 2}``).
+    """
+    clauses = {}
+    for clause in CLAUSES:
+        items = []
+        for item in spec.get(clause) or []:
+            if "operator" in item:
+                key, operator = item.get("key", ""), item["operator"]
+                value = _spec_value(key, operator, item.get("value"))
+                items.append(Condition(key, operator, value))
+            else:
+                items.append(group_from_dict(item))
+        clauses[clause] = tuple(items)
+    return FilterGroup(**clauses)
+
+
+def _is_condition_spec(spec: Dict[str, Any]) -> bool:
+    """Whether a filter dict uses ``{"key", "operator", "value"}`` conditions."""
+    for clause in CLAUSES:
+        for item in spec.get(clause) or []:
+            if not isinstance(item, dict):
+                continue
+            if "operator" in item or _is_condition_spec(item):
+                return True
+    return False
+
+
+def to_filter(value: Any) -> Optional[models.Filter]:
+    """Convert a filter dict (or an existing model) to a Qdrant filter.
+
+    Dicts are either Qdrant filter JSON or a condition spec as accepted by
+    ``group_from_dict``.
+    """
+    if value is None or isinstance(value, models.Filter):
+        return value
+    if _is_condition_spec(value):
+        return compile_filter(group_from_dict(value))
+    if not any(value.get(clause) for clause in CLAUSES):
+        return None
+    return models.Filter.model_validate(value)
+
+
+def filter_to_dict(query_filter: Optional[models.Filter]) -> Dict[str, Any]:
+    """Return the JSON form of a compiled filter as sent to Qdrant."""
+    if query_filter is None:
+        return {}
+    return json.loads(query_filter.model_dump_json(exclude_none=True, by_alias=True))
+
+
+def canonical_filter(query_filter: Optional[models.Filter]) -> str:
+    """Return a stable string for a compiled filter, suitable as a cache key."""
+    return json.dumps(filter_to_dict(query_filter), sort_keys=True)
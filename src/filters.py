@@ -1,223 +1,272 @@
-import os
-from typing import Any, Dict, List
+import uuid
+from typing import Any, Dict, List, Optional
 
 import streamlit as st
-from langchain_community.embeddings import OpenAIEmbeddings
-from qdrant_client import QdrantClient
+from qdrant_client import models
 
+from filtering import (
+    CLAUSES,
+    Condition,
+    FilterGroup,
+    coerce_value,
+    compile_filter,
+    filter_to_dict,
+    parse_datetime,
+    parse_list,
+)
 
-def create_filter_condition(
-    filter_type: str, key: str, operator: str, value: Any
-) -> Dict:
+CLAUSE_LABELS = {"must": "Must", "must_not": "Must Not", "should": "Should"}
+
+DEFAULT_OPERATORS = ["match", "range", "values_count", "is_empty", "has_id"]
+
+# Operators offered for each inferred payload type (see schema.infer_value_type)
+OPERATORS_BY_TYPE = {
+    "keyword": [
+        "match",
+        "match_any",
+        "match_except",
+        "values_count",
+        "is_empty",
+        "has_id",
+    ],
+    "text": ["match_text", "match", "values_count", "is_empty", "has_id"],
+    "uuid": ["match", "match_any", "match_except", "is_empty", "has_id"],
+    "integer": [
+        "match",
+        "match_any",
+        "match_except",
+        "range",
+        "values_count",
+        "is_empty",
+        "has_id",
+    ],
+    "float": ["range", "values_count", "is_empty", "has_id"],
+    "bool": ["match", "values_count", "is_empty", "has_id"],
+    "datetime": ["datetime_range", "values_count", "is_empty", "has_id"],
+    "geo": ["geo_radius", "values_count", "is_empty", "has_id"],
+    "object": ["values_count", "is_empty", "has_id"],
+}
+
+
+def operators_for_field(field_type: Optional[str]) -> List[str]:
+    """Return the filter operators that make sense for a payload type."""
+    return OPERATORS_BY_TYPE.get(field_type, DEFAULT_OPERATORS)
+
+
+def create_filter_condition(key: str, operator: str, value: Any) -> Optional[Condition]:
     """Create a filter condition based on the operator type."""
+    if isinstance(value, list):
+        value = tuple(value)
+    return Condition(key, operator, value)
+
+
+def _new_condition(key: str) -> Dict[str, Any]:
+    return {"id": uuid.uuid4().hex[:8], "key": key}
+
+
+def _new_group() -> Dict[str, Any]:
+    return {"id": uuid.uuid4().hex[:8], "group": {clause: [] for clause in CLAUSES}}
+
+
+def add_filter_condition(
+    key: str, operator: str, value: Any, clause: str = "must"
+) -> None:
+    """Button callback: append a preset ``match`` or ``range`` condition.
+
+    ``range`` values are ``(low, high)`` pairs; either side may be ``None``.
+    """
+    item = _new_condition(key)
+    wid = f"filter_{item['id']}"
+    st.session_state[f"{wid}_operator"] = operator
+    if operator == "range":
+        low, high = value
+        st.session_state[f"{wid}_gte"] = None if low is None else float(low)
+        st.session_state[f"{wid}_lte"] = None if high is None else float(high)
+    else:
+        st.session_state[f"{wid}_value"] = (
+            str(value).lower() if isinstance(value, bool) else str(value)
+        )
+    items = st.session_state.get(f"{clause}_filters", [])
+    st.session_state[f"{clause}_filters"] = items + [item]
+
+
+def _condition_value(operator: str, field_type: Optional[str], wid: str) -> Any:
+    """Render the value widgets for ``operator`` and return a hashable value."""
     if operator == "match":
-        return {"key": key, "match": {"value": value}}
-    elif operator == "range":
-        return {"key": key, "range": value}
-    elif operator == "geo_radius":
-        return {"key": key, "geo_radius": value}
-    elif operator == "values_count":
-        return {"key": key, "values_count": value}
+        return coerce_value(st.text_input("Value", key=f"{wid}_value"), field_type)
+    if operator == "match_text":
+        return st.text_input("Text", key=f"{wid}_text")
+    if operator in ("match_any", "match_except"):
+        text = st.text_input("Values (comma separated)", key=f"{wid}_values")
+        return parse_list(text, field_type)
+    if operator == "has_id":
+        text = st.text_input("Point IDs (comma separated)", key=f"{wid}_ids")
+        return parse_list(text, "integer")
+    if operator == "range":
+        col_min, col_max = st.columns(2)
+        with col_min:
+            gte = st.number_input("Min", value=None, key=f"{wid}_gte")
+        with col_max:
+            lte = st.number_input("Max", value=None, key=f"{wid}_lte")
+        return (gte, lte)
+    if operator == "datetime_range":
+        col_min, col_max = st.columns(2)
+        with col_min:
+            gte = st.text_input(
+                "From", placeholder="2024-01-01T00:00:00", key=f"{wid}_from"
+            )
+        with col_max:
+            lte = st.text_input(
+                "To", placeholder="2024-12-31T23:59:59", key=f"{wid}_to"
+            )
+        try:
+            parse_datetime(gte)
+            parse_datetime(lte)
+        except ValueError as e:
+            st.warning(f"Ignoring this condition, invalid date: {e}")
+            return None
+        return (gte or None, lte or None)
+    if operator == "values_count":
+        col_min, col_max = st.columns(2)
+        with col_min:
+            gte = st.number_input(
+                "Min Count", min_value=0, value=None, step=1, key=f"{wid}_count_gte"
+            )
+        with col_max:
+            lte = st.number_input(
+                "Max Count", min_value=0, value=None, step=1, key=f"{wid}_count_lte"
+            )
+        return (gte, lte)
+    if operator == "geo_radius":
+        col_lat, col_lon, col_radius = st.columns(3)
+        with col_lat:
+            lat = st.number_input("Lat", key=f"{wid}_lat")
+        with col_lon:
+            lon = st.number_input("Lon", key=f"{wid}_lon")
+        with col_radius:
+            radius = st.number_input("Radius (m)", min_value=0.0, key=f"{wid}_radius")
+        return (lat, lon, radius)
     return None
 
 
-def create_filter_interface(metadata_keys: List[str]) -> Dict[str, List[Dict]]:
-    """Create a comprehensive filter interface for Qdrant queries."""
-
-    # Initialize session state for different filter types
-    if "must_filters" not in st.session_state:
-        st.session_state.must_filters = []
-    if "must_not_filters" not in st.session_state:
-        st.session_state.must_not_filters = []
-    if "should_filters" not in st.session_state:
-        st.session_state.should_filters = []
+def _render_condition(
+    item: Dict[str, Any], metadata_keys: List[str], field_types: Dict[str, str]
+) -> Optional[Condition]:
+    """Render one condition row; returns ``None`` if it was removed."""
+    wid = f"filter_{item['id']}"
+    col1, col2, col3, col4 = st.columns([3, 2, 3, 1])
 
-    # Create columns for filter type buttons
-    col1, col2, col3 = st.columns(3)
     with col1:
-        if st.button("Add Must Filter"):
-            st.session_state.must_filters.append(
-                {"key": metadata_keys[0], "operator": "match", "value": ""}
-            )
+        key = st.selectbox(
+            "Field",
+            metadata_keys,
+            key=f"{wid}_key",
+            index=(
+                metadata_keys.index(item["key"]) if item["key"] in metadata_keys else 0
+            ),
+        )
+
     with col2:
-        if st.button("Add Must Not Filter"):
-            st.session_state.must_not_filters.append(
-                {"key": metadata_keys[0], "operator": "match", "value": ""}
-            )
+        operator = st.selectbox(
+            "Operator",
+            operators_for_field(field_types.get(key)),
+            key=f"{wid}_operator",
+        )
+
     with col3:
-        if st.button("Add Should Filter"):
-            st.session_state.should_filters.append(
-                {"key": metadata_keys[0], "operator": "match", "value": ""}
-            )
+        value = _condition_value(operator, field_types.get(key), wid)
 
-    filter_clause = {"must": [], "must_not": [], "should": []}
-
-    # Create UI for Must filters
-    if st.session_state.must_filters:
-        st.subheader("Must Filters")
-        for i, filter_item in enumerate(st.session_state.must_filters):
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 2, 3, 1])
-
-                with col1:
-                    key = st.selectbox(
-                        "Field",
-                        metadata_keys,
-                        key=f"must_key_{i}",
-                        index=metadata_keys.index(filter_item["key"]),
-                    )
+    with col4:
+        if st.button("Remove", key=f"{wid}_remove"):
+            return None
 
-                with col2:
-                    operator = st.selectbox(
-                        "Operator",
-                        ["match", "range", "values_count"],
-                        key=f"must_operator_{i}",
-                    )
+    return create_filter_condition(key, operator, value)
 
-                with col3:
-                    if operator == "match":
-                        value = st.text_input("Value", key=f"must_value_{i}")
-                    elif operator == "range":
-                        col_min, col_max = st.columns(2)
-                        with col_min:
-                            gte = st.number_input("Min", key=f"must_gte_{i}")
-                        with col_max:
-                            lte = st.number_input("Max", key=f"must_lte_{i}")
-                        value = {"gte": gte, "lte": lte}
-                    elif operator == "values_count":
-                        col_min, col_max = st.columns(2)
-                        with col_min:
-                            gte = st.number_input(
-                                "Min Count", key=f"must_count_gte_{i}"
-                            )
-                        with col_max:
-                            lte = st.number_input(
-                                "Max Count", key=f"must_count_lte_{i}"
-                            )
-                        value = {"gte": gte, "lte": lte}
-
-                with col4:
-                    if st.button("Remove", key=f"remove_must_{i}"):
-                        st.session_state.must_filters.pop(i)
-                        st.rerun()
-
-                filter_condition = create_filter_condition("must", key, operator, value)
-                if filter_condition:
-                    filter_clause["must"].append(filter_condition)
-
-    # Create UI for Must Not filters
-    if st.session_state.must_not_filters:
-        st.subheader("Must Not Filters")
-        for i, filter_item in enumerate(st.session_state.must_not_filters):
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 2, 3, 1])
-
-                with col1:
-                    key = st.selectbox(
-                        "Field",
-                        metadata_keys,
-                        key=f"must_not_key_{i}",
-                        index=metadata_keys.index(filter_item["key"]),
-                    )
 
-                with col2:
-                    operator = st.selectbox(
-                        "Operator",
-                        ["match", "range", "values_count"],
-                        key=f"must_not_operator_{i}",
-                    )
+def _render_items(
+    items: List[Dict[str, Any]],
+    metadata_keys: List[str],
+    field_types: Dict[str, str],
+) -> tuple:
+    """Render the conditions and groups of one clause."""
+    compiled = []
+    for item in list(items):
+        with st.container():
+            if "group" in item:
+                result = _render_nested_group(item, metadata_keys, field_types)
+            else:
+                result = _render_condition(item, metadata_keys, field_types)
+        if result is None:
+            items.remove(item)
+            st.rerun()
+        compiled.append(result)
+    return tuple(compiled)
 
-                with col3:
-                    if operator == "match":
-                        value = st.text_input("Value", key=f"must_not_value_{i}")
-                    elif operator == "range":
-                        col_min, col_max = st.columns(2)
-                        with col_min:
-                            gte = st.number_input("Min", key=f"must_not_gte_{i}")
-                        with col_max:
-                            lte = st.number_input("Max", key=f"must_not_lte_{i}")
-                        value = {"gte": gte, "lte": lte}
-                    elif operator == "values_count":
-                        col_min, col_max = st.columns(2)
-                        with col_min:
-                            gte = st.number_input(
-                                "Min Count", key=f"must_not_count_gte_{i}"
-                            )
-                        with col_max:
-                            lte = st.number_input(
-                                "Max Count", key=f"must_not_count_lte_{i}"
-                            )
-                        value = {"gte": gte, "lte": lte}
-
-                with col4:
-                    if st.button("Remove", key=f"remove_must_not_{i}"):
-                        st.session_state.must_not_filters.pop(i)
-                        st.rerun()
-
-                filter_condition = create_filter_condition(
-                    "must_not", key, operator, value
-                )
-                if filter_condition:
-                    filter_clause["must_not"].append(filter_condition)
-
-    # Create UI for Should filters
-    if st.session_state.should_filters:
-        st.subheader("Should Filters")
-        for i, filter_item in enumerate(st.session_state.should_filters):
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 2, 3, 1])
-
-                with col1:
-                    key = st.selectbox(
-                        "Field",
-                        metadata_keys,
-                        key=f"should_key_{i}",
-                        index=metadata_keys.index(filter_item["key"]),
-                    )
 
-                with col2:
-                    operator = st.selectbox(
-                        "Operator",
-                        ["match", "range", "values_count"],
-                        key=f"should_operator_{i}",
+def _render_nested_group(
+    item: Dict[str, Any], metadata_keys: List[str], field_types: Dict[str, str]
+) -> Optional[FilterGroup]:
+    """Render a nested group of conditions; returns ``None`` if it was removed."""
+    gid = f"group_{item['id']}"
+    state = item["group"]
+    with st.container(border=True):
+        cols = st.columns(4)
+        for col, clause in zip(cols, CLAUSES):
+            with col:
+                if st.button(f"Add {CLAUSE_LABELS[clause]}", key=f"{gid}_add_{clause}"):
+                    state[clause].append(_new_condition(metadata_keys[0]))
+        with cols[3]:
+            if st.button("Remove Group", key=f"{gid}_remove"):
+                return None
+
+        clauses = {}
+        for clause in CLAUSES:
+            if state[clause]:
+                st.markdown(f"**{CLAUSE_LABELS[clause]}**")
+            clauses[clause] = _render_items(state[clause], metadata_keys, field_types)
+    return FilterGroup(**clauses)
+
+
+def create_filter_interface(
+    metadata_keys: List[str], field_types: Optional[Dict[str, str]] = None
+) -> Optional[models.Filter]:
+    """Create a comprehensive filter interface for Qdrant queries."""
+    field_types = field_types or {}
+
+    # Initialize session state for different filter types
+    for clause in CLAUSES:
+        if f"{clause}_filters" not in st.session_state:
+            st.session_state[f"{clause}_filters"] = []
+
+    if not metadata_keys:
+        st.info("No payload fields found in this collection to filter on")
+        return None
+
+    # Create columns for filter type buttons
+    for kind in ("Filter", "Group"):
+        cols = st.columns(3)
+        for col, clause in zip(cols, CLAUSES):
+            with col:
+                if st.button(f"Add {CLAUSE_LABELS[clause]} {kind}"):
+                    st.session_state[f"{clause}_filters"].append(
+                        _new_group()
+                        if kind == "Group"
+                        else _new_condition(metadata_keys[0])
                     )
 
-                with col3:
-                    if operator == "match":
-                        value = st.text_input("Value", key=f"should_value_{i}")
-                    elif operator == "range":
-                        col_min, col_max = st.columns(2)
-                        with col_min:
-                            gte = st.number_input("Min", key=f"should_gte_{i}")
-                        with col_max:
-                            lte = st.number_input("Max", key=f"should_lte_{i}")
-                        value = {"gte": gte, "lte": lte}
-                    elif operator == "values_count":
-                        col_min, col_max = st.columns(2)
-                        with col_min:
-                            gte = st.number_input(
-                                "Min Count", key=f"should_count_gte_{i}"
-                            )
-                        with col_max:
-                            lte = st.number_input(
-                                "Max Count", key=f"should_count_lte_{i}"
-                            )
-                        value = {"gte": gte, "lte": lte}
-
-                with col4:
-                    if st.button("Remove", key=f"remove_should_{i}"):
-                        st.session_state.should_filters.pop(i)
-                        st.rerun()
-
-                filter_condition = create_filter_condition(
-                    "should", key, operator, value
-                )
-                if filter_condition:
-                    filter_clause["should"].append(filter_condition)
+    clauses = {}
+    for clause in CLAUSES:
+        items = st.session_state[f"{clause}_filters"]
+        if items:
+            st.subheader(f"{CLAUSE_LABELS[clause]} Filters")
+        clauses[clause] = _render_items(items, metadata_keys, field_types)
+
+    # Compiled filters are memoized on the filter state
+    query_filter = compile_filter(FilterGroup(**clauses))
 
     # Display current filter structure
-    if any([filter_clause["must"], filter_clause["must_not"], filter_clause["should"]]):
+    if query_filter is not None:
         st.subheader("Current Filter Structure")
-        st.json(filter_clause)
+        st.json(filter_to_dict(query_filter))
 
-    return filter_clause
\ No newline at end of file
+    return query_filter
@@ -0,0 +1,130 @@
+# hybrid.py
+
+import time
+from typing import Any, Dict, Optional
+
+import streamlit as st
+
+from engine import FUSIONS, QueryEngine
+from sparse_embeddings import HASHING_MODEL
+
+# Results compared against dense-only search
+MAX_COMPARED = 100
+
+
+def create_hybrid_interface(
+    engine: QueryEngine, collection_name: str
+) -> Optional[Dict[str, Any]]:
+    """Create the hybrid search settings; returns them if hybrid mode is on.
+
+    Only collections with sparse vectors can be searched this way.
+    """
+    schema = engine.schema(collection_name)
+    with st.expander("Hybrid Search", expanded=False):
+        if not schema.sparse_vectors:
+            st.write("This collection has no sparse vectors")
+            return None
+        enabled = st.checkbox(
+            "Fuse dense and sparse results on the server", key="hybrid_enabled"
+        )
+        dense_names = schema.vector_names
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            using = (
+                st.selectbox("Dense vector", dense_names, key="hybrid_using")
+                if dense_names
+                else None
+            )
+        with col2:
+            sparse_using = st.selectbox(
+                "Sparse vector", schema.sparse_vectors, key="hybrid_sparse_using"
+            )
+        with col3:
+            fusion = st.radio(
+                "Fusion",
+                FUSIONS,
+                format_func=str.upper,
+                horizontal=True,
+                key="hybrid_fusion",
+            )
+        st.text_input(
+            "Sparse model",
+            key="sparse_model",
+            help="FastEmbed sparse model such as Qdrant/bm25 (pip install "
+            "fastembed). Leave empty for the built-in hashing encoder.",
+        )
+        st.caption(
+            "Sparse query vectors are encoded locally "
+            f"({engine.config.sparse_model or HASHING_MODEL})."
+        )
+    if not enabled:
+        return None
+    # The encoder, and any model download, is only loaded in hybrid mode
+    try:
+        engine.sparse_encoder
+    except ImportError as e:
+        st.error(str(e))
+        return None
+    return {"using": using, "sparse_using": sparse_using, "fusion": fusion}
+
+
+def display_hybrid_comparison(engine: QueryEngine, request: Dict[str, Any]):
+    """Show latency and result overlap of a hybrid request vs dense-only search.
+
+    Both searches bypass the result cache and run once per request.
+    """
+    comparison = st.session_state.get("hybrid_comparison")
+    if comparison is None or comparison["id"] != request["id"]:
+        limit = min(request["limit"], MAX_COMPARED)
+        common = {
+            "query_filter": request["filter"],
+            "limit": limit,
+            "params": request.get("params"),
+            "with_payload": False,
+            "use_cache": False,
+        }
+        try:
+            started = time.perf_counter()
+            dense, _ = engine.search(
+                request["collection"],
+                request["dense"],
+                using=request["dense_using"],
+                score_threshold=request["dense_score_threshold"],
+                **common,
+            )
+            dense_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            fused, _ = engine.search(
+                request["collection"],
+                request["query"],
+                prefetch=request["prefetch"],
+                **common,
+            )
+            fused_seconds = time.perf_counter() - started
+        except Exception as e:
+            st.error(f"Error comparing with dense-only search: {str(e)}")
+            return
+        dense_ids = {point.id for point in dense}
+        comparison = {
+            "id": request["id"],
+            "limit": limit,
+            "fused_ms": fused_seconds * 1000,
+            "dense_ms": dense_seconds * 1000,
+            "overlap": sum(point.id in dense_ids for point in fused),
+            "fused": len(fused),
+        }
+        st.session_state.hybrid_comparison = comparison
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric(
+        "Hybrid latency",
+        f"{comparison['fused_ms']:.1f} ms",
+        delta=f"{comparison['fused_ms'] - comparison['dense_ms']:+.1f} ms",
+        delta_color="inverse",
+    )
+    col2.metric("Dense-only latency", f"{comparison['dense_ms']:.1f} ms")
+    col3.metric(
+        f"Overlap in top {comparison['limit']}",
+        f"{comparison['overlap']} / {comparison['fused']}",
+        help="Hybrid results that dense-only search also returns",
+    )
@@ -0,0 +1,290 @@
+# index_advisor.py
+
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import streamlit as st
+from qdrant_client import QdrantClient, models
+
+from engine import QueryEngine
+from filtering import canonical_filter
+from schema import get_schema_discovery
+
+# Index types that can serve a condition needing the key's index type
+COMPATIBLE_INDEXES = {
+    "keyword": {"keyword", "uuid"},
+    "uuid": {"uuid", "keyword"},
+    "integer": {"integer"},
+    "float": {"float", "integer"},
+    "bool": {"bool"},
+    "datetime": {"datetime"},
+    "geo": {"geo"},
+    "text": {"text"},
+}
+
+
+@dataclass
+class IndexAdvice:
+    """Index status and estimated selectivity of one filtered payload key."""
+
+    key: str
+    wanted_type: str
+    indexed_type: Optional[str]
+    selectivity: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if self.indexed_type is None:
+            return "missing"
+        if self.indexed_type not in COMPATIBLE_INDEXES[self.wanted_type]:
+            # A key has one index, and full-text matching needs the text one
+            return "full scan" if self.indexed_type == "text" else "wrong type"
+        return "ok"
+
+    @property
+    def can_create(self) -> bool:
+        """Whether creating ``wanted_type`` is offered; it replaces any index."""
+        return self.status in ("missing", "wrong type")
+
+
+def iter_field_conditions(
+    query_filter: Optional[models.Filter],
+) -> Iterator[models.FieldCondition]:
+    """Yield every field condition of a filter, including nested groups."""
+    if query_filter is None:
+        return
+    for clause in (query_filter.must, query_filter.must_not, query_filter.should):
+        for condition in clause or []:
+            if isinstance(condition, models.Filter):
+                yield from iter_field_conditions(condition)
+            elif isinstance(condition, models.FieldCondition):
+                yield condition
+
+
+def required_index_type(
+    condition: models.FieldCondition, field_type: Optional[str] = None
+) -> Optional[str]:
+    """Return the payload index type that serves ``condition``, if any."""
+    match = condition.match
+    if isinstance(match, models.MatchText):
+        return "text"
+    if isinstance(match, (models.MatchValue, models.MatchAny, models.MatchExcept)):
+        if isinstance(match, models.MatchValue):
+            values = [match.value]
+        elif isinstance(match, models.MatchAny):
+            values = match.any
+        else:
+            values = match.except_
+        if values and isinstance(values[0], bool):
+            return "bool"
+        if values and isinstance(values[0], int):
+            return "integer"
+        return "uuid" if field_type == "uuid" else "keyword"
+    if isinstance(condition.range, models.DatetimeRange):
+        return "datetime"
+    if condition.range is not None:
+        return "integer" if field_type == "integer" else "float"
+    if condition.geo_radius or condition.geo_bounding_box or condition.geo_polygon:
+        return "geo"
+    # values_count and is_empty do not use a payload index
+    return None
+
+
+def advise(
+    client: QdrantClient,
+    collection_name: str,
+    query_filter: Optional[models.Filter],
+    field_types: Dict[str, str],
+    estimate: bool = True,
+) -> List[IndexAdvice]:
+    """Compare filtered keys with the collection's payload indexes.
+
+    With ``estimate``, each condition's selectivity (fraction of points it
+    matches) is estimated with an approximate ``count``.
+    """
+    info = client.get_collection(collection_name)
+    indexes = {
+        key: str(index.data_type.value)
+        for key, index in (info.payload_schema or {}).items()
+    }
+    advice: Dict[tuple, IndexAdvice] = {}
+    for condition in iter_field_conditions(query_filter):
+        wanted = required_index_type(condition, field_types.get(condition.key))
+        if wanted is None or (condition.key, wanted) in advice:
+            continue
+        item = IndexAdvice(condition.key, wanted, indexes.get(condition.key))
+        if estimate and info.points_count:
+            matched = client.count(
+                collection_name=collection_name,
+                count_filter=models.Filter(must=[condition]),
+                exact=False,
+            ).count
+            item.selectivity = matched / info.points_count
+        advice[(condition.key, wanted)] = item
+    return list(advice.values())
+
+
+def sample_query_vector(
+    engine: QueryEngine, collection_name: str
+) -> Tuple[Optional[List[float]], Optional[str]]:
+    """Return a stored dense vector and its name to time searches with.
+
+    The vector is ``None`` when the collection has no points or dense vectors.
+    """
+    names = list(engine.schema(collection_name).vector_sizes)
+    if not names:
+        return None, None
+    using = names[0] or None
+    points, _ = engine.client.scroll(
+        collection_name=collection_name,
+        limit=1,
+        with_payload=False,
+        with_vectors=[using] if using else True,
+    )
+    if not points:
+        return None, None
+    vector = points[0].vector
+    return (vector[using] if using else vector), using
+
+
+def measure_filter_latency(
+    engine: QueryEngine,
+    collection_name: str,
+    query_filter: Optional[models.Filter],
+    vector: List[float],
+    using: Optional[str] = None,
+    limit: int = 10,
+    repeats: int = 3,
+) -> float:
+    """Median seconds for the filtered search, bypassing the result cache."""
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        engine.search(
+            collection_name,
+            vector,
+            query_filter=query_filter,
+            limit=limit,
+            using=using,
+            with_payload=False,
+            use_cache=False,
+        )
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def create_index(
+    client: QdrantClient, collection_name: str, key: str, index_type: str
+) -> None:
+    """Create a payload index and wait until it is built."""
+    client.create_payload_index(
+        collection_name=collection_name,
+        field_name=key,
+        field_schema=models.PayloadSchemaType(index_type),
+        wait=True,
+    )
+
+
+def create_index_advisor(
+    engine: QueryEngine,
+    collection_name: str,
+    query_filter: Optional[models.Filter],
+    field_types: Dict[str, str],
+):
+    """Warn about unindexed filter fields and offer to index them.
+
+    Index creation is timed with a filtered search for a vector stored in
+    the collection, run before and after the index is built.
+    """
+    if query_filter is None:
+        return
+    client = engine.client
+    schema = get_schema_discovery(client).get_schema(collection_name)
+    unindexed = set()
+    for condition in iter_field_conditions(query_filter):
+        wanted = required_index_type(condition, field_types.get(condition.key))
+        field = schema.fields.get(condition.key)
+        if wanted and field and field.indexed_type not in COMPATIBLE_INDEXES[wanted]:
+            unindexed.add(condition.key)
+    if unindexed:
+        st.warning(
+            "Filtering on fields without a matching index forces a full scan: "
+            + ", ".join(sorted(unindexed))
+        )
+
+    with st.expander("Index Advisor", expanded=False):
+        state_key = (collection_name, canonical_filter(query_filter))
+        if st.button("Analyze Filter Indexes"):
+            try:
+                st.session_state.index_advice = (
+                    state_key,
+                    advise(client, collection_name, query_filter, field_types),
+                )
+            except Exception as e:
+                st.error(f"Error analyzing indexes: {str(e)}")
+        stored = st.session_state.get("index_advice")
+        if not stored or stored[0] != state_key:
+            st.write("Click to check indexes and estimate condition selectivity")
+            return
+
+        timings = st.session_state.setdefault("index_timings", {})
+        for item in stored[1]:
+            timing_key = (collection_name, item.key, item.wanted_type)
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                selectivity = (
+                    f"~{item.selectivity:.1%} of points"
+                    if item.selectivity is not None
+                    else "an unknown share of points"
+                )
+                st.write(
+                    f"**{item.key}**: needs `{item.wanted_type}` index, "
+                    f"has `{item.indexed_type or 'none'}` ({item.status}); "
+                    f"matches {selectivity}"
+                )
+                if item.status == "full scan":
+                    st.caption(
+                        f"This condition on {item.key} is served by a full scan. "
+                        f"A {item.wanted_type} index would replace the text index "
+                        "that full-text matching relies on, so none is offered."
+                    )
+            with col2:
+                if item.can_create and st.button(
+                    f"Create {item.wanted_type} index",
+                    key=f"index_{item.key}_{item.wanted_type}",
+                    help=(
+                        f"Replaces the existing {item.indexed_type} index"
+                        if item.indexed_type
+                        else None
+                    ),
+                ):
+                    try:
+                        vector, using = sample_query_vector(engine, collection_name)
+                        before = after = None
+                        if vector is not None:
+                            before = measure_filter_latency(
+                                engine, collection_name, query_filter, vector, using
+                            )
+                        create_index(
+                            client, collection_name, item.key, item.wanted_type
+                        )
+                        if vector is not None:
+                            after = measure_filter_latency(
+                                engine, collection_name, query_filter, vector, using
+                            )
+                    except Exception as e:
+                        st.error(f"Error creating index: {str(e)}")
+                        continue
+                    get_schema_discovery(client).invalidate(collection_name)
+                    item.indexed_type = item.wanted_type
+                    timings[timing_key] = (before, after)
+            timing = timings.get(timing_key)
+            if timing and timing[0] is not None:
+                st.success(
+                    f"Indexed {item.key}: filtered search took "
+                    f"{timing[0] * 1000:.1f} ms before, {timing[1] * 1000:.1f} ms after"
+                )
+            elif timing:
+                st.success(f"Indexed {item.key} as {item.wanted_type}")
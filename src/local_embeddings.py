@@ -0,0 +1,136 @@
+# local_embeddings.py
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+# Texts per ONNX run; batches of a large request run concurrently
+DEFAULT_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+DEFAULT_WORKERS = int(os.getenv("LOCAL_EMBEDDING_WORKERS", "2"))
+# Empty: read the model's 1_Pooling/config.json, falling back to mean pooling
+DEFAULT_POOLING = os.getenv("LOCAL_EMBEDDING_POOLING", "")
+POOLING_MODES = ("mean", "cls")
+MAX_TOKENS = 512
+
+
+def read_pooling(model_dir: str) -> str:
+    """Return the pooling mode of a sentence-transformers export.
+
+    Reads ``1_Pooling/config.json`` and defaults to ``mean`` without one.
+    """
+    path = os.path.join(model_dir, "1_Pooling", "config.json")
+    if not os.path.exists(path):
+        return "mean"
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if config.get("pooling_mode_cls_token"):
+        return "cls"
+    if config.get("pooling_mode_mean_tokens"):
+        return "mean"
+    raise ValueError(
+        f"Unsupported pooling in {path}; set LOCAL_EMBEDDING_POOLING to cls or mean"
+    )
+
+
+class OnnxEmbeddings:
+    """Sentence embeddings from a local ONNX model, computed on the CPU.
+
+    ``model_dir`` holds ``model.onnx`` and a Hugging Face ``tokenizer.json``
+    (the layout FastEmbed and ``optimum`` exports use). Token embeddings are
+    pooled and L2-normalized. ``pooling`` is ``mean`` (over the attention
+    mask) or ``cls`` (the first token); by default it is read from the
+    model's ``1_Pooling/config.json``. Models that already output one vector
+    per text are only normalized.
+
+    ``embed_documents`` splits its input into batches and runs up to
+    ``workers`` of them at once; each run gets an equal share of the cores.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        threads: Optional[int] = None,
+        pooling: str = DEFAULT_POOLING,
+    ):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The local embedding provider needs onnxruntime and tokenizers: "
+                "pip install onnxruntime tokenizers"
+            ) from e
+
+        model_path = os.path.join(model_dir, "model.onnx")
+        tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+        for path in (model_path, tokenizer_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Local embedding model not found: {path}")
+
+        self.pooling = pooling or read_pooling(model_dir)
+        if self.pooling not in POOLING_MODES:
+            raise ValueError(
+                f"Unsupported pooling {self.pooling!r}; expected one of "
+                f"{', '.join(POOLING_MODES)}"
+            )
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or max(
+            1, (os.cpu_count() or 1) // self.workers
+        )
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(MAX_TOKENS)
+        padding = self.tokenizer.padding or {}
+        self.tokenizer.enable_padding(
+            pad_id=padding.get("pad_id", 0),
+            pad_token=padding.get("pad_token", "[PAD]"),
+        )
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="onnx")
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array(
+            [e.attention_mask for e in encodings], dtype=np.int64
+        )
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        feeds = {
+            name: value for name, value in feeds.items() if name in self.input_names
+        }
+        output = self.session.run(None, feeds)[0]
+
+        if output.ndim == 3 and self.pooling == "cls":
+            output = output[:, 0]
+        elif output.ndim == 3:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return (output / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0].tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        batches = [
+            texts[start : start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        if len(batches) <= 1:
+            results = [self._embed(batch) for batch in batches]
+        else:
+            # onnxruntime releases the GIL, so batches run in parallel
+            results = list(self._pool.map(self._embed, batches))
+        return [vector.tolist() for result in results for vector in result]
@@ -0,0 +1,121 @@
+# openai_embeddings.py
+
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+# Inputs per request; the API accepts up to 2048
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "512"))
+DEFAULT_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+MAX_BACKOFF = 30.0
+
+
+class EmbeddingAPIError(RuntimeError):
+    """The embeddings API rejected a request or kept failing after retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class HttpEmbeddings:
+    """Minimal OpenAI / Azure OpenAI embeddings client on a pooled ``httpx`` client.
+
+    Inputs are sent ``batch_size`` at a time. Rate limits, server errors and
+    dropped connections are retried with exponential backoff and jitter,
+    honouring ``Retry-After``. The underlying connections are kept alive
+    and shared by every call, including calls from several threads.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        dimensions: Optional[int] = None,
+        azure_endpoint: str = "",
+        azure_api_version: str = "",
+        azure_deployment: str = "",
+        base_url: str = OPENAI_BASE_URL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = 30.0,
+    ):
+        self.model = model
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        if azure_endpoint:
+            deployment = azure_deployment or model
+            self.url = (
+                f"{azure_endpoint.rstrip('/')}/openai/deployments/{deployment}"
+                "/embeddings"
+            )
+            self.params = {"api-version": azure_api_version}
+            headers = {"api-key": api_key}
+        else:
+            self.url = f"{base_url.rstrip('/')}/embeddings"
+            self.params = {}
+            headers = {"Authorization": f"Bearer {api_key}"}
+        self.client = httpx.Client(
+            headers=headers, timeout=httpx.Timeout(timeout, connect=5.0)
+        )
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                return min(float(retry_after), MAX_BACKOFF)
+            except (TypeError, ValueError):
+                pass
+        return min(2**attempt, MAX_BACKOFF) * (0.5 + random.random() / 2)
+
+    def _post(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.client.post(self.url, params=self.params, json=body)
+            except httpx.TransportError as e:
+                error: Exception = e
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                try:
+                    message = response.json()["error"]["message"]
+                except (ValueError, KeyError, TypeError):
+                    message = response.text
+                error = EmbeddingAPIError(
+                    f"Embeddings request failed ({response.status_code}): {message}",
+                    response.status_code,
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    raise error
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, response))
+        raise EmbeddingAPIError(
+            f"Embeddings request failed after {self.max_retries + 1} attempts: {error}",
+            getattr(error, "status_code", None),
+        ) from error
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        body: Dict[str, Any] = {"model": self.model, "input": texts}
+        if self.dimensions:
+            body["dimensions"] = self.dimensions
+        data = self._post(body)["data"]
+        return [item["embedding"] for item in sorted(data, key=lambda d: d["index"])]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed(texts[start : start + self.batch_size]))
+        return vectors
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,116 @@
+# result_cache.py
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from qdrant_client import QdrantClient
+
+
+def vector_digest(vector: Sequence[float]) -> str:
+    """Hash a dense query vector by its float32 bytes."""
+    return hashlib.sha1(array("f", vector).tobytes()).hexdigest()
+
+
+def canonical_params(params: Any) -> str:
+    """Return a stable string for a pydantic model (or ``None``)."""
+    if params is None:
+        return ""
+    if hasattr(params, "model_dump"):
+        params = params.model_dump(exclude_none=True)
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class ResultCache:
+    """Process-wide LRU cache of search results bounded by size in bytes.
+
+    Entries are tagged with the collection version (point count and optimizer
+    status) they were computed against. The version is re-read at most every
+    ``version_ttl`` seconds; a change drops that collection's entries.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, version_ttl: float = 5.0):
+        self.max_bytes = max_bytes
+        self.version_ttl = version_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any, int]]" = OrderedDict()
+        self._versions: Dict[Hashable, Tuple[Any, float]] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def collection_version(
+        self, client: QdrantClient, namespace: Hashable, collection_name: str
+    ) -> Any:
+        """Return the collection version, refreshing it after ``version_ttl``."""
+        scope = (namespace, collection_name)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(scope)
+        if cached is not None and now - cached[1] < self.version_ttl:
+            return cached[0]
+        info = client.get_collection(collection_name)
+        version = (info.points_count, str(info.optimizer_status))
+        with self._lock:
+            if cached is not None and cached[0] != version:
+                self._drop_scope(scope)
+            self._versions[scope] = (version, now)
+        return version
+
+    def get(self, key: Tuple, version: Any) -> Optional[List[Any]]:
+        """Return cached points for ``key`` if computed against ``version``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != version:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, version: Any, points: List[Any]) -> None:
+        """Store ``points`` and evict least recently used entries over budget."""
+        size = len(pickle.dumps(points, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (points, version, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: Tuple) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def _drop_scope(self, scope: Tuple) -> None:
+        # Keys start with (namespace, collection_name)
+        for key in [key for key in self._entries if key[:2] == scope]:
+            self._remove(key)
+            self.invalidations += 1
+
+
+result_cache = ResultCache(
+    max_bytes=int(os.getenv("RESULT_CACHE_MB", "64")) * 1024 * 1024
+)
@@ -0,0 +1,275 @@
+# schema.py
+
+import hashlib
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import QdrantClient
+
+# Distinct values tracked per field before cardinality is reported as a floor
+MAX_TRACKED_VALUES = 1000
+# Strings longer than this, or containing spaces, are treated as full text
+MAX_KEYWORD_LENGTH = 64
+
+
+def infer_value_type(value: Any) -> Optional[str]:
+    """Infer a Qdrant payload type name for a single payload value."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        if len(value) >= 10 and value[4:5] == "-":
+            try:
+                datetime.fromisoformat(value.replace("Z", "+00:00"))
+                return "datetime"
+            except ValueError:
+                pass
+        if len(value) > MAX_KEYWORD_LENGTH or " " in value:
+            return "text"
+        return "keyword"
+    if isinstance(value, dict):
+        if "lat" in value and "lon" in value:
+            return "geo"
+        return "object"
+    return "object"
+
+
+def merge_types(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Combine two inferred types into the narrowest type covering both."""
+    if current is None or current == new:
+        return new
+    if new is None:
+        return current
+    if {current, new} == {"integer", "float"}:
+        return "float"
+    if {current, new} == {"keyword", "text"}:
+        return "text"
+    return "mixed"
+
+
+@dataclass
+class FieldInfo:
+    """Inferred type and sampled statistics for one payload key."""
+
+    key: str
+    type: Optional[str] = None
+    indexed_type: Optional[str] = None
+    is_array: bool = False
+    occurrences: int = 0
+    cardinality: int = 0
+    cardinality_capped: bool = False
+    _values: set = field(default_factory=set, repr=False)
+
+    @property
+    def effective_type(self) -> str:
+        """Type used for filtering: the index type wins over the sampled one."""
+        return self.indexed_type or self.type or "keyword"
+
+    def observe(self, value: Any) -> None:
+        """Record one sampled payload value."""
+        self.occurrences += 1
+        values = value if isinstance(value, list) else [value]
+        if isinstance(value, list):
+            self.is_array = True
+        for item in values:
+            self.type = merge_types(self.type, infer_value_type(item))
+            if self.cardinality_capped:
+                continue
+            try:
+                self._values.add(item)
+            except TypeError:
+                self._values.add(repr(item))
+            if len(self._values) >= MAX_TRACKED_VALUES:
+                self.cardinality_capped = True
+        self.cardinality = len(self._values)
+
+
+@dataclass
+class CollectionSchema:
+    """Payload schema of one collection, merged from its index and a sample."""
+
+    collection: str
+    fields: Dict[str, FieldInfo]
+    points_count: Optional[int]
+    sample_size: int
+    fingerprint: str
+    vector_sizes: Dict[str, int] = field(default_factory=dict)
+    sparse_vectors: List[str] = field(default_factory=list)
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def keys(self) -> List[str]:
+        return sorted(self.fields)
+
+    @property
+    def vector_names(self) -> List[str]:
+        """Named dense vectors; empty for a collection with one unnamed vector."""
+        return [name for name in self.vector_sizes if name]
+
+    def field_types(self) -> Dict[str, str]:
+        return {key: info.effective_type for key, info in self.fields.items()}
+
+
+def collection_fingerprint(info) -> str:
+    """Return a digest that changes when a collection's data or config changes."""
+    config = info.config.model_dump_json() if info.config is not None else ""
+    raw = f"{info.points_count}|{config}|{sorted(info.payload_schema or {})}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def vector_sizes(info) -> Dict[str, int]:
+    """Return the dense vector sizes of a collection ("" for an unnamed vector)."""
+    vectors = info.config.params.vectors if info.config is not None else None
+    if vectors is None:
+        return {}
+    if isinstance(vectors, dict):
+        return {name: params.size for name, params in vectors.items()}
+    return {"": vectors.size}
+
+
+def sparse_vector_names(info) -> List[str]:
+    """Return the names of a collection's sparse vectors."""
+    sparse = info.config.params.sparse_vectors if info.config is not None else None
+    return sorted(sparse or {})
+
+
+class SchemaDiscovery:
+    """Caches the collection catalog and per-collection payload schemas.
+
+    Schemas are served from memory. After ``ttl`` seconds a background thread
+    re-checks the collection and only re-samples points when its point count
+    or configuration changed.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        sample_size: int = 256,
+        ttl: float = 60.0,
+        catalog_ttl: float = 30.0,
+    ):
+        self.client = client
+        self.sample_size = sample_size
+        self.ttl = ttl
+        self.catalog_ttl = catalog_ttl
+        self._lock = threading.Lock()
+        self._catalog: Optional[List[str]] = None
+        self._catalog_at = 0.0
+        self._schemas: Dict[str, CollectionSchema] = {}
+        self._refreshing: set = set()
+
+    def collection_names(self) -> List[str]:
+        """Return the names of all collections, cached for ``catalog_ttl``."""
+        now = time.monotonic()
+        if self._catalog is None or now - self._catalog_at > self.catalog_ttl:
+            collections = self.client.get_collections()
+            self._catalog = [c.name for c in collections.collections]
+            self._catalog_at = now
+        return self._catalog
+
+    def get_schema(self, collection_name: str) -> CollectionSchema:
+        """Return the cached schema, discovering it on first use."""
+        schema = self._schemas.get(collection_name)
+        if schema is None:
+            schema = self._discover(collection_name)
+        elif time.monotonic() - schema.fetched_at > self.ttl:
+            self._refresh_in_background(collection_name)
+        return schema
+
+    def invalidate(self, collection_name: Optional[str] = None) -> None:
+        """Drop cached schemas (and the catalog when no collection is given)."""
+        with self._lock:
+            if collection_name is None:
+                self._schemas.clear()
+                self._catalog = None
+            else:
+                self._schemas.pop(collection_name, None)
+
+    def _discover(self, collection_name: str, info=None) -> CollectionSchema:
+        if info is None:
+            info = self.client.get_collection(collection_name)
+        fields: Dict[str, FieldInfo] = {}
+        for key, index in (info.payload_schema or {}).items():
+            fields[key] = FieldInfo(key=key, indexed_type=str(index.data_type.value))
+
+        sampled = 0
+        offset = None
+        while sampled < self.sample_size:
+            records, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=min(self.sample_size - sampled, 256),
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for record in records:
+                for key, value in (record.payload or {}).items():
+                    fields.setdefault(key, FieldInfo(key=key)).observe(value)
+            sampled += len(records)
+            if offset is None or not records:
+                break
+
+        schema = CollectionSchema(
+            collection=collection_name,
+            fields=fields,
+            points_count=info.points_count,
+            sample_size=sampled,
+            fingerprint=collection_fingerprint(info),
+            vector_sizes=vector_sizes(info),
+            sparse_vectors=sparse_vector_names(info),
+        )
+        with self._lock:
+            self._schemas[collection_name] = schema
+        return schema
+
+    def _refresh_in_background(self, collection_name: str) -> None:
+        with self._lock:
+            if collection_name in self._refreshing:
+                return
+            self._refreshing.add(collection_name)
+        threading.Thread(
+            target=self._refresh, args=(collection_name,), daemon=True
+        ).start()
+
+    def _refresh(self, collection_name: str) -> None:
+        try:
+            info = self.client.get_collection(collection_name)
+            schema = self._schemas.get(collection_name)
+            fingerprint = collection_fingerprint(info)
+            if schema is not None and schema.fingerprint == fingerprint:
+                schema.fetched_at = time.monotonic()
+            else:
+                self._discover(collection_name, info)
+        except Exception:
+            # Keep serving the stale schema and retry after the next expiry
+            schema = self._schemas.get(collection_name)
+            if schema is not None:
+                schema.fetched_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._refreshing.discard(collection_name)
+
+
+_services: "weakref.WeakKeyDictionary[QdrantClient, SchemaDiscovery]" = (
+    weakref.WeakKeyDictionary()
+)
+_services_lock = threading.Lock()
+
+
+def get_schema_discovery(client: QdrantClient) -> SchemaDiscovery:
+    """Return the shared schema discovery service for a pooled client."""
+    with _services_lock:
+        service = _services.get(client)
+        if service is None:
+            service = SchemaDiscovery(client)
+            _services[client] = service
+        return service
@@ -0,0 +1,282 @@
+# server.py
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from qdrant_client import models
+
+from engine import QueryEngine, point_to_dict, recommend_query, to_search_params
+from filtering import to_filter
+
+# Requests with larger bodies are rejected before they are parsed
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _required(body: Dict[str, Any], key: str) -> Any:
+    if key not in body:
+        raise HTTPError(400, f"'{key}' is required")
+    return body[key]
+
+
+def _validated(fn: Callable, *args: Any) -> Any:
+    """Parse part of a request, turning parse errors into 400 responses."""
+    try:
+        return fn(*args)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPError(400, str(e))
+
+
+def _search_options(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate the options shared by the search routes."""
+    return {
+        "query_filter": _validated(to_filter, body.get("filter")),
+        "limit": _validated(int, body.get("limit", 10)),
+        "score_threshold": _validated(
+            lambda value: None if value is None else float(value),
+            body.get("score_threshold"),
+        ),
+        "params": _validated(to_search_params, body.get("params")),
+    }
+
+
+class QueryServer:
+    """Minimal ASGI application serving a ``QueryEngine`` over HTTP.
+
+    Routes:
+
+    - ``GET /health``
+    - ``GET /collections``
+    - ``POST /search`` with ``{"collection", "query" or "vector" or
+      "positive"/"negative" point IDs, "filter", "limit", "offset",
+      "score_threshold", "params", "with_payload", "using"}``; adding
+      ``"sparse_using"`` (and ``"fusion"``) to a text query runs a hybrid
+      dense + sparse search
+    - ``POST /search/batch`` with ``{"collection", "queries": [{"query",
+      "filter"}], "filter", "limit", "score_threshold", "params", "using"}``
+
+    Filters are Qdrant filter JSON or ``{"key", "operator", "value"}``
+    condition specs. Engine calls block on network I/O, so they run on a
+    thread pool of ``threads`` workers; the event loop only parses and
+    serializes. The engine is created from the environment on first use.
+
+    Malformed requests get a 400 with the reason. Any other failure is
+    logged and answered with a generic 500, so engine errors never leak.
+    """
+
+    def __init__(self, engine: Optional[QueryEngine] = None, threads: int = 32):
+        self._engine = engine
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix="query")
+        self._routes: Dict[Tuple[str, str], Callable] = {
+            ("GET", "/health"): self.health,
+            ("GET", "/collections"): self.collections,
+            ("POST", "/search"): self.search,
+            ("POST", "/search/batch"): self.search_batch,
+        }
+
+    @property
+    def engine(self) -> QueryEngine:
+        if self._engine is None:
+            self._engine = QueryEngine.from_env()
+        return self._engine
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        try:
+            handler = self._routes.get((scope["method"], scope["path"]))
+            if handler is None:
+                if any(path == scope["path"] for _, path in self._routes):
+                    raise HTTPError(405, "Method not allowed")
+                raise HTTPError(404, "Not found")
+            body = await self._read_json(receive) if scope["method"] == "POST" else {}
+            status, result = 200, await handler(body)
+        except HTTPError as e:
+            status, result = e.status, {"error": str(e)}
+        except Exception:
+            logger.exception("%s %s failed", scope["method"], scope["path"])
+            status, result = 500, {"error": "Internal server error"}
+        await self._send_json(send, status, result)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._engine is not None:
+                    self._engine.close()
+                self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_json(self, receive) -> Dict[str, Any]:
+        chunks: List[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+        try:
+            body = json.loads(b"".join(chunks) or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    async def _send_json(self, send, status: int, result: Any):
+        payload = json.dumps(result, default=str).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    async def _run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def health(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {"status": "ok"}
+
+    async def collections(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {"collections": await self._run(self.engine.collection_names)}
+
+    async def search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        collection = _required(body, "collection")
+        options = _search_options(body)
+        options["offset"] = _validated(int, body.get("offset", 0))
+        options["with_payload"] = body.get("with_payload", True)
+        using = body.get("using")
+        if body.get("sparse_using") and body.get("query"):
+            points, cached = await self._run(
+                self.engine.hybrid,
+                collection,
+                body["query"],
+                body["sparse_using"],
+                using=using,
+                fusion=_validated(models.Fusion, body.get("fusion", "rrf")).value,
+                **options,
+            )
+            return {
+                "points": [point_to_dict(point) for point in points],
+                "cached": cached,
+            }
+        if body.get("positive") or body.get("negative"):
+            query = _validated(
+                recommend_query,
+                body.get("positive", []),
+                body.get("negative", []),
+                body.get("strategy"),
+            )
+        elif "vector" in body:
+            query = body["vector"]
+            if not isinstance(query, list):
+                raise HTTPError(400, "'vector' must be a list of numbers")
+            await self._run(
+                _validated, self.engine.check_dimension, collection, query, using
+            )
+        elif body.get("query"):
+            query = await self._run(self.engine.embed, body["query"])
+        else:
+            raise HTTPError(
+                400, "One of 'query', 'vector' or 'positive'/'negative' is required"
+            )
+        points, cached = await self._run(
+            self.engine.search, collection, query, using=using, **options
+        )
+        return {"points": [point_to_dict(point) for point in points], "cached": cached}
+
+    async def search_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        collection = _required(body, "collection")
+        queries = _required(body, "queries")
+        if not isinstance(queries, list):
+            raise HTTPError(400, "'queries' must be a list")
+        rows = [row if isinstance(row, dict) else {"query": row} for row in queries]
+        if any(not isinstance(row.get("query"), str) for row in rows):
+            raise HTTPError(400, "Every query needs a 'query' string")
+        options = _search_options(body)
+        filters = [
+            _validated(to_filter, row["filter"])
+            if row.get("filter")
+            else options["query_filter"]
+            for row in rows
+        ]
+        if not rows:
+            return {"results": []}
+        vectors = await self._run(
+            self.engine.embed_batch, [row["query"] for row in rows]
+        )
+        results = await self._run(
+            self.engine.search_many,
+            collection,
+            vectors,
+            filters,
+            options["limit"],
+            options["score_threshold"],
+            options["params"],
+            body.get("using"),
+        )
+        return {
+            "results": [
+                [point_to_dict(point) for point in points] for points in results
+            ]
+        }
+
+
+app = QueryServer(threads=int(os.getenv("QDRANT_UI_SERVER_THREADS", "32")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Qdrant queries over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Server processes")
+    parser.add_argument(
+        "--threads", type=int, default=32, help="Engine threads per process"
+    )
+    args = parser.parse_args()
+
+    import uvicorn
+
+    # Worker processes import ``server:app`` again and read this setting
+    os.environ["QDRANT_UI_SERVER_THREADS"] = str(args.threads)
+    uvicorn.run(
+        "server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,53 @@
 # session.py
 
-import os
+import uuid
+
 import streamlit as st
 
+from engine import EngineConfig, QueryEngine
+from tracing import Tracer
+from utils import ConnectionKey, connection_manager
+
 def initialize_session_state():
     """Initialize session state variables for API keys and URLs with environment defaults."""
     # Get environment variables
-    env_openai_key = os.getenv("OPENAI_API_KEY", "")
-    env_qdrant_url = os.getenv("QDRANT_URL", "")
-    env_qdrant_key = os.getenv("QDRANT_KEY", "")
- 
-    env_azure_key = os.getenv("AZURE_API_KEY", "")
-    env_azure_endpoint = os.getenv("AZURE_ENDPOINT", "")
-    env_azure_api_version = os.getenv("AZURE_API_VERSION", "")
+    config = EngineConfig.from_env()
 
     # Initialize session state with environment variables
     if 'openai_api_key' not in st.session_state:
-        st.session_state.openai_api_key = env_openai_key
+        st.session_state.openai_api_key = config.openai_api_key
     if 'azure_api_key' not in st.session_state:
-        st.session_state.azure_api_key = env_azure_key
+        st.session_state.azure_api_key = config.azure_api_key
     if 'azure_endpoint' not in st.session_state:
-        st.session_state.azure_endpoint = env_azure_endpoint
+        st.session_state.azure_endpoint = config.azure_endpoint
     if 'azure_api_version' not in st.session_state:
-        st.session_state.azure_api_version = env_azure_api_version
+        st.session_state.azure_api_version = config.azure_api_version
+    if 'azure_deployment' not in st.session_state:
+        st.session_state.azure_deployment = config.azure_deployment
+    if 'local_model_dir' not in st.session_state:
+        st.session_state.local_model_dir = config.local_model_dir
+    if 'sparse_model' not in st.session_state:
+        st.session_state.sparse_model = config.sparse_model
+    if 'embedding_model' not in st.session_state:
+        st.session_state.embedding_model = config.embedding_model
+    if 'embedding_backend' not in st.session_state:
+        st.session_state.embedding_backend = config.embedding_backend
+    if 'embedding_dimensions' not in st.session_state:
+        st.session_state.embedding_dimensions = config.embedding_dimensions
     if 'qdrant_url' not in st.session_state:
-        st.session_state.qdrant_url = env_qdrant_url
+        st.session_state.qdrant_url = config.qdrant_url
     if 'qdrant_api_key' not in st.session_state:
-        st.session_state.qdrant_api_key = env_qdrant_key
+        st.session_state.qdrant_api_key = config.qdrant_api_key
+    if 'qdrant_prefer_grpc' not in st.session_state:
+        st.session_state.qdrant_prefer_grpc = config.prefer_grpc
+    if 'trace_enabled' not in st.session_state:
+        st.session_state.trace_enabled = bool(config.trace_log_path)
+    if 'trace_log_path' not in st.session_state:
+        st.session_state.trace_log_path = config.trace_log_path
+    if 'trace_log_enabled' not in st.session_state:
+        st.session_state.trace_log_enabled = True
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     if 'using_env_vars' not in st.session_state:
         st.session_state.using_env_vars = True
     if 'must_filters' not in st.session_state:
@@ -36,4 +57,72 @@ def initialize_session_state():
     if 'should_filters' not in st.session_state:
         st.session_state.should_filters = []
     if 'embedding_type' not in st.session_state:
-        st.session_state.embedding_type = 'openai'
+        st.session_state.embedding_type = config.embedding_type
+
+
+def get_qdrant_client():
+    """Return the pooled Qdrant client for the current sidebar settings."""
+    key = ConnectionKey(
+        url=st.session_state.qdrant_url,
+        api_key=st.session_state.qdrant_api_key,
+        prefer_grpc=st.session_state.qdrant_prefer_grpc,
+    )
+    previous = st.session_state.get('qdrant_connection')
+    client = connection_manager.acquire(key, st.session_state.session_id)
+    if previous is not None and previous != key:
+        # Settings changed: let the manager close the old client if unused
+        connection_manager.release(previous, st.session_state.session_id)
+    st.session_state.qdrant_connection = key
+    return client
+
+
+def get_tracer() -> Tracer:
+    """Return this session's tracer, synced with the sidebar settings."""
+    tracer = st.session_state.get('tracer')
+    if tracer is None:
+        tracer = Tracer()
+        tracer.session_id = st.session_state.session_id
+        st.session_state.tracer = tracer
+    tracer.enabled = st.session_state.trace_enabled
+    tracer.log_path = (
+        st.session_state.trace_log_path
+        if tracer.enabled and st.session_state.trace_log_enabled
+        else ""
+    )
+    return tracer
+
+
+def get_async_qdrant_client():
+    """Return the pooled async client for the session's current connection.
+
+    Coroutines using it must run on ``utils.event_loop_thread``.
+    """
+    return connection_manager.get_async(st.session_state.qdrant_connection)
+
+
+def get_engine_config() -> EngineConfig:
+    """Return the engine configuration for the current sidebar settings."""
+    return EngineConfig(
+        qdrant_url=st.session_state.qdrant_url,
+        qdrant_api_key=st.session_state.qdrant_api_key,
+        prefer_grpc=st.session_state.qdrant_prefer_grpc,
+        embedding_type=st.session_state.embedding_type,
+        embedding_model=st.session_state.embedding_model,
+        embedding_dimensions=st.session_state.embedding_dimensions,
+        embedding_backend=st.session_state.embedding_backend,
+        openai_api_key=st.session_state.openai_api_key,
+        azure_api_key=st.session_state.azure_api_key,
+        azure_endpoint=st.session_state.azure_endpoint,
+        azure_api_version=st.session_state.azure_api_version,
+        azure_deployment=st.session_state.azure_deployment,
+        local_model_dir=st.session_state.local_model_dir,
+        sparse_model=st.session_state.sparse_model,
+        trace_log_path=st.session_state.trace_log_path,
+    )
+
+
+def get_engine() -> QueryEngine:
+    """Return a query engine bound to this session's client and tracer."""
+    return QueryEngine(
+        get_engine_config(), client=get_qdrant_client(), tracer=get_tracer()
+    )
@@ -2,6 +2,10 @@
 import os
 import streamlit as st
 
+from embeddings import BACKENDS, get_cache_stats
+from engine import EngineConfig
+from result_cache import result_cache
+
 
 def create_sidebar():
     """Create sidebar for API configuration with environment variable defaults."""
@@ -11,11 +15,24 @@ def create_sidebar():
         # Create expander for API settings
         with st.expander("API Configuration", expanded=False):
             # Embedding type selector
+            providers = ["openai", "azure", "local"]
             st.session_state.embedding_type = st.radio(
                 "Embedding Type",
-                options=["openai", "azure"],  # 'fastembed' not totally enabled yet
-                index=0 if st.session_state.embedding_type == "openai" else 1,
-                help="Select embedding provider",
+                options=providers,
+                index=(
+                    providers.index(st.session_state.embedding_type)
+                    if st.session_state.embedding_type in providers
+                    else 0
+                ),
+                format_func=lambda name: "local (ONNX)" if name == "local" else name,
+                help="Select embedding provider; local runs an ONNX model on CPU",
+            )
+
+            # Transport selector; gRPC keeps a long-lived channel with keep-alive
+            st.session_state.qdrant_prefer_grpc = st.checkbox(
+                "Prefer gRPC",
+                value=st.session_state.qdrant_prefer_grpc,
+                help="Use gRPC instead of REST for lower per-call latency",
             )
 
             # Toggle for using environment variables
@@ -39,6 +56,15 @@ def create_sidebar():
                         "- Azure API Key:",
                         "✅ Set" if os.getenv("AZURE_API_KEY") else "❌ Not Set",
                     )
+                if st.session_state.embedding_type == "local":
+                    st.write(
+                        "- Local Model Directory:",
+                        (
+                            "✅ Set"
+                            if os.getenv("LOCAL_EMBEDDING_MODEL_DIR")
+                            else "❌ Not Set"
+                        ),
+                    )
                 st.write(
                     "- Qdrant URL:",
                     "✅ Set" if os.getenv("QDRANT_URL") else "❌ Not Set",
@@ -49,10 +75,20 @@ def create_sidebar():
                 )
 
                 # Reset to environment variables
-                st.session_state.qdrant_url = os.getenv("QDRANT_URL", "")
-                st.session_state.qdrant_api_key = os.getenv("QDRANT_KEY", "")
+                config = EngineConfig.from_env()
+                st.session_state.qdrant_url = config.qdrant_url
+                st.session_state.qdrant_api_key = config.qdrant_api_key
                 if st.session_state.embedding_type == "openai":
-                    st.session_state.openai_api_key = os.getenv("OPENAI_API_KEY", "")
+                    st.session_state.openai_api_key = config.openai_api_key
+                if st.session_state.embedding_type == "azure":
+                    st.session_state.azure_api_key = config.azure_api_key
+                    st.session_state.azure_endpoint = config.azure_endpoint
+                    st.session_state.azure_api_version = config.azure_api_version
+                    st.session_state.azure_deployment = config.azure_deployment
+                if st.session_state.embedding_type == "local":
+                    st.session_state.local_model_dir = config.local_model_dir
+                st.session_state.embedding_model = config.embedding_model
+                st.session_state.embedding_backend = config.embedding_backend
             else:
                 # Custom configuration inputs
                 if st.session_state.embedding_type == "openai":
@@ -90,6 +126,41 @@ def create_sidebar():
                     if azure_api_version:
                         st.session_state.azure_api_version = azure_api_version
 
+                    azure_deployment = st.text_input(
+                        "Azure Deployment",
+                        value=st.session_state.azure_deployment,
+                        help="Enter your Azure embeddings deployment name",
+                    )
+                    if azure_deployment:
+                        st.session_state.azure_deployment = azure_deployment
+
+                if st.session_state.embedding_type == "local":
+                    local_model_dir = st.text_input(
+                        "Local Model Directory",
+                        value=st.session_state.local_model_dir,
+                        help="Directory with model.onnx and tokenizer.json",
+                    )
+                    if local_model_dir:
+                        st.session_state.local_model_dir = local_model_dir
+                else:
+                    embedding_model = st.text_input(
+                        "Embedding Model",
+                        value=st.session_state.embedding_model,
+                        help="Enter the embedding model name",
+                    )
+                    if embedding_model:
+                        st.session_state.embedding_model = embedding_model
+                    st.session_state.embedding_backend = st.radio(
+                        "Client",
+                        list(BACKENDS),
+                        index=list(BACKENDS).index(st.session_state.embedding_backend),
+                        format_func=lambda backend: (
+                            "built-in HTTP" if backend == "http" else "LangChain"
+                        ),
+                        horizontal=True,
+                        help="LangChain must be installed to use it",
+                    )
+
                 qdrant_url = st.text_input(
                     "Qdrant URL",
                     value=st.session_state.qdrant_url,
@@ -111,6 +182,24 @@ def create_sidebar():
                 if st.button("Save Configuration"):
                     st.success("Custom configuration saved successfully!")
 
+        # Per-stage latency tracing
+        with st.expander("Performance", expanded=False):
+            st.session_state.trace_enabled = st.checkbox(
+                "Enable tracing",
+                value=st.session_state.trace_enabled,
+                help="Time each stage of a query and show a Performance panel",
+            )
+            # The log path only comes from QDRANT_UI_TRACE_LOG, never the UI
+            if st.session_state.trace_log_path:
+                st.session_state.trace_log_enabled = st.checkbox(
+                    "Write trace log",
+                    value=st.session_state.trace_log_enabled,
+                    help="Append one JSON line per stage to "
+                    f"{st.session_state.trace_log_path}",
+                )
+            else:
+                st.caption("Set QDRANT_UI_TRACE_LOG to also write a trace log")
+
         # Show current active configuration
         st.write("Active Configuration:")
         st.write(
@@ -134,3 +223,23 @@ def create_sidebar():
             "- Qdrant API Key:",
             "✅ Set" if st.session_state.qdrant_api_key else "❌ Not Set",
         )
+        st.write(
+            "- Qdrant Transport:",
+            "gRPC" if st.session_state.qdrant_prefer_grpc else "REST",
+        )
+
+        # Query embedding cache counters
+        stats = get_cache_stats()
+        st.write("Embedding Cache:")
+        st.write(
+            f"- Hits: {stats['memory_hits']} memory, {stats['disk_hits']} disk"
+        )
+        st.write(f"- Misses: {stats['misses']}")
+
+        # Shared search result cache counters
+        stats = result_cache.stats()
+        st.write("Result Cache:")
+        st.write(f"- Hits: {stats['hits']}, Misses: {stats['misses']}")
+        st.write(
+            f"- {stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.1f} MB"
+        )
@@ -0,0 +1,146 @@
+# similar.py
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import streamlit as st
+from qdrant_client import models
+
+from engine import QueryEngine, discover_query, recommend_query
+
+STRATEGIES = ["average_vector", "best_score", "sum_scores"]
+
+
+def _example_keys(collection_name: str) -> Tuple[str, str]:
+    return f"similar_positive_{collection_name}", f"similar_negative_{collection_name}"
+
+
+def add_example(collection_name: str, point_id: Any, positive: bool = True) -> None:
+    """Button callback: add a point to the "more like this" examples."""
+    positive_key, negative_key = _example_keys(collection_name)
+    if positive:
+        key, other = positive_key, negative_key
+    else:
+        key, other = negative_key, positive_key
+    st.session_state[other] = [
+        item for item in st.session_state.get(other, []) if item != point_id
+    ]
+    if point_id not in st.session_state.get(key, []):
+        st.session_state[key] = st.session_state.get(key, []) + [point_id]
+
+
+def find_similar(collection_name: str, point_id: Any) -> None:
+    """Button callback: run a recommend search from a single result."""
+    positive_key, negative_key = _example_keys(collection_name)
+    st.session_state[positive_key] = [point_id]
+    st.session_state[negative_key] = []
+    st.session_state.similar_mode = "recommend"
+    st.session_state.run_similar = True
+
+
+def _parse_id(value: Any) -> Any:
+    """Point IDs are unsigned integers or UUID strings."""
+    text = str(value).strip()
+    return int(text) if text.isdigit() else text
+
+
+def context_pairs(
+    positive: Sequence[Any], negative: Sequence[Any]
+) -> List[Tuple[Any, Any]]:
+    """Pair positive and negative examples in order for a discovery search."""
+    if len(positive) != len(negative):
+        raise ValueError(
+            "Discovery pairs examples in order, so it needs as many negative "
+            f"examples as positive ones (got {len(positive)} positive and "
+            f"{len(negative)} negative)"
+        )
+    return list(zip(positive, negative))
+
+
+def create_similar_interface(
+    engine: QueryEngine,
+    collection_name: str,
+    filter_clause: Optional[models.Filter],
+    limit: int,
+    score_threshold: float,
+    search_params: Optional[models.SearchParams] = None,
+) -> Optional[Dict[str, Any]]:
+    """Create the "more like this" panel; returns a search request to run.
+
+    Searches use the stored vectors of example points, so nothing is
+    embedded. The active filter, limit and search params still apply.
+    """
+    positive_key, negative_key = _example_keys(collection_name)
+    vector_names = engine.schema(collection_name).vector_names
+    run = st.session_state.pop("run_similar", False)
+    has_examples = bool(
+        st.session_state.get(positive_key) or st.session_state.get(negative_key)
+    )
+    with st.expander("More Like This", expanded=has_examples):
+        st.caption(
+            "Select a result row to add it as an example, or use its "
+            "Find Similar button."
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            positive = st.multiselect(
+                "Positive examples",
+                st.session_state.get(positive_key, []),
+                key=positive_key,
+            )
+        with col2:
+            negative = st.multiselect(
+                "Negative examples",
+                st.session_state.get(negative_key, []),
+                key=negative_key,
+            )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            mode = st.radio(
+                "Mode", ["recommend", "discover"], horizontal=True, key="similar_mode"
+            )
+        with col2:
+            using = (
+                st.selectbox("Vector", vector_names, key="similar_using")
+                if vector_names
+                else None
+            )
+        if mode == "recommend":
+            strategy = st.selectbox("Strategy", STRATEGIES, key="similar_strategy")
+        else:
+            st.caption(
+                "Positive and negative examples are paired in order into "
+                "context pairs, so add the same number of each. Results stay "
+                "on the positive side of every pair."
+            )
+            target = st.text_input(
+                "Target point ID (optional)", key="similar_target"
+            ).strip()
+
+        run = st.button("Find Similar Points") or run
+    if not run:
+        return None
+
+    positive = [_parse_id(item) for item in positive]
+    negative = [_parse_id(item) for item in negative]
+    try:
+        if mode == "recommend":
+            query = recommend_query(positive, negative, strategy)
+        else:
+            query = discover_query(
+                context_pairs(positive, negative),
+                _parse_id(target) if target else None,
+            )
+    except ValueError as e:
+        st.error(str(e))
+        return None
+    return {
+        "id": st.session_state.get("search_request", {}).get("id", 0) + 1,
+        "collection": collection_name,
+        "query": query,
+        "using": using,
+        "filter": filter_clause,
+        "limit": limit,
+        "score_threshold": score_threshold,
+        "params": search_params,
+    }
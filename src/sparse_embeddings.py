@@ -0,0 +1,100 @@
+# sparse_embeddings.py
+
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import List
+
+from qdrant_client import models
+
+# Name of the built-in encoder, used when no FastEmbed model is configured
+HASHING_MODEL = "hashing"
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingSparseEncoder:
+    """BM25-style sparse vectors from hashed tokens, with no model download.
+
+    Each lower-cased word maps to a CRC32 index. Queries weight each distinct
+    token 1.0. Documents get BM25 term-frequency saturation (``k``, ``b``
+    and ``avg_len`` as in FastEmbed's ``Qdrant/bm25``). IDF is left to the
+    server: create the sparse vector with ``modifier=idf``. Only collections
+    indexed with this encoder's ``embed_documents`` match its queries.
+    """
+
+    name = HASHING_MODEL
+
+    def __init__(self, k: float = 1.2, b: float = 0.75, avg_len: float = 256.0):
+        self.k = k
+        self.b = b
+        self.avg_len = avg_len
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def _index(token: str) -> int:
+        return zlib.crc32(token.encode("utf-8"))
+
+    def embed_query(self, text: str) -> models.SparseVector:
+        indices = sorted({self._index(token) for token in self.tokenize(text)})
+        return models.SparseVector(indices=indices, values=[1.0] * len(indices))
+
+    def embed_documents(self, texts: List[str]) -> List[models.SparseVector]:
+        vectors = []
+        for text in texts:
+            tokens = self.tokenize(text)
+            norm = self.k * (1 - self.b + self.b * len(tokens) / self.avg_len)
+            weights: Counter = Counter()
+            for token, tf in Counter(tokens).items():
+                # Distinct tokens may share a hash bucket; their weights add up
+                weights[self._index(token)] += tf * (self.k + 1) / (tf + norm)
+            indices = sorted(weights)
+            vectors.append(
+                models.SparseVector(
+                    indices=indices, values=[weights[i] for i in indices]
+                )
+            )
+        return vectors
+
+
+class FastEmbedSparseEncoder:
+    """Sparse vectors from a FastEmbed model such as ``Qdrant/bm25`` or SPLADE."""
+
+    def __init__(self, model_name: str):
+        try:
+            from fastembed import SparseTextEmbedding
+        except ImportError as e:
+            raise ImportError(
+                f"Sparse model {model_name!r} needs fastembed: pip install fastembed"
+            ) from e
+
+        self.name = model_name
+        self.model = SparseTextEmbedding(model_name=model_name)
+
+    @staticmethod
+    def _to_model(embedding) -> models.SparseVector:
+        return models.SparseVector(
+            indices=embedding.indices.tolist(), values=embedding.values.tolist()
+        )
+
+    def embed_query(self, text: str) -> models.SparseVector:
+        return self._to_model(next(iter(self.model.query_embed(text))))
+
+    def embed_documents(self, texts: List[str]) -> List[models.SparseVector]:
+        return [self._to_model(embedding) for embedding in self.model.embed(texts)]
+
+
+@lru_cache(maxsize=4)
+def get_sparse_encoder(model: str = ""):
+    """Return the encoder for ``model``, loading it once per process.
+
+    Without a model name the hashing encoder is used. A named model needs
+    ``fastembed``; ``ImportError`` is raised when it is not installed.
+    """
+    if model and model != HASHING_MODEL:
+        return FastEmbedSparseEncoder(model)
+    return HashingSparseEncoder()
+
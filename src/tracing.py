@@ -0,0 +1,149 @@
+# tracing.py
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+_log_lock = threading.Lock()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (``pct`` in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
+
+
+def payload_bytes(points: List[Any]) -> int:
+    """Approximate the payload size of a list of points as JSON bytes."""
+    return sum(
+        len(json.dumps(getattr(point, "payload", None), default=str))
+        for point in points
+    )
+
+
+class _NoopSpan:
+    """Returned when tracing is off so instrumented code pays almost nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **kwargs) -> None:
+        pass
+
+    def set_points(self, points: List[Any]) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Timing and size of one stage execution."""
+
+    __slots__ = ("tracer", "name", "start", "duration", "bytes", "hits")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+        self.duration = 0.0
+        self.bytes: Optional[int] = None
+        self.hits: Optional[int] = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = time.perf_counter() - self.start
+        self.tracer.record(self)
+        return False
+
+    def set(self, bytes: Optional[int] = None, hits: Optional[int] = None) -> None:
+        if bytes is not None:
+            self.bytes = bytes
+        if hits is not None:
+            self.hits = hits
+
+    def set_points(self, points: List[Any]) -> None:
+        """Record hit count and payload size of the points a stage returned."""
+        self.hits = len(points)
+        self.bytes = payload_bytes(points)
+
+
+class Tracer:
+    """Collects per-stage wall time, payload bytes and hit counts.
+
+    When disabled, ``stage()`` returns a shared no-op context manager.
+    """
+
+    def __init__(
+        self, enabled: bool = False, log_path: str = "", history: int = 500
+    ):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.session_id = ""
+        self.history = history
+        self.samples: Dict[str, Deque[float]] = {}
+        # Bounded so long-lived tracers (e.g. the HTTP server's) stay small
+        self.last_run: Deque[Span] = deque(maxlen=history)
+
+    def stage(self, name: str):
+        """Return a context manager timing the stage ``name``."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name)
+
+    def start_run(self) -> None:
+        """Mark the start of a new script run."""
+        self.last_run.clear()
+
+    def record(self, span: Span) -> None:
+        self.last_run.append(span)
+        if span.name not in self.samples:
+            self.samples[span.name] = deque(maxlen=self.history)
+        self.samples[span.name].append(span.duration)
+        if self.log_path:
+            entry = {
+                "ts": time.time(),
+                "session": self.session_id,
+                "stage": span.name,
+                "ms": round(span.duration * 1000, 3),
+                "bytes": span.bytes,
+                "hits": span.hits,
+            }
+            with _log_lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def summary(self) -> Dict[str, List[Any]]:
+        """Return a column-oriented table of the last run and session percentiles."""
+        last = {span.name: span for span in self.last_run}
+        columns: Dict[str, List[Any]] = {
+            "stage": [],
+            "last ms": [],
+            "p50 ms": [],
+            "p95 ms": [],
+            "runs": [],
+            "bytes": [],
+            "hits": [],
+        }
+        for name, durations in self.samples.items():
+            values = list(durations)
+            span = last.get(name)
+            columns["stage"].append(name)
+            columns["last ms"].append(round(span.duration * 1000, 1) if span else None)
+            columns["p50 ms"].append(round(percentile(values, 50) * 1000, 1))
+            columns["p95 ms"].append(round(percentile(values, 95) * 1000, 1))
+            columns["runs"].append(len(values))
+            columns["bytes"].append(span.bytes if span else None)
+            columns["hits"].append(span.hits if span else None)
+        return columns
@@ -0,0 +1,257 @@
+# tuning.py
+
+import itertools
+import time
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+from qdrant_client import QdrantClient, models
+
+from engine import QueryEngine
+from filtering import parse_list, to_filter
+from tracing import percentile
+
+
+def build_search_params(
+    hnsw_ef: Optional[int] = None,
+    exact: bool = False,
+    indexed_only: bool = False,
+    quantization_ignore: bool = False,
+    quantization_rescore: Optional[bool] = None,
+    quantization_oversampling: Optional[float] = None,
+) -> Optional[models.SearchParams]:
+    """Build search params, returning ``None`` when everything is default."""
+    quantization = None
+    if (
+        quantization_ignore
+        or quantization_rescore is not None
+        or quantization_oversampling
+    ):
+        quantization = models.QuantizationSearchParams(
+            ignore=quantization_ignore,
+            rescore=quantization_rescore,
+            oversampling=quantization_oversampling or None,
+        )
+    if not (hnsw_ef or exact or indexed_only or quantization):
+        return None
+    return models.SearchParams(
+        hnsw_ef=hnsw_ef or None,
+        exact=exact,
+        indexed_only=indexed_only,
+        quantization=quantization,
+    )
+
+
+def describe_params(params: Optional[models.SearchParams]) -> str:
+    """Short human readable label for a params combination."""
+    if params is None:
+        return "default"
+    parts = []
+    if params.exact:
+        parts.append("exact")
+    if params.hnsw_ef:
+        parts.append(f"ef={params.hnsw_ef}")
+    if params.indexed_only:
+        parts.append("indexed_only")
+    if params.quantization is not None:
+        q = params.quantization
+        if q.ignore:
+            parts.append("no-quant")
+        if q.rescore is not None:
+            parts.append(f"rescore={'on' if q.rescore else 'off'}")
+        if q.oversampling:
+            parts.append(f"os={q.oversampling:g}")
+    return " ".join(parts) or "default"
+
+
+def pareto_front(latencies: List[float], recalls: List[float]) -> List[bool]:
+    """Flag combinations no other combination beats on both latency and recall."""
+    front = []
+    for i, (latency, recall) in enumerate(zip(latencies, recalls)):
+        dominated = any(
+            other_latency <= latency
+            and other_recall >= recall
+            and (other_latency < latency or other_recall > recall)
+            for j, (other_latency, other_recall) in enumerate(zip(latencies, recalls))
+            if j != i
+        )
+        front.append(not dominated)
+    return front
+
+
+def run_sweep(
+    client: QdrantClient,
+    collection_name: str,
+    vectors: List[List[float]],
+    candidates: List[Optional[models.SearchParams]],
+    k: int,
+    query_filter: Optional[models.Filter] = None,
+    using: Optional[str] = None,
+) -> Dict[str, List[Any]]:
+    """Measure recall@k and latency of each params combination.
+
+    The ground truth for every query is an ``exact=True`` search. Each
+    candidate query is sent on its own so its latency can be measured.
+    ``using`` names the dense vector in collections with named vectors.
+    """
+    baseline = client.query_batch_points(
+        collection_name=collection_name,
+        requests=[
+            models.QueryRequest(
+                query=vector,
+                using=using,
+                filter=query_filter,
+                limit=k,
+                params=models.SearchParams(exact=True),
+            )
+            for vector in vectors
+        ],
+    )
+    truth = [{point.id for point in response.points} for response in baseline]
+
+    table: Dict[str, List[Any]] = {
+        "params": [],
+        f"recall@{k}": [],
+        "p50 ms": [],
+        "p95 ms": [],
+    }
+    for params in candidates:
+        latencies, recalls = [], []
+        for vector, expected in zip(vectors, truth):
+            started = time.perf_counter()
+            response = client.query_points(
+                collection_name=collection_name,
+                query=vector,
+                using=using,
+                query_filter=query_filter,
+                limit=k,
+                search_params=params,
+            )
+            latencies.append(time.perf_counter() - started)
+            found = {point.id for point in response.points}
+            recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+        table["params"].append(describe_params(params))
+        table[f"recall@{k}"].append(round(sum(recalls) / len(recalls), 4))
+        table["p50 ms"].append(round(percentile(latencies, 50) * 1000, 2))
+        table["p95 ms"].append(round(percentile(latencies, 95) * 1000, 2))
+    front = pareto_front(table["p95 ms"], table[f"recall@{k}"])
+    table["front"] = ["pareto" if flag else "dominated" for flag in front]
+    return table
+
+
+def create_search_params_interface() -> Optional[models.SearchParams]:
+    """Create the search parameter controls and return the resulting params."""
+    with st.expander("Search Parameters", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            hnsw_ef = st.number_input(
+                "hnsw_ef",
+                min_value=0,
+                value=0,
+                step=16,
+                help="Size of the HNSW candidate list; 0 uses the collection default",
+            )
+            exact = st.checkbox("Exact search", help="Bypass the index (slow)")
+        with col2:
+            indexed_only = st.checkbox(
+                "Indexed only", help="Skip segments that are not indexed yet"
+            )
+            quantization_ignore = st.checkbox("Ignore quantization")
+        with col3:
+            rescore = st.selectbox("Quantization rescore", ["default", "on", "off"])
+            oversampling = st.number_input(
+                "Quantization oversampling",
+                min_value=1.0,
+                value=None,
+                step=0.5,
+                placeholder="default",
+                help="Factor of extra candidates to rescore; at least 1",
+            )
+    return build_search_params(
+        hnsw_ef=int(hnsw_ef),
+        exact=exact,
+        indexed_only=indexed_only,
+        quantization_ignore=quantization_ignore,
+        quantization_rescore=None if rescore == "default" else rescore == "on",
+        quantization_oversampling=oversampling,
+    )
+
+
+def create_tuning_interface(
+    engine: QueryEngine, collection_name: str, filter_clause: Any
+):
+    """Create the tuning tab: sweep search params against an exact baseline."""
+    vector_names = engine.schema(collection_name).vector_names
+    queries = st.text_area("Queries (one per line)", key="tuning_queries")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        k = st.number_input("k", min_value=1, max_value=1000, value=10)
+        ef_values = st.text_input("hnsw_ef values", value="16, 32, 64, 128, 256")
+    with col2:
+        oversampling_values = st.text_input("Oversampling values", value="")
+        rescore_values = st.multiselect(
+            "Rescore", ["default", "on", "off"], default=["default"]
+        )
+    with col3:
+        include_exact = st.checkbox("Include exact search", value=True)
+        using = (
+            st.selectbox("Vector", vector_names, key="tuning_using")
+            if vector_names
+            else None
+        )
+
+    if not st.button("Run Sweep"):
+        return
+    texts = [line.strip() for line in queries.splitlines() if line.strip()]
+    if not texts:
+        st.warning("Enter at least one query")
+        return
+
+    ef_list = parse_list(ef_values, "integer")
+    oversampling_list = parse_list(oversampling_values, "float")
+    invalid = [
+        str(value)
+        for value, kind, minimum in [(ef, int, 0) for ef in ef_list]
+        + [(factor, (int, float), 1) for factor in oversampling_list]
+        if isinstance(value, bool) or not isinstance(value, kind) or value < minimum
+    ]
+    if invalid:
+        st.error(
+            "hnsw_ef values must be non-negative whole numbers and oversampling "
+            f"values at least 1; invalid: {', '.join(invalid)}"
+        )
+        return
+
+    candidates = [
+        build_search_params(
+            hnsw_ef=int(ef),
+            quantization_rescore=None if rescore == "default" else rescore == "on",
+            quantization_oversampling=oversampling,
+        )
+        for ef, rescore, oversampling in itertools.product(
+            ef_list or (0,),
+            rescore_values or ["default"],
+            oversampling_list or (None,),
+        )
+    ]
+    if include_exact:
+        candidates.append(models.SearchParams(exact=True))
+
+    try:
+        with st.spinner(f"Running {len(candidates)} combinations..."):
+            vectors = engine.embed_batch(texts)
+            table = run_sweep(
+                engine.client,
+                collection_name,
+                vectors,
+                candidates,
+                int(k),
+                to_filter(filter_clause),
+                using,
+            )
+    except Exception as e:
+        st.error(f"Error during sweep: {str(e)}")
+        return
+
+    st.dataframe(table, hide_index=True)
+    st.scatter_chart(table, x="p95 ms", y=f"recall@{int(k)}", color="front")
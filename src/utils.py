@@ -0,0 +1,154 @@
+# utils.py
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Dict, NamedTuple, Optional, Set
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+# Keep idle gRPC channels alive so the next call does not pay for a reconnect.
+GRPC_KEEPALIVE_OPTIONS: Dict[str, Any] = {
+    "grpc.keepalive_time_ms": 30000,
+    "grpc.keepalive_timeout_ms": 10000,
+    "grpc.keepalive_permit_without_calls": 1,
+    "grpc.http2.max_pings_without_data": 0,
+}
+
+
+class ConnectionKey(NamedTuple):
+    """Identifies one pooled client: server URL, API key and transport."""
+
+    url: str
+    api_key: str
+    prefer_grpc: bool
+
+
+def _client_options(key: ConnectionKey) -> Dict[str, Any]:
+    if key.url == ":memory:":
+        return {"location": ":memory:"}
+    if key.prefer_grpc:
+        return {
+            "url": key.url,
+            "api_key": key.api_key or None,
+            "prefer_grpc": True,
+            "grpc_options": GRPC_KEEPALIVE_OPTIONS,
+        }
+    return {"url": key.url, "api_key": key.api_key or None}
+
+
+def remove_file(path: Optional[str]) -> None:
+    """Delete a temporary file if it still exists."""
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def create_qdrant_client(key: ConnectionKey) -> QdrantClient:
+    """Build a new Qdrant client for the given connection settings."""
+    return QdrantClient(**_client_options(key))
+
+
+class EventLoopThread:
+    """A background thread running one asyncio event loop.
+
+    Async clients are bound to the loop they first run on, so every
+    coroutine using a pooled ``AsyncQdrantClient`` is submitted here.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="qdrant-async", daemon=True
+                ).start()
+            return self._loop
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run ``coro`` on the loop thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+event_loop_thread = EventLoopThread()
+
+
+class QdrantConnectionManager:
+    """Process-wide pool holding one long-lived client per connection key.
+
+    Each owner (typically a Streamlit session) holds at most a reference to
+    one key at a time. A client is closed once no owner references it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[ConnectionKey, QdrantClient] = {}
+        self._async_clients: Dict[ConnectionKey, AsyncQdrantClient] = {}
+        self._owners: Dict[ConnectionKey, Set[str]] = {}
+
+    def acquire(self, key: ConnectionKey, owner: str) -> QdrantClient:
+        """Return the pooled client for ``key`` and register ``owner`` on it."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = create_qdrant_client(key)
+                self._clients[key] = client
+                self._owners[key] = set()
+            self._owners[key].add(owner)
+            return client
+
+    def get_async(self, key: ConnectionKey) -> AsyncQdrantClient:
+        """Return the pooled async client for ``key``, creating it if needed.
+
+        The client must only be used from ``event_loop_thread``.
+        """
+        with self._lock:
+            client = self._async_clients.get(key)
+            if client is None:
+                client = AsyncQdrantClient(**_client_options(key))
+                self._async_clients[key] = client
+            return client
+
+    def release(self, key: ConnectionKey, owner: str) -> None:
+        """Drop ``owner`` from ``key`` and close the client if it is unused."""
+        with self._lock:
+            owners = self._owners.get(key)
+            if owners is None:
+                return
+            owners.discard(owner)
+            if owners:
+                return
+            client = self._clients.pop(key)
+            async_client = self._async_clients.pop(key, None)
+            del self._owners[key]
+        client.close()
+        if async_client is not None:
+            event_loop_thread.run(async_client.close())
+
+    def get(self, key: ConnectionKey) -> Optional[QdrantClient]:
+        """Return the pooled client for ``key`` without registering an owner."""
+        with self._lock:
+            return self._clients.get(key)
+
+    def close_all(self) -> None:
+        """Close every pooled client."""
+        with self._lock:
+            clients = list(self._clients.values())
+            async_clients = list(self._async_clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+            self._owners.clear()
+        for client in clients:
+            client.close()
+        for async_client in async_clients:
+            event_loop_thread.run(async_client.close())
+
+
+connection_manager = QdrantConnectionManager()
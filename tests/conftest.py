@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app modules live in src/ and import each other by module name
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
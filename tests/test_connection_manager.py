@@ -0,0 +1,82 @@
+import pytest
+
+from utils import ConnectionKey, QdrantConnectionManager
+
+MEMORY = ConnectionKey(":memory:", "", False)
+OTHER = ConnectionKey(":memory:", "other", False)
+
+
+def assert_closed(client):
+    with pytest.raises(RuntimeError):
+        client.get_collections()
+
+
+@pytest.fixture
+def manager():
+    manager = QdrantConnectionManager()
+    yield manager
+    manager.close_all()
+
+
+def test_acquire_reuses_the_client_for_a_key(manager):
+    first = manager.acquire(MEMORY, "a")
+    assert manager.acquire(MEMORY, "a") is first
+    assert manager.acquire(MEMORY, "b") is first
+    assert manager.get(MEMORY) is first
+    assert manager.acquire(OTHER, "a") is not first
+
+
+def test_release_closes_the_client_of_its_last_owner(manager):
+    client = manager.acquire(MEMORY, "a")
+    manager.release(MEMORY, "a")
+    assert manager.get(MEMORY) is None
+    assert_closed(client)
+    # The next owner gets a fresh, working client
+    assert manager.acquire(MEMORY, "a").get_collections().collections == []
+
+
+def test_shared_client_stays_open_until_every_owner_releases(manager):
+    client = manager.acquire(MEMORY, "a")
+    manager.acquire(MEMORY, "b")
+    manager.release(MEMORY, "a")
+    assert manager.get(MEMORY) is client
+    client.get_collections()
+    manager.release(MEMORY, "b")
+    assert_closed(client)
+
+
+def test_key_change_closes_the_previous_client(manager):
+    # Mirrors session.get_qdrant_client when the sidebar settings change
+    old = manager.acquire(MEMORY, "session")
+    new = manager.acquire(OTHER, "session")
+    manager.release(MEMORY, "session")
+    assert_closed(old)
+    assert manager.get(MEMORY) is None
+    assert manager.get(OTHER) is new
+    new.get_collections()
+
+
+def test_key_change_keeps_a_client_other_sessions_use(manager):
+    old = manager.acquire(MEMORY, "first")
+    manager.acquire(MEMORY, "second")
+    manager.acquire(OTHER, "first")
+    manager.release(MEMORY, "first")
+    assert manager.get(MEMORY) is old
+    old.get_collections()
+
+
+def test_release_of_unknown_owner_or_key_is_a_no_op(manager):
+    client = manager.acquire(MEMORY, "a")
+    manager.release(MEMORY, "stranger")
+    manager.release(OTHER, "a")
+    assert manager.get(MEMORY) is client
+    client.get_collections()
+
+
+def test_close_all_closes_every_client(manager):
+    first = manager.acquire(MEMORY, "a")
+    second = manager.acquire(OTHER, "b")
+    manager.close_all()
+    assert_closed(first)
+    assert_closed(second)
+    assert manager.get(MEMORY) is None
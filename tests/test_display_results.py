@@ -0,0 +1,38 @@
+from qdrant_client import models
+
+from display_results import MAX_CELL_CHARS, payload_selector, to_columns
+
+
+def point(id, score, payload):
+    return models.ScoredPoint(id=id, version=0, score=score, payload=payload)
+
+
+def test_payload_selector():
+    assert payload_selector("Include", ["a"]) == models.PayloadSelectorInclude(
+        include=["a"]
+    )
+    assert payload_selector("Include", []) is False
+    assert payload_selector("Exclude", ["a"]) == models.PayloadSelectorExclude(
+        exclude=["a"]
+    )
+    assert payload_selector("Exclude", []) is True
+
+
+def test_to_columns_unions_keys_and_ranks_from_the_offset():
+    points = [
+        point(7, 0.9, {"color": "red"}),
+        point(8, 0.5, {"size": 3, "tags": ["a", "b"], "score": "shadowed"}),
+        point(9, 0.1, None),
+    ]
+    columns = to_columns(points, offset=50)
+    assert list(columns) == ["rank", "id", "score", "color", "size", "tags"]
+    assert columns["rank"] == [51, 52, 53]
+    assert columns["id"] == ["7", "8", "9"]
+    assert columns["score"] == [0.9, 0.5, 0.1]
+    assert columns["color"] == ["red", None, None]
+    assert columns["tags"] == [None, '["a", "b"]', None]
+
+
+def test_long_cells_are_truncated():
+    columns = to_columns([point(1, 1.0, {"text": "x" * (MAX_CELL_CHARS + 5)})])
+    assert columns["text"][0] == "x" * MAX_CELL_CHARS + "…"
@@ -0,0 +1,52 @@
+from embedding_cache import DiskEmbeddingStore, EmbeddingCache, make_key
+
+
+def test_make_key_normalizes_whitespace_but_not_case():
+    assert make_key("openai", "m", None, "  red   shoes ") == make_key(
+        "openai", "m", None, "red shoes"
+    )
+    assert make_key("openai", "m", None, "Red") != make_key("openai", "m", None, "red")
+
+
+def test_disk_store_round_trip_and_reload(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path))
+    store.put_many(
+        [
+            (make_key("p", "m", None, "a"), [1.0, 2.0]),
+            (make_key("p", "m", None, "b"), [3.0, 4.0]),
+            (make_key("p", "m", 3, "c"), [5.0, 6.0, 7.0]),
+        ]
+    )
+    store.put(make_key("p", "m", None, "d"), [8.0, 9.0])
+    assert store.get(make_key("p", "m", None, "b")) == [3.0, 4.0]
+    assert store.get(make_key("p", "m", None, "missing")) is None
+
+    reloaded = DiskEmbeddingStore(str(tmp_path))
+    assert reloaded.get(make_key("p", "m", 3, "c")) == [5.0, 6.0, 7.0]
+    assert reloaded.get(make_key("p", "m", None, "d")) == [8.0, 9.0]
+
+
+def test_disk_stores_sharing_a_directory_see_each_others_entries(tmp_path):
+    first = DiskEmbeddingStore(str(tmp_path))
+    second = DiskEmbeddingStore(str(tmp_path))
+    first.put(make_key("p", "m", None, "a"), [1.0, 2.0])
+    second.put(make_key("p", "m", None, "b"), [3.0, 4.0])
+    # Rows are allocated from the shared file, never handed out twice
+    assert first.get(make_key("p", "m", None, "b")) == [3.0, 4.0]
+    assert second.get(make_key("p", "m", None, "a")) == [1.0, 2.0]
+
+
+def test_cache_counts_memory_and_disk_hits(tmp_path):
+    key = make_key("p", "m", None, "a")
+    EmbeddingCache(directory=str(tmp_path)).put_many([(key, [1.0, 2.0])])
+
+    cache = EmbeddingCache(max_entries=1, directory=str(tmp_path))
+    assert cache.get(key) == [1.0, 2.0]
+    assert cache.get(key) == [1.0, 2.0]
+    assert cache.get(make_key("p", "m", None, "b")) is None
+    assert cache.stats() == {
+        "memory_hits": 1,
+        "disk_hits": 1,
+        "misses": 1,
+        "entries": 1,
+    }
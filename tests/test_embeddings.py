@@ -0,0 +1,29 @@
+import embeddings
+from embeddings import EmbeddingSettings, _cache_model, _get_provider
+
+
+def test_evicted_providers_are_closed(monkeypatch):
+    monkeypatch.setattr(embeddings, "MAX_PROVIDERS", 2)
+    monkeypatch.setattr(embeddings, "_providers", embeddings.OrderedDict())
+    first, second, third = (
+        EmbeddingSettings(api_key=f"sk-{i}") for i in range(3)
+    )
+    a = _get_provider(first)
+    b = _get_provider(second)
+    assert _get_provider(first) is a
+    # ``second`` is now the least recently used
+    c = _get_provider(third)
+    assert b.client.is_closed
+    assert not a.client.is_closed and not c.client.is_closed
+    assert list(embeddings._providers) == [first, third]
+
+
+def test_azure_deployment_is_part_of_the_cache_key():
+    base = dict(provider="azure", model="text-embedding-3-small")
+    assert _cache_model(EmbeddingSettings(**base)) == "text-embedding-3-small"
+    assert _cache_model(
+        EmbeddingSettings(azure_deployment="a", **base)
+    ) != _cache_model(EmbeddingSettings(azure_deployment="b", **base))
+    assert _cache_model(EmbeddingSettings(azure_deployment="a")) == (
+        "text-embedding-ada-002"
+    )
@@ -0,0 +1,153 @@
+import io
+import json
+
+import pytest
+from qdrant_client import QdrantClient, models
+
+from engine import EngineConfig, QueryEngine, chunked, hybrid_query, iter_queries
+from sparse_embeddings import HashingSparseEncoder
+
+VECTORS = {"x": [1.0, 0.0], "y": [0.0, 1.0]}
+IS_B = {"key": "k", "operator": "match", "value": "b"}
+
+
+@pytest.fixture
+def engine():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c",
+        vectors_config={
+            "d": models.VectorParams(size=2, distance=models.Distance.DOT)
+        },
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(id=1, vector={"d": [1.0, 0.1]}, payload={"k": "a"}),
+            models.PointStruct(id=2, vector={"d": [0.1, 1.0]}, payload={"k": "b"}),
+        ],
+    )
+    engine = QueryEngine(EngineConfig(qdrant_url="memory://engine"), client=client)
+    engine.embed_batch = lambda texts: [VECTORS[text] for text in texts]
+    return engine
+
+
+def test_search_many_uses_named_vector_and_checks_dimensions(engine):
+    vectors = [[1.0, 0.0], [0.0, 1.0]]
+    results = engine.search_many("c", vectors, [None, None], 1, using="d")
+    assert [[point.id for point in points] for points in results] == [[1], [2]]
+    with pytest.raises(ValueError, match="expects 2"):
+        engine.search_many("c", [[1.0, 0.0, 0.0]], [None], 1, using="d")
+
+
+def test_search_batch_yields_progress_per_chunk(engine):
+    rows = [
+        {"query": "x"},
+        {"query": "y"},
+        {"query": "x", "filter": {"must": [IS_B]}},
+    ]
+    chunks = list(engine.search_batch("c", iter(rows), 1, chunk_size=2, using="d"))
+    assert [done for done, _ in chunks] == [2, 3]
+    result_rows = [row for _, rows in chunks for row in rows]
+    assert [(row[0], row[1], row[2], row[3]) for row in result_rows] == [
+        (0, "x", 1, "1"),
+        (1, "y", 1, "2"),
+        (2, "x", 1, "2"),
+    ]
+    assert json.loads(result_rows[2][5]) == {"k": "b"}
+
+
+def test_search_batch_default_filter(engine):
+    rows = [{"query": "x"}]
+    default_filter = {"must_not": [{"key": "k", "match": {"value": "a"}}]}
+    (_, result_rows), = engine.search_batch(
+        "c", rows, 5, default_filter=default_filter, using="d"
+    )
+    assert [row[3] for row in result_rows] == ["2"]
+
+
+def test_iter_queries_reads_csv_and_skips_blank_queries():
+    data = 'query,filter\n red shoes ,\n,\nblue,"{""must"": []}"\n'
+    rows = list(iter_queries(io.BytesIO(data.encode("utf-8")), "csv"))
+    assert rows == [
+        {"query": "red shoes", "filter": None},
+        {"query": "blue", "filter": {"must": []}},
+    ]
+
+
+def test_iter_queries_reads_jsonl_lazily():
+    lines = [json.dumps({"query": "a", "filter": {"must": []}}), "", '{"query": "b"}']
+    file = io.BytesIO("\n".join(lines).encode("utf-8"))
+    rows = iter_queries(file, "jsonl")
+    assert next(rows) == {"query": "a", "filter": {"must": []}}
+    assert next(rows) == {"query": "b", "filter": None}
+    # Dropping the reader leaves the upload open for the caller
+    del rows
+    assert not file.closed
+
+
+def test_chunked_does_not_consume_ahead():
+    consumed = []
+
+    def numbers():
+        for i in range(5):
+            consumed.append(i)
+            yield i
+
+    chunks = chunked(numbers(), 2)
+    assert next(chunks) == [0, 1]
+    assert consumed == [0, 1]
+    assert list(chunks) == [[2, 3], [4]]
+
+
+def test_hybrid_query_applies_params_and_threshold_to_the_dense_prefetch():
+    sparse = models.SparseVector(indices=[1], values=[1.0])
+    query_filter = models.Filter(must=[models.HasIdCondition(has_id=[1])])
+    params = models.SearchParams(hnsw_ef=64)
+    query, (dense, sparse_prefetch) = hybrid_query(
+        [1.0, 0.0], sparse, "s", "d", "dbsf", 20, query_filter, params, 0.5
+    )
+    assert query.fusion == models.Fusion.DBSF
+    assert (dense.using, dense.limit, dense.params, dense.score_threshold) == (
+        "d",
+        20,
+        params,
+        0.5,
+    )
+    assert (sparse_prefetch.using, sparse_prefetch.params) == ("s", None)
+    assert dense.filter == sparse_prefetch.filter == query_filter
+    with pytest.raises(ValueError):
+        hybrid_query([1.0], sparse, "s", fusion="max")
+
+
+def test_hybrid_search_fuses_dense_and_sparse_results(engine):
+    documents = {1: "red shoes", 2: "blue hat"}
+    engine.client.create_collection(
+        "h",
+        vectors_config={
+            "d": models.VectorParams(size=2, distance=models.Distance.DOT)
+        },
+        sparse_vectors_config={
+            "s": models.SparseVectorParams(modifier=models.Modifier.IDF)
+        },
+    )
+    sparse = HashingSparseEncoder().embed_documents(list(documents.values()))
+    engine.client.upsert(
+        "h",
+        [
+            models.PointStruct(id=1, vector={"d": [0.0, 1.0], "s": sparse[0]}),
+            models.PointStruct(id=2, vector={"d": [1.0, 0.0], "s": sparse[1]}),
+        ],
+    )
+    # The dense vector favours point 2, the words only match point 1
+    engine.embed = lambda text: [1.0, 0.0]
+    points, _ = engine.hybrid("h", "red shoes", "s", using="d", limit=2)
+    assert sorted(point.id for point in points) == [1, 2]
+    points, _ = engine.hybrid(
+        "h",
+        "red shoes",
+        "s",
+        using="d",
+        query_filter={"must": [{"key": "", "operator": "has_id", "value": [1]}]},
+    )
+    assert [point.id for point in points] == [1]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient, models
+
+from explorer import pca_components, project, randomized_components, sample_vectors
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c",
+        vectors_config={
+            "d": models.VectorParams(size=3, distance=models.Distance.DOT),
+            "e": models.VectorParams(size=2, distance=models.Distance.DOT),
+        },
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(
+                id=i,
+                vector={"d": [float(i), 0.0, 1.0], "e": [1.0, 1.0]},
+                payload={"even": i % 2 == 0},
+            )
+            for i in range(10)
+        ],
+    )
+    return client
+
+
+def test_sample_vectors_pages_into_one_matrix(client):
+    ids, matrix = sample_vectors(client, "c", 7, 3, using="d", page_size=3)
+    assert ids == list(range(7))
+    assert matrix.dtype == np.float32
+    assert matrix[:, 0].tolist() == [float(i) for i in range(7)]
+
+
+def test_sample_vectors_applies_the_filter(client):
+    even = models.Filter(
+        must=[models.FieldCondition(key="even", match=models.MatchValue(value=True))]
+    )
+    ids, matrix = sample_vectors(client, "c", 100, 3, "d", even)
+    assert ids == [0, 2, 4, 6, 8]
+    assert matrix.shape == (5, 3)
+
+
+def spread_sample(n=200, d=8, seed=1):
+    rng = np.random.default_rng(seed)
+    # Most variance along the first axis, then the second
+    scale = np.array([10.0, 3.0] + [0.1] * (d - 2), dtype=np.float32)
+    return (rng.standard_normal((n, d)) * scale + 5.0).astype(np.float32)
+
+
+@pytest.mark.parametrize("components", [pca_components, randomized_components])
+def test_components_find_the_main_axes(components):
+    x = spread_sample()
+    x -= x.mean(axis=0)
+    axes = components(x)
+    assert np.abs(axes[0, 0]) == pytest.approx(1.0, abs=0.01)
+    assert np.abs(axes[1, 1]) == pytest.approx(1.0, abs=0.01)
+
+
+def test_project_is_deterministic_and_transforms_new_points():
+    x = spread_sample()
+    first = project(list(range(len(x))), x.copy(), "pca")
+    second = project(list(range(len(x))), x.copy(), "randomized")
+    assert first.method == "pca" and second.method == "randomized"
+    # Signs are fixed, so both methods draw the same picture
+    np.testing.assert_allclose(first.coords, second.coords, atol=0.05)
+    assert first.explained[0] > first.explained[1] > 0
+    assert sum(first.explained) <= 1.0
+    np.testing.assert_allclose(first.transform(x[:3]), first.coords[:3], atol=1e-3)
@@ -0,0 +1,94 @@
+import json
+
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+from qdrant_client import QdrantClient, models
+
+from export import build_schema, export_points, records_to_batch
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c",
+        # Dot keeps vectors as stored; Cosine would normalize them
+        vectors_config={"d": models.VectorParams(size=2, distance="Dot")},
+        sparse_vectors_config={"s": models.SparseVectorParams()},
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(
+                id=i,
+                vector={
+                    "d": [1.0, float(i)],
+                    "s": models.SparseVector(indices=[i], values=[0.5]),
+                },
+                payload={"n": i, "tag": "even" if i % 2 == 0 else "odd"},
+            )
+            for i in range(25)
+        ],
+    )
+    yield client
+    client.close()
+
+
+def test_records_to_batch_splits_dense_and_other_vectors():
+    records = [
+        models.Record(
+            id=1,
+            payload={"n": 1},
+            vector={
+                "d": [1.0, 2.0],
+                "s": models.SparseVector(indices=[3], values=[1.0]),
+            },
+        )
+    ]
+    schema = build_schema("parquet", ["d"])
+    row = records_to_batch(records, schema, ["d"]).to_pylist()[0]
+    assert row["id"] == "1"
+    assert json.loads(row["payload"]) == {"n": 1}
+    assert row["vector.d"] == [1.0, 2.0]
+    assert json.loads(row["vector.other"]) == {"s": {"indices": [3], "values": [1.0]}}
+
+    # CSV cannot hold lists, so dense vectors become JSON text
+    row = records_to_batch(records, build_schema("csv", ["d"]), ["d"], "csv")
+    assert json.loads(row.to_pylist()[0]["vector.d"]) == [1.0, 2.0]
+
+
+def test_parquet_export_round_trip(client, tmp_path):
+    path = str(tmp_path / "c.parquet")
+    steps = list(
+        export_points(
+            client,
+            "c",
+            path,
+            scroll_filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="tag", match=models.MatchValue(value="even")
+                    )
+                ]
+            ),
+            with_vectors=True,
+            page_size=5,
+        )
+    )
+    assert steps[-1].points == 13
+    assert steps[-1].pages == 3
+    rows = pq.read_table(path).to_pylist()
+    assert sorted(int(row["id"]) for row in rows) == list(range(0, 25, 2))
+    row = next(row for row in rows if row["id"] == "4")
+    assert json.loads(row["payload"]) == {"n": 4, "tag": "even"}
+    assert row["vector.d"] == pytest.approx([1.0, 4.0])
+
+
+def test_csv_export_without_vectors(client, tmp_path):
+    path = str(tmp_path / "c.csv")
+    steps = list(export_points(client, "c", path, fmt="csv", page_size=10))
+    assert steps[-1].points == 25
+    table = pa_csv.read_csv(path)
+    assert table.column_names == ["id", "payload"]
+    assert table.num_rows == 25
@@ -0,0 +1,75 @@
+import pytest
+from qdrant_client import QdrantClient, models
+
+from facets import compute_facets, histogram_edges, scan_facets
+
+
+def test_float_edges_split_the_range_evenly():
+    assert histogram_edges(0.0, 10.0, 4, integer=False) == [0.0, 2.5, 5.0, 7.5, 10.0]
+    assert histogram_edges(3.0, 3.0, 4, integer=False) == [3.0, 3.0]
+
+
+def test_integer_edges_cover_every_value_once():
+    # Buckets are [edge, next_edge - 1], so 0..9 splits into widths of 3
+    assert histogram_edges(0, 9, 4, integer=True) == [0.0, 3.0, 6.0, 9.0, 10.0]
+    # Fewer values than bins gives one bucket per value
+    assert histogram_edges(1, 3, 10, integer=True) == [1.0, 2.0, 3.0, 4.0]
+    assert histogram_edges(5, 5, 4, integer=True) == [5.0, 6.0]
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c", vectors_config=models.VectorParams(size=1, distance=models.Distance.DOT)
+    )
+    colors = ["red", "blue", "red", "green"]
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(
+                id=i, vector=[1.0], payload={"color": colors[i % 4], "n": i}
+            )
+            for i in range(20)
+        ],
+    )
+    return client
+
+
+def test_compute_facets_counts_values_and_buckets(client):
+    facets = compute_facets(
+        client, "c", {"color": "keyword", "n": "integer"}, None, limit=2, bins=4
+    )
+    assert facets["color"].buckets == [("red", 10), ("blue", 5)]
+    assert facets["n"].buckets == [
+        ((0, 4), 5),
+        ((5, 9), 5),
+        ((10, 14), 5),
+        ((15, 19), 5),
+    ]
+
+
+def test_compute_facets_applies_the_filter(client):
+    query_filter = models.Filter(
+        must=[models.FieldCondition(key="n", range=models.Range(lt=4))]
+    )
+    facets = compute_facets(client, "c", {"color": "keyword"}, query_filter)
+    assert dict(facets["color"].buckets) == {"red": 2, "blue": 1, "green": 1}
+
+
+def test_scan_stops_at_max_points_and_marks_facets_approximate(client):
+    facets = scan_facets(
+        client,
+        "c",
+        {"color": "values", "n": "histogram"},
+        None,
+        limit=2,
+        bins=4,
+        integer_keys=("n",),
+        max_points=10,
+        page_size=4,
+    )
+    assert facets["color"].source == "scan"
+    assert facets["color"].approximate
+    assert facets["color"].buckets == [("red", 5), ("blue", 3)]
+    assert sum(count for _, count in facets["n"].buckets) == 10
@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from qdrant_client import AsyncQdrantClient, models
+
+from federated import CollectionResult, fan_out, merge_top_k, normalized_scores
+
+
+def points(*scores):
+    return [SimpleNamespace(id=i, score=score) for i, score in enumerate(scores)]
+
+
+def test_normalized_scores():
+    assert normalized_scores([]) == []
+    assert normalized_scores(points(0.5, 0.5)) == [1.0, 1.0]
+    assert normalized_scores(points(0.9, 0.7, 0.5)) == pytest.approx([1.0, 0.5, 0.0])
+
+
+def test_merge_top_k_ranks_by_normalized_score():
+    results = [
+        # Cosine scores near 1 and dot products in the hundreds still interleave
+        CollectionResult("cosine", points(0.95, 0.90, 0.85)),
+        CollectionResult("dot", points(300.0, 200.0, 100.0, 0.0)),
+    ]
+    merged = merge_top_k(results, 4)
+    assert [(collection, point.score) for _, collection, point in merged] == [
+        ("dot", 300.0),
+        ("cosine", 0.95),
+        ("dot", 200.0),
+        ("cosine", 0.90),
+    ]
+    assert [normalized for normalized, _, _ in merged] == sorted(
+        (normalized for normalized, _, _ in merged), reverse=True
+    )
+
+
+def test_merge_top_k_breaks_ties_by_raw_score_and_skips_failures():
+    results = [
+        CollectionResult("a", points(0.8)),
+        CollectionResult("b", points(0.9)),
+        CollectionResult("failed", error="timed out"),
+    ]
+    merged = merge_top_k(results, 10)
+    assert [collection for _, collection, _ in merged] == ["b", "a"]
+
+
+async def build_collections():
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        "plain", vectors_config=models.VectorParams(size=2, distance="Cosine")
+    )
+    await client.create_collection(
+        "named",
+        vectors_config={"d": models.VectorParams(size=2, distance="Cosine")},
+        sparse_vectors_config={"s": models.SparseVectorParams()},
+    )
+    await client.create_collection(
+        "wide", vectors_config=models.VectorParams(size=3, distance="Cosine")
+    )
+    await client.upsert(
+        "plain",
+        [models.PointStruct(id=i, vector=[1.0, float(i)]) for i in range(3)],
+    )
+    await client.upsert(
+        "named",
+        [models.PointStruct(id=i, vector={"d": [float(i), 1.0]}) for i in range(3)],
+    )
+    return client
+
+
+def test_fan_out_searches_named_vectors_and_reports_errors_per_collection():
+    async def run():
+        client = await build_collections()
+        filters = {"plain": None, "named": None, "wide": None}
+        return await fan_out(client, [1.0, 0.0], filters, 2, using={"named": "d"})
+
+    results = {result.collection: result for result in asyncio.run(run())}
+    assert [point.id for point in results["plain"].points] == [0, 1]
+    assert [point.id for point in results["named"].points] == [2, 1]
+    assert results["plain"].error is None and results["named"].error is None
+    # A dimension mismatch fails only that collection
+    assert results["wide"].points == []
+    assert results["wide"].error
@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+
+import pytest
+from qdrant_client import models
+
+from filtering import (
+    Condition,
+    FilterGroup,
+    canonical_filter,
+    compile_condition,
+    compile_filter,
+    filter_to_dict,
+    group_from_dict,
+    parse_list,
+    to_filter,
+)
+
+
+def test_match_conditions():
+    assert compile_condition(Condition("color", "match", "red")) == (
+        models.FieldCondition(key="color", match=models.MatchValue(value="red"))
+    )
+    assert compile_condition(Condition("n", "match_any", (1, 2))) == (
+        models.FieldCondition(key="n", match=models.MatchAny(any=[1, 2]))
+    )
+    assert filter_to_dict(
+        models.Filter(must=[compile_condition(Condition("n", "match_except", (3,)))])
+    ) == {"must": [{"key": "n", "match": {"except": [3]}}]}
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        Condition("color", "match", ""),
+        Condition("color", "match", None),
+        Condition("title", "match_text", ""),
+        Condition("n", "match_any", ()),
+        Condition("price", "range", (None, None)),
+        Condition("created", "datetime_range", (None, None)),
+        Condition("tags", "values_count", (None, None)),
+        Condition("location", "geo_radius", (52.5, 13.4, 0.0)),
+        Condition("", "has_id", ()),
+    ],
+)
+def test_empty_conditions_compile_to_nothing(condition):
+    assert compile_condition(condition) is None
+
+
+def test_range_conditions():
+    assert compile_condition(Condition("price", "range", (10.0, None))) == (
+        models.FieldCondition(key="price", range=models.Range(gte=10.0))
+    )
+    compiled = compile_condition(
+        Condition("created", "datetime_range", ("2024-01-01T00:00:00Z", None))
+    )
+    assert compiled.range == models.DatetimeRange(
+        gte=datetime(2024, 1, 1, tzinfo=timezone.utc)
+    )
+    compiled = compile_condition(Condition("tags", "values_count", (1.0, 3.0)))
+    assert compiled.values_count == models.ValuesCount(gte=1, lte=3)
+
+
+def test_malformed_datetime_raises():
+    with pytest.raises(ValueError):
+        compile_condition(Condition("created", "datetime_range", ("2024-99-01", None)))
+
+
+def test_unknown_operator_raises():
+    with pytest.raises(ValueError, match="Unsupported filter operator"):
+        compile_condition(Condition("color", "near", "red"))
+
+
+def test_compile_filter_prunes_empty_clauses_and_groups():
+    group = FilterGroup(
+        must=(Condition("color", "match", "red"), Condition("size", "match", "")),
+        must_not=(FilterGroup(should=(Condition("n", "match_any", ()),)),),
+        should=(
+            FilterGroup(
+                must=(Condition("price", "range", (None, 5.0)),),
+                must_not=(Condition("flag", "is_empty"),),
+            ),
+        ),
+    )
+    assert filter_to_dict(compile_filter(group)) == {
+        "must": [{"key": "color", "match": {"value": "red"}}],
+        "should": [
+            {
+                "must": [{"key": "price", "range": {"lte": 5.0}}],
+                "must_not": [{"is_empty": {"key": "flag"}}],
+            }
+        ],
+    }
+    assert compile_filter(FilterGroup(must=(Condition("size", "match", ""),))) is None
+
+
+def test_compile_filter_is_memoized_on_equal_groups():
+    values = parse_list("1, 2", "integer")
+    first = FilterGroup(must=(Condition("n", "match_any", values),))
+    second = FilterGroup(must=(Condition("n", "match_any", (1, 2)),))
+    assert compile_filter(first) is compile_filter(second)
+
+
+def test_group_from_dict_accepts_lists_and_objects():
+    group = group_from_dict(
+        {
+            "must": [
+                {"key": "price", "operator": "range", "value": {"gte": 2}},
+                {"key": "n", "operator": "match_any", "value": [1, 2]},
+                {"should": [{"key": "color", "operator": "match", "value": "red"}]},
+            ]
+        }
+    )
+    assert group.must == (
+        Condition("price", "range", (2, None)),
+        Condition("n", "match_any", (1, 2)),
+        FilterGroup(should=(Condition("color", "match", "red"),)),
+    )
+    # Values must be hashable to be memoized
+    assert compile_filter(group) is not None
+
+
+def test_group_from_dict_rejects_unexpected_objects():
+    with pytest.raises(ValueError, match="expected a scalar or a list"):
+        group_from_dict(
+            {"must": [{"key": "color", "operator": "match", "value": {"x": 1}}]}
+        )
+    with pytest.raises(ValueError, match="'range' condition on 'price'"):
+        group_from_dict(
+            {"must": [{"key": "price", "operator": "range", "value": {"min": 1}}]}
+        )
+
+
+def test_to_filter_accepts_qdrant_json_and_condition_specs():
+    qdrant_json = {"must": [{"key": "color", "match": {"value": "red"}}]}
+    spec = {"must": [{"key": "color", "operator": "match", "value": "red"}]}
+    assert canonical_filter(to_filter(qdrant_json)) == canonical_filter(
+        to_filter(spec)
+    )
+    assert to_filter({"must": []}) is None
+    assert to_filter(None) is None
@@ -0,0 +1,8 @@
+from filtering import Condition
+from filters import create_filter_condition
+
+
+def test_create_filter_condition_makes_list_values_hashable():
+    condition = create_filter_condition("color", "match_any", ["red", "blue"])
+    assert condition == Condition("color", "match_any", ("red", "blue"))
+    hash(condition)
@@ -0,0 +1,71 @@
+import pytest
+from qdrant_client import QdrantClient, models
+
+from index_advisor import IndexAdvice, advise, required_index_type
+
+
+NEAR_ORIGIN = models.GeoRadius(center=models.GeoPoint(lon=0, lat=0), radius=10)
+
+
+def field(key, **kwargs):
+    return models.FieldCondition(key=key, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "condition, field_type, expected",
+    [
+        (field("t", match=models.MatchText(text="red")), None, "text"),
+        (field("k", match=models.MatchValue(value="red")), None, "keyword"),
+        (field("k", match=models.MatchValue(value="red")), "text", "keyword"),
+        (field("u", match=models.MatchValue(value="a-b")), "uuid", "uuid"),
+        (field("n", match=models.MatchAny(any=[1, 2])), None, "integer"),
+        (field("b", match=models.MatchValue(value=True)), None, "bool"),
+        (field("n", range=models.Range(gte=1)), "integer", "integer"),
+        (field("f", range=models.Range(gte=1.5)), "float", "float"),
+        (field("d", range=models.DatetimeRange(gte="2024-01-01")), None, "datetime"),
+        (field("g", geo_radius=NEAR_ORIGIN), None, "geo"),
+        (field("v", values_count=models.ValuesCount(gte=1)), None, None),
+    ],
+)
+def test_required_index_type(condition, field_type, expected):
+    assert required_index_type(condition, field_type) == expected
+
+
+def test_match_on_a_text_index_is_a_full_scan_not_a_replacement():
+    item = IndexAdvice("title", "keyword", "text")
+    assert item.status == "full scan"
+    assert not item.can_create
+    assert IndexAdvice("title", "text", "text").status == "ok"
+
+
+def test_other_index_statuses():
+    assert IndexAdvice("n", "integer", None).status == "missing"
+    assert IndexAdvice("n", "integer", "keyword").status == "wrong type"
+    assert IndexAdvice("n", "integer", "keyword").can_create
+    assert IndexAdvice("f", "float", "integer").status == "ok"
+    assert not IndexAdvice("f", "float", "integer").can_create
+
+
+def test_advise_estimates_selectivity_per_key_and_type():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c", vectors_config=models.VectorParams(size=2, distance=models.Distance.DOT)
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(
+                id=i, vector=[1.0, 0.0], payload={"color": "red" if i < 3 else "blue"}
+            )
+            for i in range(10)
+        ],
+    )
+    red = field("color", match=models.MatchValue(value="red"))
+    text = field("color", match=models.MatchText(text="r"))
+    query_filter = models.Filter(must=[red], should=[models.Filter(must=[red]), text])
+    advice = advise(client, "c", query_filter, {"color": "keyword"})
+    assert [(a.key, a.wanted_type, a.status) for a in advice] == [
+        ("color", "keyword", "missing"),
+        ("color", "text", "missing"),
+    ]
+    assert advice[0].selectivity == pytest.approx(0.3)
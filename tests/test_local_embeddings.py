@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from local_embeddings import OnnxEmbeddings, read_pooling
+
+# Token embeddings of the toy model; padding must never leak into a vector
+VOCAB = {"[PAD]": 0, "[UNK]": 1, "a": 2, "b": 3}
+TABLE = [[100.0, 100.0], [0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]
+
+
+def write_pooling(model_dir, **modes):
+    pooling_dir = model_dir / "1_Pooling"
+    pooling_dir.mkdir()
+    (pooling_dir / "config.json").write_text(json.dumps(modes))
+
+
+def test_read_pooling(tmp_path):
+    assert read_pooling(str(tmp_path)) == "mean"
+    write_pooling(tmp_path, pooling_mode_cls_token=True, pooling_mode_mean_tokens=False)
+    assert read_pooling(str(tmp_path)) == "cls"
+
+
+def test_read_pooling_rejects_unsupported_modes(tmp_path):
+    write_pooling(tmp_path, pooling_mode_max_tokens=True)
+    with pytest.raises(ValueError, match="LOCAL_EMBEDDING_POOLING"):
+        read_pooling(str(tmp_path))
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A model that looks each token up in ``TABLE``, with a word tokenizer."""
+    onnx = pytest.importorskip("onnx")
+    tokenizers = pytest.importorskip("tokenizers")
+    from onnx import TensorProto, helper, numpy_helper
+
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["table", "input_ids"], ["embeddings"])],
+        "toy",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["b", "s"]),
+            helper.make_tensor_value_info(
+                "attention_mask", TensorProto.INT64, ["b", "s"]
+            ),
+        ],
+        [helper.make_tensor_value_info("embeddings", TensorProto.FLOAT, None)],
+        [numpy_helper.from_array(np.array(TABLE, dtype=np.float32), "table")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(tmp_path / "model.onnx"))
+
+    tokenizer = tokenizers.Tokenizer(
+        tokenizers.models.WordLevel(VOCAB, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.save(str(tmp_path / "tokenizer.json"))
+    return tmp_path
+
+
+def test_mean_pooling_ignores_padding(model_dir):
+    embeddings = OnnxEmbeddings(str(model_dir), batch_size=2, workers=1)
+    vectors = embeddings.embed_documents(["a", "a b", "b"])
+    # "a" is padded to the length of "a b" in the first batch
+    assert vectors[0] == pytest.approx([1.0, 0.0])
+    assert vectors[1] == pytest.approx([2**-0.5, 2**-0.5])
+    assert vectors[2] == pytest.approx([0.0, 1.0])
+
+
+def test_cls_pooling_from_the_model_config(model_dir):
+    write_pooling(model_dir, pooling_mode_cls_token=True)
+    embeddings = OnnxEmbeddings(str(model_dir), workers=1)
+    assert embeddings.pooling == "cls"
+    assert embeddings.embed_query("b a") == pytest.approx([0.0, 1.0])
+
+
+def test_unknown_pooling_is_rejected(model_dir):
+    with pytest.raises(ValueError, match="Unsupported pooling"):
+        OnnxEmbeddings(str(model_dir), pooling="max")
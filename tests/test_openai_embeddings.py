@@ -0,0 +1,105 @@
+import json
+
+import httpx
+import pytest
+
+import openai_embeddings
+from openai_embeddings import EmbeddingAPIError, HttpEmbeddings
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(openai_embeddings.time, "sleep", delays.append)
+    return delays
+
+
+def make_embeddings(responses, requests=None, **kwargs):
+    """Client whose requests are answered by ``responses`` in order."""
+    responses = iter(responses)
+
+    def handler(request):
+        if requests is not None:
+            requests.append(request)
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        if callable(response):
+            return response(request)
+        return response
+
+    embeddings = HttpEmbeddings(api_key="sk-test", model="m", **kwargs)
+    embeddings.client.close()
+    embeddings.client = httpx.Client(
+        headers=embeddings.client.headers, transport=httpx.MockTransport(handler)
+    )
+    return embeddings
+
+
+def embed_lengths(request):
+    inputs = json.loads(request.content)["input"]
+    data = [
+        {"index": i, "embedding": [float(len(text))]} for i, text in enumerate(inputs)
+    ]
+    # The API does not promise to return items in input order
+    return httpx.Response(200, json={"data": data[::-1]})
+
+
+def test_embed_documents_batches_and_keeps_input_order(sleeps):
+    requests = []
+    embeddings = make_embeddings([embed_lengths] * 2, requests, batch_size=2)
+    assert embeddings.embed_documents(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert [json.loads(r.content)["input"] for r in requests] == [["a", "bb"], ["ccc"]]
+    assert requests[0].headers["authorization"] == "Bearer sk-test"
+    assert sleeps == []
+
+
+def test_retries_honour_retry_after(sleeps):
+    embeddings = make_embeddings(
+        [
+            httpx.Response(429, headers={"retry-after": "2"}, json={}),
+            httpx.Response(503, headers={"retry-after": "120"}, json={}),
+            httpx.ConnectError("reset"),
+            embed_lengths,
+        ]
+    )
+    assert embeddings.embed_query("abcd") == [4.0]
+    # Retry-After is capped; without it the backoff is jittered exponentially
+    assert sleeps[:2] == [2.0, openai_embeddings.MAX_BACKOFF]
+    assert 2.0 <= sleeps[2] <= 4.0
+
+
+def test_client_errors_are_not_retried(sleeps):
+    embeddings = make_embeddings(
+        [httpx.Response(400, json={"error": {"message": "bad input"}})]
+    )
+    with pytest.raises(EmbeddingAPIError, match="bad input") as excinfo:
+        embeddings.embed_query("a")
+    assert excinfo.value.status_code == 400
+    assert sleeps == []
+
+
+def test_gives_up_after_max_retries(sleeps):
+    embeddings = make_embeddings(
+        [httpx.Response(500, text="boom")] * 3, max_retries=2
+    )
+    with pytest.raises(EmbeddingAPIError, match="after 3 attempts") as excinfo:
+        embeddings.embed_query("a")
+    assert excinfo.value.status_code == 500
+    assert len(sleeps) == 2
+
+
+def test_azure_requests_go_to_the_deployment(sleeps):
+    requests = []
+    embeddings = make_embeddings(
+        [embed_lengths],
+        requests,
+        azure_endpoint="https://example.openai.azure.com/",
+        azure_api_version="2024-02-01",
+        azure_deployment="embed-prod",
+    )
+    embeddings.embed_query("a")
+    url = requests[0].url
+    assert url.path == "/openai/deployments/embed-prod/embeddings"
+    assert url.params["api-version"] == "2024-02-01"
+    assert requests[0].headers["api-key"] == "sk-test"
@@ -0,0 +1,99 @@
+import pickle
+from types import SimpleNamespace
+
+from result_cache import ResultCache
+
+VERSION = (10, "ok")
+
+
+class FakeClient:
+    """Serves ``get_collection`` with a settable point count."""
+
+    def __init__(self, points_count=10):
+        self.points_count = points_count
+        self.calls = 0
+
+    def get_collection(self, collection_name):
+        self.calls += 1
+        return SimpleNamespace(points_count=self.points_count, optimizer_status="ok")
+
+
+def key(name, collection="c"):
+    return ("ns", collection, name)
+
+
+def test_get_returns_points_stored_for_the_same_version():
+    cache = ResultCache()
+    cache.put(key("q"), VERSION, ["p1", "p2"])
+    assert cache.get(key("q"), VERSION) == ["p1", "p2"]
+    assert cache.get(key("other"), VERSION) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_of_another_version_are_dropped():
+    cache = ResultCache()
+    cache.put(key("q"), VERSION, ["p"])
+    assert cache.get(key("q"), (11, "ok")) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_over_budget():
+    size = len(pickle.dumps(["x" * 100], protocol=pickle.HIGHEST_PROTOCOL))
+    cache = ResultCache(max_bytes=size * 2)
+    cache.put(key("a"), VERSION, ["x" * 100])
+    cache.put(key("b"), VERSION, ["x" * 100])
+    cache.get(key("a"), VERSION)
+    cache.put(key("c"), VERSION, ["x" * 100])
+    assert cache.get(key("b"), VERSION) is None
+    assert cache.get(key("a"), VERSION) is not None
+    assert cache.get(key("c"), VERSION) is not None
+    assert cache.stats()["bytes"] == size * 2
+
+
+def test_results_larger_than_the_budget_are_not_stored():
+    cache = ResultCache(max_bytes=10)
+    cache.put(key("big"), VERSION, ["x" * 100])
+    assert cache.stats()["entries"] == 0
+
+
+def test_replacing_an_entry_keeps_the_byte_count():
+    cache = ResultCache()
+    cache.put(key("q"), VERSION, ["p"])
+    size = cache.stats()["bytes"]
+    cache.put(key("q"), VERSION, ["p"])
+    assert cache.stats() == {
+        "hits": 0,
+        "misses": 0,
+        "entries": 1,
+        "bytes": size,
+        "invalidations": 0,
+    }
+
+
+def test_collection_version_is_reread_after_the_ttl():
+    client = FakeClient()
+    cache = ResultCache(version_ttl=60.0)
+    assert cache.collection_version(client, "ns", "c") == VERSION
+    client.points_count = 11
+    assert cache.collection_version(client, "ns", "c") == VERSION
+    assert client.calls == 1
+
+    cache.version_ttl = 0.0
+    assert cache.collection_version(client, "ns", "c") == (11, "ok")
+    assert client.calls == 2
+
+
+def test_version_change_invalidates_only_that_collection():
+    client = FakeClient()
+    cache = ResultCache(version_ttl=0.0)
+    cache.collection_version(client, "ns", "c")
+    cache.put(key("q"), VERSION, ["p"])
+    cache.put(key("q", collection="d"), VERSION, ["p"])
+
+    client.points_count = 11
+    version = cache.collection_version(client, "ns", "c")
+    assert cache.get(key("q"), version) is None
+    assert cache.get(key("q", collection="d"), VERSION) == ["p"]
+    assert cache.stats()["invalidations"] == 1
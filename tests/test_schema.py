@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from qdrant_client import QdrantClient, models
+
+import schema as schema_module
+from schema import FieldInfo, SchemaDiscovery, infer_value_type, merge_types
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        (True, "bool"),
+        (3, "integer"),
+        (3.5, "float"),
+        ("red", "keyword"),
+        ("red shoes", "text"),
+        ("x" * 65, "text"),
+        ("2024-05-01T12:00:00Z", "datetime"),
+        ("2024-05-0x", "keyword"),
+        ({"lat": 1.0, "lon": 2.0}, "geo"),
+        ({"a": 1}, "object"),
+    ],
+)
+def test_infer_value_type(value, expected):
+    assert infer_value_type(value) == expected
+
+
+def test_merge_types_widens_or_gives_up():
+    assert merge_types(None, "integer") == "integer"
+    assert merge_types("integer", None) == "integer"
+    assert merge_types("integer", "float") == "float"
+    assert merge_types("keyword", "text") == "text"
+    assert merge_types("keyword", "integer") == "mixed"
+
+
+def test_field_info_tracks_arrays_and_caps_cardinality(monkeypatch):
+    monkeypatch.setattr(schema_module, "MAX_TRACKED_VALUES", 3)
+    info = FieldInfo("tags")
+    info.observe(["a", "b"])
+    info.observe("c")
+    info.observe("d")
+    assert info.is_array
+    assert info.type == "keyword"
+    assert info.occurrences == 3
+    assert (info.cardinality, info.cardinality_capped) == (3, True)
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c",
+        vectors_config={
+            "d": models.VectorParams(size=3, distance=models.Distance.DOT)
+        },
+        sparse_vectors_config={"s": models.SparseVectorParams()},
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(
+                id=i,
+                vector={"d": [1.0, 0.0, 0.0]},
+                payload={"price": i if i % 2 else i + 0.5, "color": "red"},
+            )
+            for i in range(5)
+        ],
+    )
+    return client
+
+
+def wait_for_refresh(discovery, name):
+    deadline = time.monotonic() + 5
+    while name in discovery._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_discovery_infers_fields_and_vectors(client):
+    schema = SchemaDiscovery(client, sample_size=3).get_schema("c")
+    assert schema.sample_size == 3
+    assert schema.field_types() == {"price": "float", "color": "keyword"}
+    assert schema.vector_sizes == {"d": 3}
+    assert schema.vector_names == ["d"]
+    assert schema.sparse_vectors == ["s"]
+
+
+def test_stale_schema_is_rechecked_and_resampled_only_on_change(client):
+    discovery = SchemaDiscovery(client, ttl=0.0)
+    first = discovery.get_schema("c")
+    scrolls = []
+    scroll = client.scroll
+
+    def counting_scroll(**kwargs):
+        scrolls.append(kwargs)
+        return scroll(**kwargs)
+
+    client.scroll = counting_scroll
+
+    # Unchanged: the stale schema is served and kept, without sampling again
+    assert discovery.get_schema("c") is first
+    wait_for_refresh(discovery, "c")
+    assert discovery.get_schema("c") is first
+    wait_for_refresh(discovery, "c")
+    assert scrolls == []
+
+    client.upsert(
+        "c", [models.PointStruct(id=9, vector={"d": [0.0, 1.0, 0.0]}, payload={"n": 1})]
+    )
+    discovery.get_schema("c")
+    wait_for_refresh(discovery, "c")
+    refreshed = discovery.get_schema("c")
+    assert refreshed is not first
+    assert refreshed.points_count == 6
+    assert "n" in refreshed.fields
+    assert scrolls
+
+
+def test_invalidate_forces_discovery(client):
+    discovery = SchemaDiscovery(client)
+    first = discovery.get_schema("c")
+    assert discovery.collection_names() == ["c"]
+    discovery.invalidate("c")
+    assert discovery.get_schema("c") is not first
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+
+import httpx
+import pytest
+from qdrant_client import QdrantClient, models
+
+from engine import EngineConfig, QueryEngine
+from server import QueryServer
+
+VECTORS = {"x": [1.0, 0.0], "y": [0.0, 1.0]}
+NOT_A = {"must_not": [{"key": "k", "match": {"value": "a"}}]}
+
+
+@pytest.fixture
+def engine():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c",
+        vectors_config={
+            "d": models.VectorParams(size=2, distance=models.Distance.DOT)
+        },
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(id=1, vector={"d": [1.0, 0.1]}, payload={"k": "a"}),
+            models.PointStruct(id=2, vector={"d": [0.1, 1.0]}, payload={"k": "b"}),
+        ],
+    )
+    # Its own namespace keeps these results apart in the shared result cache
+    engine = QueryEngine(EngineConfig(qdrant_url="memory://server"), client=client)
+    engine.embed = VECTORS.__getitem__
+    engine.embed_batch = lambda texts: [VECTORS[text] for text in texts]
+    return engine
+
+
+@pytest.fixture
+def call(engine):
+    server = QueryServer(engine, threads=2)
+
+    def send(method, path, **kwargs):
+        async def run():
+            transport = httpx.ASGITransport(app=server)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.request(method, path, **kwargs)
+
+        return asyncio.run(run())
+
+    return send
+
+
+def test_health_and_collections(call):
+    assert call("GET", "/health").json() == {"status": "ok"}
+    assert call("GET", "/collections").json() == {"collections": ["c"]}
+
+
+def test_unknown_routes(call):
+    assert call("GET", "/nope").status_code == 404
+    assert call("GET", "/search").status_code == 405
+
+
+def test_search_by_text_vector_and_examples(call):
+    response = call(
+        "POST", "/search", json={"collection": "c", "query": "y", "using": "d"}
+    )
+    assert response.status_code == 200
+    assert [point["id"] for point in response.json()["points"]] == [2, 1]
+
+    response = call(
+        "POST",
+        "/search",
+        json={
+            "collection": "c",
+            "vector": [1.0, 0.0],
+            "using": "d",
+            "limit": 1,
+            "filter": {"must": [{"key": "k", "operator": "match", "value": "b"}]},
+        },
+    )
+    # The filter excludes the nearest point
+    assert response.json()["points"][0]["payload"] == {"k": "b"}
+
+    response = call(
+        "POST", "/search", json={"collection": "c", "positive": [1], "using": "d"}
+    )
+    assert [point["id"] for point in response.json()["points"]] == [2]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"query": "x"},
+        {"collection": "c"},
+        {"collection": "c", "query": "x", "limit": "ten"},
+        {"collection": "c", "query": "x", "params": {"hnsw_ef": "many"}},
+        {"collection": "c", "query": "x", "filter": {"must": "nope"}},
+        {"collection": "c", "vector": [1.0, 0.0, 0.0], "using": "d"},
+        {"collection": "c", "positive": [1], "strategy": "nope"},
+        {"collection": "c", "query": "x", "sparse_using": "s", "fusion": "nope"},
+    ],
+)
+def test_invalid_requests_are_400(call, body):
+    response = call("POST", "/search", json=body)
+    assert response.status_code == 400
+    assert response.json()["error"]
+
+
+def test_invalid_json_is_400(call):
+    response = call("POST", "/search", content=b"{")
+    assert response.status_code == 400
+
+
+def test_engine_errors_are_500_without_details(call, engine, caplog):
+    def fail(text):
+        raise KeyError("secret detail")
+
+    engine.embed = fail
+    with caplog.at_level(logging.ERROR, logger="server"):
+        response = call("POST", "/search", json={"collection": "c", "query": "x"})
+    assert response.status_code == 500
+    assert response.json() == {"error": "Internal server error"}
+    assert "secret detail" in caplog.text
+
+
+def test_search_batch(call):
+    response = call(
+        "POST",
+        "/search/batch",
+        json={
+            "collection": "c",
+            "using": "d",
+            "limit": 1,
+            "queries": ["x", {"query": "x", "filter": NOT_A}],
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [[point["id"] for point in points] for points in results] == [[1], [2]]
+
+    response = call(
+        "POST", "/search/batch", json={"collection": "c", "queries": [{"q": "x"}]}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,54 @@
+import pytest
+from qdrant_client import QdrantClient, models
+
+from engine import discover_query, recommend_query
+from similar import context_pairs
+
+
+def test_context_pairs_requires_matching_counts():
+    assert context_pairs([1, 2], [3, 4]) == [(1, 3), (2, 4)]
+    with pytest.raises(ValueError, match="2 positive and 1 negative"):
+        context_pairs([1, 2], [3])
+
+
+def test_recommend_query():
+    query = recommend_query([1], [2], "best_score")
+    assert query.recommend.positive == [1]
+    assert query.recommend.negative == [2]
+    assert query.recommend.strategy == models.RecommendStrategy.BEST_SCORE
+    assert recommend_query([], [2]).recommend.strategy is None
+    with pytest.raises(ValueError):
+        recommend_query([], [])
+
+
+def test_discover_query_with_and_without_target():
+    context = discover_query([(1, 2)])
+    assert isinstance(context, models.ContextQuery)
+    assert context.context[0] == models.ContextPair(positive=1, negative=2)
+    discover = discover_query([(1, 2)], target=3)
+    assert discover.discover.target == 3
+    with pytest.raises(ValueError):
+        discover_query([])
+
+
+def test_queries_run_against_stored_points():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c", vectors_config=models.VectorParams(size=2, distance=models.Distance.DOT)
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(id=1, vector=[1.0, 0.0]),
+            models.PointStruct(id=2, vector=[0.0, 1.0]),
+            models.PointStruct(id=3, vector=[0.9, 0.1]),
+            models.PointStruct(id=4, vector=[0.1, 0.9]),
+        ],
+    )
+    # Example points are excluded from the results
+    recommended = client.query_points("c", query=recommend_query([1]), limit=1).points
+    assert [point.id for point in recommended] == [3]
+    found = client.query_points(
+        "c", query=discover_query(context_pairs([1], [2]), target=1), limit=1
+    ).points
+    assert [point.id for point in found] == [3]
@@ -0,0 +1,36 @@
+import pytest
+
+from sparse_embeddings import HashingSparseEncoder, get_sparse_encoder
+
+
+def test_query_weights_each_distinct_token_once():
+    encoder = HashingSparseEncoder()
+    vector = encoder.embed_query("Red red SHOES!")
+    assert vector.indices == sorted(
+        {encoder._index("red"), encoder._index("shoes")}
+    )
+    assert vector.values == [1.0, 1.0]
+    assert encoder.embed_query("").indices == []
+
+
+def test_document_weights_saturate_with_term_frequency():
+    encoder = HashingSparseEncoder(k=1.2, b=0.0)
+    once, twice = (
+        vector.values[0] for vector in encoder.embed_documents(["red", "red red"])
+    )
+    # With b=0 the weight is tf * (k + 1) / (tf + k)
+    assert once == pytest.approx(1.0)
+    assert twice == pytest.approx(2 * 2.2 / 3.2)
+    assert once < twice < 2 * once
+
+
+def test_longer_documents_weigh_each_term_less():
+    encoder = HashingSparseEncoder(avg_len=2.0)
+    short, long = encoder.embed_documents(["red shoes", "red shoes and a hat"])
+    red = encoder._index("red")
+    assert short.values[short.indices.index(red)] > long.values[long.indices.index(red)]
+
+
+def test_default_encoder_is_the_hashing_one():
+    assert isinstance(get_sparse_encoder(), HashingSparseEncoder)
+    assert isinstance(get_sparse_encoder("hashing"), HashingSparseEncoder)
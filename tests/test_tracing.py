@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+
+from tracing import NOOP_SPAN, Tracer, payload_bytes, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_disabled_tracer_returns_the_shared_noop_span():
+    tracer = Tracer()
+    with tracer.stage("search") as span:
+        span.set(hits=3)
+    assert tracer.stage("search") is NOOP_SPAN
+    assert tracer.summary()["stage"] == []
+
+
+def test_spans_are_summarized_and_logged_as_json_lines(tmp_path):
+    log_path = tmp_path / "trace.jsonl"
+    tracer = Tracer(enabled=True, log_path=str(log_path))
+    tracer.session_id = "s1"
+    points = [SimpleNamespace(payload={"a": 1}), SimpleNamespace(payload=None)]
+    for _ in range(3):
+        tracer.start_run()
+        with tracer.stage("embedding"):
+            pass
+        with tracer.stage("search") as span:
+            span.set_points(points)
+
+    summary = tracer.summary()
+    assert summary["stage"] == ["embedding", "search"]
+    assert summary["runs"] == [3, 3]
+    assert summary["hits"] == [None, 2]
+    assert summary["bytes"] == [None, payload_bytes(points)]
+    assert len(tracer.last_run) == 2
+
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert len(entries) == 6
+    assert entries[-1]["stage"] == "search"
+    assert entries[-1]["session"] == "s1"
+    assert entries[-1]["hits"] == 2
+    assert entries[-1]["ms"] >= 0
+
+
+def test_history_is_bounded():
+    tracer = Tracer(enabled=True, history=5)
+    for _ in range(20):
+        with tracer.stage("search"):
+            pass
+    assert tracer.summary()["runs"] == [5]
+    assert len(tracer.last_run) == 5
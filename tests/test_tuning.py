@@ -0,0 +1,46 @@
+from qdrant_client import QdrantClient, models
+
+from tuning import build_search_params, describe_params, pareto_front, run_sweep
+
+
+def test_pareto_front_flags_non_dominated_combinations():
+    latencies = [1.0, 2.0, 3.0, 2.5]
+    recalls = [0.80, 0.90, 0.99, 0.85]
+    # The last one is slower and less accurate than the second
+    assert pareto_front(latencies, recalls) == [True, True, True, False]
+
+
+def test_pareto_front_keeps_ties():
+    assert pareto_front([1.0, 1.0], [0.9, 0.9]) == [True, True]
+    assert pareto_front([1.0, 1.0], [0.9, 0.8]) == [True, False]
+    assert pareto_front([], []) == []
+
+
+def test_build_search_params_defaults_to_none():
+    assert build_search_params() is None
+    params = build_search_params(hnsw_ef=64, quantization_oversampling=2.0)
+    assert params.hnsw_ef == 64
+    assert params.quantization.oversampling == 2.0
+    assert describe_params(params) == "ef=64 os=2"
+
+
+def test_run_sweep_uses_named_vector():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "c",
+        vectors_config={
+            "d": models.VectorParams(size=2, distance=models.Distance.DOT)
+        },
+    )
+    client.upsert(
+        "c",
+        [
+            models.PointStruct(id=i, vector={"d": [float(i), 1.0]})
+            for i in range(1, 6)
+        ],
+    )
+    candidates = [None, models.SearchParams(exact=True)]
+    table = run_sweep(client, "c", [[1.0, 0.0]], candidates, 2, using="d")
+    assert table["params"] == ["default", "exact"]
+    assert table["recall@2"] == [1.0, 1.0]
+    assert len(table["front"]) == 2